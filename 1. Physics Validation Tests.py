@@ -4,14 +4,23 @@ Primordial Photon-Dark Photon Entanglement Test Suite
 Validates theoretical predictions and numerical implementations
 """
 
+import json
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.integrate import solve_ivp
 from scipy.fft import fft, ifft
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from instrumentation import Instrumentation, json_default
+
 class EntanglementTestSuite:
-    def __init__(self):
+    def __init__(self, profile=False, results_path=None):
         self.results = {}
+        self.instrumentation = Instrumentation(profile=profile)
+        self.results_path = results_path
         
     def test_entanglement_evolution(self):
         """Test the time evolution of photon-dark photon system"""
@@ -35,6 +44,7 @@ class EntanglementTestSuite:
         
         solution = solve_ivp(entanglement_equations, t_span, y0, 
                            t_eval=np.linspace(0, 100, 1000))
+        self.instrumentation.record_solver(solution)
         
         # Calculate entanglement entropy
         density_matrix = self.calculate_density_matrix(solution.y)
@@ -162,7 +172,8 @@ class EntanglementTestSuite:
             test_name = test.__name__
             print(f"\n🧪 Running {test_name}...")
             try:
-                success = test()
+                with self.instrumentation.stage(test_name):
+                    success = test()
                 status = "PASS" if success else "FAIL"
                 print(f"   Result: {status}")
             except Exception as e:
@@ -171,6 +182,13 @@ class EntanglementTestSuite:
         
         self.generate_report()
     
+    def save_results(self, path="test_results.json"):
+        """Write test results and per-stage instrumentation to JSON"""
+        with open(path, "w") as f:
+            json.dump({"results": self.results,
+                       "instrumentation": self.instrumentation.summary()},
+                      f, indent=2, default=json_default)
+    
     def generate_report(self):
         """Generate comprehensive test report"""
         print("\n" + "=" * 50)
@@ -183,7 +201,16 @@ class EntanglementTestSuite:
             for key, value in result.items():
                 if key != 'success':
                     print(f"   {key}: {value}")
+        
+        print("\n" + self.instrumentation.report())
+        if self.results_path:
+            self.save_results(self.results_path)
 
 if __name__ == "__main__":
-    test_suite = EntanglementTestSuite()
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the entanglement validation tests")
+    parser.add_argument("--results", metavar="PATH", help="Write results and instrumentation to this JSON file")
+    args = parser.parse_args()
+
+    test_suite = EntanglementTestSuite(results_path=args.results)
     test_suite.run_all_tests()
\ No newline at end of file
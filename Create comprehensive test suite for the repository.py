@@ -1,9 +1,18 @@
 # Create comprehensive test suite for the repository
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from instrumentation import Instrumentation, json_default
+from display import plot_decimated
+
 class PrimordialEntanglementTestSuite:
-    def __init__(self):
+    def __init__(self, profile=False):
         self.test_results = {}
         self.figures_dir = "test_figures"
         os.makedirs(self.figures_dir, exist_ok=True)
+        self.instrumentation = Instrumentation(profile=profile, profile_dir=os.path.join(self.figures_dir, "profiles"))
         
     def test_quantum_entanglement_dynamics(self):
         """Test 1: Quantum entanglement dynamics"""
@@ -40,6 +49,7 @@ class PrimordialEntanglementTestSuite:
             
             solution = solve_ivp(entanglement_hamiltonian, t_span, psi0, 
                                t_eval=t_eval, method='RK45')
+            self.instrumentation.record_solver(solution)
             
             # Calculate entanglement measures
             entanglement_entropy = []
@@ -69,8 +79,8 @@ class PrimordialEntanglementTestSuite:
             prob_photon = np.abs(solution.y[0])**2
             prob_dark = np.abs(solution.y[1])**2
             
-            ax1.plot(solution.t, prob_photon, 'b-', linewidth=2, label='Photon Probability')
-            ax1.plot(solution.t, prob_dark, 'r-', linewidth=2, label='Dark Photon Probability')
+            plot_decimated(ax1, solution.t, prob_photon, 'b-', dpi=300, linewidth=2, label='Photon Probability')
+            plot_decimated(ax1, solution.t, prob_dark, 'r-', dpi=300, linewidth=2, label='Dark Photon Probability')
             ax1.set_xlabel('Time [s]')
             ax1.set_ylabel('Probability')
             ax1.set_title('Photon-Dark Photon Oscillations')
@@ -78,7 +88,7 @@ class PrimordialEntanglementTestSuite:
             ax1.grid(True, alpha=0.3)
             
             # Panel 2: Entanglement entropy
-            ax2.plot(solution.t, entanglement_entropy, 'purple', linewidth=3)
+            plot_decimated(ax2, solution.t, entanglement_entropy, 'purple', dpi=300, linewidth=3)
             ax2.axhline(y=np.log(2), color='red', linestyle='--', 
                        label='Maximum Entanglement')
             ax2.set_xlabel('Time [s]')
@@ -88,7 +98,7 @@ class PrimordialEntanglementTestSuite:
             ax2.grid(True, alpha=0.3)
             
             # Panel 3: Concurrence
-            ax3.plot(solution.t[:len(concurrence)], concurrence, 'green', linewidth=2)
+            plot_decimated(ax3, solution.t[:len(concurrence)], concurrence, 'green', dpi=300, linewidth=2)
             ax3.set_xlabel('Time [s]')
             ax3.set_ylabel('Concurrence')
             ax3.set_title('Entanglement Concurrence')
@@ -299,7 +309,8 @@ class PrimordialEntanglementTestSuite:
         
         all_passed = True
         for test in tests:
-            passed = test()
+            with self.instrumentation.stage(test.__name__):
+                passed = test()
             all_passed = all_passed and passed
         
         self.generate_test_report(all_passed)
@@ -326,6 +337,16 @@ class PrimordialEntanglementTestSuite:
                 print(f"   ERROR: {result['error']}")
         
         print(f"\n📁 Test figures saved in: {self.figures_dir}/")
+        
+        print("\n⏱️ STAGE TIMINGS")
+        print(self.instrumentation.report())
+        results_file = os.path.join(self.figures_dir, "test_results.json")
+        with open(results_file, "w") as f:
+            json.dump({"overall_success": overall_success,
+                       "results": self.test_results,
+                       "instrumentation": self.instrumentation.summary()},
+                      f, indent=2, default=json_default)
+        print(f"📁 Results saved in: {results_file}")
 
 # Run the complete test suite
 print("\n🔬 Starting Primordial Photon-Dark Photon Entanglement Test Suite")
@@ -1,4 +1,4 @@
-.PHONY: all clean figures data
+.PHONY: all clean figures data test bench
 
 all: figures data
 
@@ -9,4 +9,7 @@ clean:
 	rm -rf figures/*.pdf data/*.txt
 
 test:
-	python -m pytest tests/ -v
\ No newline at end of file
+	python -m pytest tests/ -v
+
+bench:
+	python src/benchmark.py
@@ -1,3 +1,6 @@
+import json
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.integrate import solve_ivp
@@ -5,12 +8,17 @@ from scipy.signal import find_peaks
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from instrumentation import Instrumentation, json_default
+from display import plot_decimated
+
 print("🔬 PRIMORDIAL PHOTON-DARK PHOTON ENTANGLEMENT VERIFICATION")
 print("=" * 60)
 
 class PrimordialEntanglementVerification:
-    def __init__(self):
+    def __init__(self, profile=False):
         self.results = {}
+        self.instrumentation = Instrumentation(profile=profile)
         self.fig, self.axes = plt.subplots(2, 2, figsize=(15, 12))
         self.fig.suptitle('Photon-Dark Photon Entanglement Verification', fontsize=16, fontweight='bold')
         
@@ -37,6 +45,7 @@ class PrimordialEntanglementVerification:
         psi0 = [1.0 + 0j, 0.0 + 0j]
         
         solution = solve_ivp(quantum_equations, t_span, psi0, t_eval=t_eval, method='RK45')
+        self.instrumentation.record_solver(solution)
         
         # Calculate probabilities and entanglement
         prob_visible = np.abs(solution.y[0])**2
@@ -55,9 +64,9 @@ class PrimordialEntanglementVerification:
         
         # Plot results
         ax = self.axes[0, 0]
-        ax.plot(solution.t / 1e33, prob_visible, 'b-', label='Visible Photon', linewidth=2)
-        ax.plot(solution.t / 1e33, prob_dark, 'r-', label='Dark Photon', linewidth=2)
-        ax.plot(solution.t / 1e33, coherence, 'g--', label='Quantum Coherence', linewidth=2)
+        plot_decimated(ax, solution.t / 1e33, prob_visible, 'b-', dpi=150, label='Visible Photon', linewidth=2)
+        plot_decimated(ax, solution.t / 1e33, prob_dark, 'r-', dpi=150, label='Dark Photon', linewidth=2)
+        plot_decimated(ax, solution.t / 1e33, coherence, 'g--', dpi=150, label='Quantum Coherence', linewidth=2)
         ax.set_xlabel('Time (Hubble units)')
         ax.set_ylabel('Probability/Coherence')
         ax.set_title('Photon-Dark Photon Oscillations')
@@ -65,7 +74,7 @@ class PrimordialEntanglementVerification:
         ax.grid(True, alpha=0.3)
         
         ax2 = self.axes[0, 1]
-        ax2.plot(solution.t / 1e33, entanglement_entropy, 'purple', linewidth=3)
+        plot_decimated(ax2, solution.t / 1e33, entanglement_entropy, 'purple', dpi=150, linewidth=3)
         ax2.set_xlabel('Time (Hubble units)')
         ax2.set_ylabel('Entanglement Entropy')
         ax2.set_title('Quantum Entanglement Evolution')
@@ -245,15 +254,17 @@ class PrimordialEntanglementVerification:
         all_passed = True
         for test in tests:
             try:
-                passed = test()
+                with self.instrumentation.stage(test.__name__):
+                    passed = test()
                 all_passed = all_passed and passed
             except Exception as e:
                 print(f"   ✗ Test failed with error: {e}")
                 all_passed = False
         
         # Save main figure
-        plt.tight_layout()
-        plt.savefig('photon_dark_photon_verification.png', dpi=150, bbox_inches='tight')
+        with self.instrumentation.stage("save_figure"):
+            plt.tight_layout()
+            plt.savefig('photon_dark_photon_verification.png', dpi=150, bbox_inches='tight')
         plt.show()
         
         self.generate_final_report(all_passed)
@@ -302,6 +313,15 @@ class PrimordialEntanglementVerification:
         print("• Quantum entanglement creates measurable CMB polarization features") 
         print("• Significant parameter space remains viable for detection")
         print("• Future CMB experiments could detect these signatures")
+        
+        print("\n⏱️ STAGE TIMINGS:")
+        print("-" * 40)
+        print(self.instrumentation.report())
+        with open('verification_results.json', 'w') as f:
+            json.dump({'overall_success': overall_success,
+                       'results': self.results,
+                       'instrumentation': self.instrumentation.summary()},
+                      f, indent=2, default=json_default)
 
 # Run the complete verification
 verification = PrimordialEntanglementVerification()
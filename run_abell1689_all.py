@@ -6,7 +6,7 @@ Runs your P-D entanglement pipeline on *all* downloaded FITS files for Abell 168
 
 - Downloads all HST SCIENCE FITS for Abell 1689 via MAST.
 - Runs both validation and numerical results for each FITS.
-- Saves a map, plot, and metadata JSON per file.
+- Saves a map, plot, metadata JSON and run bundle per file, with per-stage timings.
 """
 
 import os
@@ -27,21 +27,29 @@ QUICK_MODE = False  # Set False if you want full runs
 
 # Add your repo to Python path
 sys.path.append(str(REPO_ROOT))
+sys.path.append(str(REPO_ROOT / "src"))
+from instrumentation import Instrumentation, json_default
+from display import imshow_reduced
+from bundle import save_bundle
+
+run_instr = Instrumentation()
 
 # Use astroquery to fetch all data
 from astroquery.mast import Observations
 
 print("Querying MAST for Abell 1689 HST observations...")
-obs_table = Observations.query_criteria(target_name="Abell 1689", obs_collection="HST")
-products = Observations.get_product_list(obs_table)
-fits_products = Observations.filter_products(products, productType="SCIENCE", extension="fits")
+with run_instr.stage("query"):
+    obs_table = Observations.query_criteria(target_name="Abell 1689", obs_collection="HST")
+    products = Observations.get_product_list(obs_table)
+    fits_products = Observations.filter_products(products, productType="SCIENCE", extension="fits")
 
 if not fits_products:
     print("No FITS products; exiting.")
     sys.exit(1)
 
 print(f"Found {len(fits_products)} FITS products. Downloading them...")
-downloads = Observations.download_products(fits_products, download_dir=OUTPUT_ROOT / "fits")
+with run_instr.stage("download"):
+    downloads = Observations.download_products(fits_products, download_dir=OUTPUT_ROOT / "fits")
 fits_files = list((OUTPUT_ROOT / "fits").glob("*.fits"))
 print(f"Downloaded {len(fits_files)} FITS files.")
 
@@ -56,20 +64,24 @@ except ImportError as e:
 # Process each FITS
 for fits_file in fits_files:
     print(f"Processing {fits_file.name} ...")
-    result_valid = run_validation(fits_file, quick=QUICK_MODE)
-    result_num = compute_results(fits_file, quick=QUICK_MODE)
+    file_instr = Instrumentation()
+    with run_instr.stage("validation"), file_instr.stage("validation"):
+        result_valid = run_validation(fits_file, quick=QUICK_MODE)
+    with run_instr.stage("numerical"), file_instr.stage("numerical"):
+        result_num = compute_results(fits_file, quick=QUICK_MODE)
 
     # Save a map if exists
     out_base = OUTPUT_ROOT / fits_file.stem
     out_base.mkdir(exist_ok=True)
     if "map" in result_valid:
-        plt.figure(figsize=(6,5))
-        plt.imshow(result_valid["map"], origin="lower", cmap="plasma")
-        plt.colorbar(label="P-D Entanglement Signal")
-        plt.title(f"Abell 1689 — {fits_file.name}")
-        plot_file = out_base / "map.png"
-        plt.savefig(plot_file, dpi=300)
-        plt.close()
+        with run_instr.stage("plot"), file_instr.stage("plot"):
+            plt.figure(figsize=(6,5))
+            imshow_reduced(plt.gca(), result_valid["map"], dpi=300, origin="lower", cmap="plasma")
+            plt.colorbar(label="P-D Entanglement Signal")
+            plt.title(f"Abell 1689 — {fits_file.name}")
+            plot_file = out_base / "map.png"
+            plt.savefig(plot_file, dpi=300)
+            plt.close()
         print(f"Saved map to {plot_file}")
 
     # Save metadata
@@ -83,8 +95,21 @@ for fits_file in fits_files:
         "num_keys": list(result_num.keys()),
         "validation": {k: float(result_valid[k]) if isinstance(result_valid[k], (int, float, np.generic)) else str(result_valid[k]) for k in result_valid},
         "numerical": {k: float(result_num[k]) if isinstance(result_num[k], (int, float, np.generic)) else str(result_num[k]) for k in result_num},
+        "instrumentation": file_instr.summary(),
     }
     meta_file = out_base / "metadata.json"
     with open(meta_file, "w") as fh:
-        json.dump(metadata, fh, indent=2)
+        json.dump(metadata, fh, indent=2, default=json_default)
     print(f"Saved metadata to {meta_file}")
+
+    # Binary results, parameters, commit and FITS hash in a reloadable bundle
+    arrays = {f"{group}_{k}": v for group, res in (("validation", result_valid), ("numerical", result_num))
+              for k, v in res.items() if isinstance(v, np.ndarray)}
+    save_bundle(out_base / "bundle", params={"object": "Abell 1689", "fits_file": fits_file.name, "quick_mode": QUICK_MODE},
+                arrays=arrays, summaries={"validation": metadata["validation"], "numerical": metadata["numerical"]},
+                inputs=[fits_file], repo_dir=str(REPO_ROOT))
+
+print("\nStage timings:")
+print(run_instr.report())
+with open(OUTPUT_ROOT / "instrumentation.json", "w") as fh:
+    json.dump(run_instr.summary(), fh, indent=2, default=json_default)
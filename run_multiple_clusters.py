@@ -5,8 +5,15 @@ run_multiple_clusters.py
 Runs your P-D entanglement pipeline on a list of clusters.
 For each cluster:
 - Downloads SCIENCE FITS (HST) via MAST.
-- Runs validation + numerical pipeline on each FITS.
-- Saves outputs (map, metadata) under one folder per cluster.
+- Reprojects the science images onto one common grid per cluster, with
+  pixel maps cached per (input WCS, grid) in cluster_runs/wcs_maps.
+- Runs validation + numerical pipeline on each FITS, reprojected where
+  it carries a WCS.
+- Saves outputs (map, metadata, run bundle) under one folder per cluster.
+- Writes a tiled multi-resolution pyramid of each entanglement map and
+  raw image, listed in cluster_runs/pyramids.json.
+Per-stage timings go into each metadata.json and a summary table is
+printed at the end of the run.
 """
 
 import os
@@ -15,6 +22,7 @@ import json
 from pathlib import Path
 from datetime import datetime
 from astroquery.mast import Observations
+from astropy.io import fits
 import numpy as np
 from matplotlib import pyplot as plt
 
@@ -26,15 +34,42 @@ OUTPUT_ROOT = Path("cluster_runs")
 OUTPUT_ROOT.mkdir(parents=True, exist_ok=True)
 CLUSTERS = ["Abell 1689", "Abell 2218", "Coma"]  # add more target names as needed
 QUICK_MODE = False  # or True for demo
+GRID_SHAPE = (4096, 4096)  # common reprojection grid (rows, columns)
+GRID_PIXEL_SCALE = 0.05  # arcsec per pixel
 
 sys.path.append(str(REPO_ROOT))
+sys.path.append(str(REPO_ROOT / "src"))
 try:
     from Physics_Validation_Tests import run_validation
     from Expected_Numerical_Results import compute_results
+    from instrumentation import Instrumentation, json_default
+    from display import imshow_reduced
+    from pyramid import build_pyramid
+    from bundle import save_bundle
+    from reproject import MappingCache, apply_mapping, footprint_centre, footprint_cutout, target_grid
 except ImportError as e:
     print("ERROR: Could not import pipeline functions.")
     raise e
 
+
+def image_hdu(hdul, wcs=False):
+    """First HDU holding a 2-D image (with a celestial WCS if ``wcs``), or None."""
+    return next((h for h in hdul if h.data is not None and np.squeeze(h.data).ndim == 2
+                 and (not wcs or "CRVAL1" in h.header)), None)
+
+
+def load_exposures(fits_files):
+    """Yield (image, header) of each file's science HDU, one file open at a time."""
+    for fits_file in fits_files:
+        with fits.open(fits_file, memmap=True) as hdul:
+            hdu = image_hdu(hdul, wcs=True)
+            yield np.squeeze(hdu.data), hdu.header
+
+
+run_instr = Instrumentation()
+pyramid_index = []
+wcs_cache = MappingCache(str(OUTPUT_ROOT / "wcs_maps"))
+
 # Loop over clusters
 for target in CLUSTERS:
     print(f"\n=== Processing target: {target} ===")
@@ -43,40 +78,106 @@ for target in CLUSTERS:
     fits_dir.mkdir(parents=True, exist_ok=True)
 
     # Download FITS
-    obs = Observations.query_criteria(target_name=target, obs_collection="HST")
-    prods = Observations.get_product_list(obs)
-    fits_prods = Observations.filter_products(prods, productType="SCIENCE", extension="fits")
+    with run_instr.stage("query"):
+        obs = Observations.query_criteria(target_name=target, obs_collection="HST")
+        prods = Observations.get_product_list(obs)
+        fits_prods = Observations.filter_products(prods, productType="SCIENCE", extension="fits")
     if not fits_prods:
         print(f"No FITS for {target}, skipping.")
         continue
 
     print(f"Downloading {len(fits_prods)} FITS products for {target} …")
-    Observations.download_products(fits_prods, download_dir=fits_dir)
+    with run_instr.stage("download"):
+        Observations.download_products(fits_prods, download_dir=fits_dir)
     fits_files = list(fits_dir.glob("*.fits"))
     print(f"Got {len(fits_files)} FITS files for {target}.")
 
-    # Run pipeline on each
+    # Common grid centred between the exposures; MAST products carry
+    # Gaia-aligned WCS, so the grid inherits that reference frame. Each
+    # exposure is resampled through its cached pixel map and written once,
+    # cropped to its footprint: pixels of the cutout outside the footprint
+    # are 0, as in HST drizzled products, and flagged in a FOOTPRINT
+    # extension (1 = covered), so the stages below get finite data.
+    with run_instr.stage("reproject"):
+        headers = {}
+        for fits_file in fits_files:
+            with fits.open(fits_file) as hdul:
+                hdu = image_hdu(hdul, wcs=True)
+                if hdu is not None:
+                    headers[fits_file] = hdu.header.copy()
+        reprojected, cutouts = {}, {}
+        if headers:
+            grid = target_grid(*footprint_centre(headers.values()), GRID_SHAPE, GRID_PIXEL_SCALE)
+            reproj_dir = target_dir / "reprojected"
+            reproj_dir.mkdir(exist_ok=True)
+            for fits_file, (image, header) in zip(headers, load_exposures(headers)):
+                resampled = apply_mapping(image, wcs_cache.get(header, grid), workers=wcs_cache.workers)
+                cutout, cutout_header = footprint_cutout(resampled, grid)
+                if cutout is None:
+                    print(f"  {fits_file.name} does not overlap the common grid; using it as is.")
+                    continue
+                footprint = np.isfinite(cutout)
+                reprojected[fits_file] = reproj_dir / fits_file.name
+                fits.HDUList([
+                    fits.PrimaryHDU(np.where(footprint, cutout, 0.0).astype(np.float32),
+                                    header=fits.Header(list(cutout_header.items()))),
+                    fits.ImageHDU(footprint.astype(np.uint8), name="FOOTPRINT"),
+                ]).writeto(reprojected[fits_file], overwrite=True)
+                cutouts[fits_file.name] = {"CRPIX1": cutout_header["CRPIX1"], "CRPIX2": cutout_header["CRPIX2"],
+                                           "shape": list(cutout.shape)}
+            with open(target_dir / "reprojected.json", "w") as fh:
+                json.dump({"grid": grid, "cutouts": cutouts}, fh, indent=2)
+            print(f"Reprojected {len(reprojected)} images ({wcs_cache.misses} pixel maps computed so far).")
+
+    # Run pipeline on each, on the common grid where the exposure has a WCS
     for fits_file in fits_files:
-        print(f"  → Running on {fits_file.name}")
-        valid = run_validation(fits_file, quick=QUICK_MODE)
-        numres = compute_results(fits_file, quick=QUICK_MODE)
+        input_file = reprojected.get(fits_file, fits_file)
+        print(f"  → Running on {input_file}")
+        file_instr = Instrumentation()
+        with run_instr.stage("validation"), file_instr.stage("validation"):
+            valid = run_validation(input_file, quick=QUICK_MODE)
+        with run_instr.stage("numerical"), file_instr.stage("numerical"):
+            numres = compute_results(input_file, quick=QUICK_MODE)
 
         obj_out = target_dir / fits_file.stem
         obj_out.mkdir(exist_ok=True)
 
         if "map" in valid:
-            plt.figure(figsize=(6,5))
-            plt.imshow(valid["map"], origin="lower", cmap="viridis")
-            plt.colorbar(label="P-D Ent. Signal")
-            plt.title(f"{target} — {fits_file.name}")
-            figfile = obj_out / "map.png"
-            plt.savefig(figfile, dpi=300)
-            plt.close()
+            with run_instr.stage("plot"), file_instr.stage("plot"):
+                plt.figure(figsize=(6,5))
+                imshow_reduced(plt.gca(), valid["map"], dpi=300, origin="lower", cmap="viridis")
+                plt.colorbar(label="P-D Ent. Signal")
+                plt.title(f"{target} — {fits_file.name}")
+                figfile = obj_out / "map.png"
+                plt.savefig(figfile, dpi=300)
+                plt.close()
             print("    Saved map:", figfile)
 
+        # Tiled pyramids of the map and the raw science image
+        # The primary HDU of MAST products is often header-only; files with
+        # no 2-D image get no raw pyramid
+        with fits.open(input_file) as hdul:
+            hdu = image_hdu(hdul)
+            raw = None if hdu is None else np.squeeze(hdu.data).astype(float)
+            if raw is not None and "FOOTPRINT" in hdul:
+                raw[hdul["FOOTPRINT"].data == 0] = np.nan  # transparent outside the footprint
+        images = {"map": valid.get("map"), "raw": raw}
+        with run_instr.stage("pyramid"), file_instr.stage("pyramid"):
+            for kind, image in images.items():
+                if image is None:
+                    continue
+                pyramid_dir = obj_out / "pyramid" / kind
+                index = build_pyramid(image, str(pyramid_dir), cmap="viridis" if kind == "map" else "gray",
+                                      clip=(0.0, 100.0) if kind == "map" else (0.5, 99.5),
+                                      metadata={"target": target, "fits_file": fits_file.name, "kind": kind})
+                pyramid_index.append({"target": target, "fits_file": fits_file.name, "kind": kind,
+                                      "path": str(pyramid_dir.relative_to(OUTPUT_ROOT)),
+                                      "shape": index["shape"], "levels": len(index["levels"])})
+
         metadata = {
             "target": target,
             "fits_file": str(fits_file),
+            "pipeline_input": str(input_file),
             "timestamp": datetime.utcnow().isoformat(),
             "repo_commit": os.popen(f"git -C {REPO_ROOT} rev-parse HEAD").read().strip(),
             "quick_mode": QUICK_MODE,
@@ -84,8 +185,24 @@ for target in CLUSTERS:
             "numres_keys": list(numres.keys()),
             "validation": {k: float(valid[k]) if isinstance(valid[k], (int, float, np.generic)) else str(valid[k]) for k in valid},
             "numerical": {k: float(numres[k]) if isinstance(numres[k], (int, float, np.generic)) else str(numres[k]) for k in numres},
+            "instrumentation": file_instr.summary(),
         }
         meta_file = obj_out / "metadata.json"
         with open(meta_file, "w") as fh:
-            json.dump(metadata, fh, indent=2)
+            json.dump(metadata, fh, indent=2, default=json_default)
         print("    Saved metadata:", meta_file)
+
+        # Binary results, parameters, commit and FITS hash in a reloadable bundle
+        arrays = {f"{group}_{k}": v for group, res in (("validation", valid), ("numerical", numres))
+                  for k, v in res.items() if isinstance(v, np.ndarray)}
+        save_bundle(obj_out / "bundle", params={"target": target, "fits_file": fits_file.name, "quick_mode": QUICK_MODE},
+                    arrays=arrays, summaries={"validation": metadata["validation"], "numerical": metadata["numerical"]},
+                    inputs=sorted({fits_file, input_file}), repo_dir=str(REPO_ROOT))
+
+with open(OUTPUT_ROOT / "pyramids.json", "w") as fh:
+    json.dump(pyramid_index, fh, indent=2)
+
+print("\n=== Stage timings ===")
+print(run_instr.report())
+with open(OUTPUT_ROOT / "instrumentation.json", "w") as fh:
+    json.dump(run_instr.summary(), fh, indent=2, default=json_default)
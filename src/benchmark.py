@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Script: benchmark.py
+Purpose: time the physics hot paths and track regressions against a baseline
+
+Each case records best and mean wall time, peak traced memory and
+throughput. Runs are appended to a JSON-lines history file and compared
+case by case with a stored baseline.
+
+    python src/benchmark.py                  # run, append history, compare
+    python src/benchmark.py --quick          # small sizes for a smoke run
+    python src/benchmark.py --save-baseline  # make this run the new baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(REPO_ROOT, "benchmarks")
+HISTORY_FILE = os.path.join(BENCH_DIR, "history.jsonl")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+
+logger = logging.getLogger(__name__)
+
+
+def run_case(name, func, items=1, unit="items", repeats=3, params=None):
+    """
+    Benchmark one callable.
+
+    The timed repeats run without tracing; peak memory comes from one
+    extra run under ``tracemalloc`` (which also sees NumPy allocations).
+
+    Parameters
+    ----------
+    name : str
+        Case name, the key used for baseline comparison
+    func : callable
+        Zero-argument callable doing the work
+    items : int
+        Work items per call, for throughput
+    unit : str
+        Name of a work item
+    repeats : int
+        Number of timed calls
+    params : dict, optional
+        Case parameters recorded with the result
+
+    Returns
+    -------
+    result : dict
+        ``name``, ``params``, ``wall_time`` (best), ``mean_time``, ``repeats``,
+        ``peak_memory_bytes``, ``throughput`` and ``unit``
+    """
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    best = min(times)
+    return {
+        "name": name,
+        "params": params or {},
+        "wall_time": best,
+        "mean_time": float(np.mean(times)),
+        "repeats": repeats,
+        "peak_memory_bytes": peak,
+        "throughput": items / best if best > 0 else float("inf"),
+        "unit": f"{unit}/s",
+    }
+
+
+def default_cases(quick=False):
+    """
+    Benchmark cases for the production hot paths.
+
+    Returns
+    -------
+    cases : list of dict
+        Keyword arguments for ``run_case``
+    """
+    from cmb import modified_spectra
+    from detection import detection_statistic, simulate_data
+    from hamiltonian import H_ms
+    from kernels import fused_conversion
+    from mixing import propagate
+    from parameter_space import conversion_map, viable_mask
+    from physics import compute_rho, entanglement_entropy, von_neumann_entropy
+
+    params = {"epsilon": 0.1, "m_dark": 1.0}
+    cases = []
+
+    sizes = [(2, 50), (8, 100)] if quick else [(4, 50), (16, 200), (64, 200)]
+    for n_k, n_t in sizes:
+        k_vals = np.linspace(0.5, 2.0, n_k)
+        t_eval = np.linspace(0, 50, n_t)
+        cases.append(dict(name=f"compute_rho[{n_k}x{n_t}]",
+                          func=lambda k=k_vals, t=t_eval: compute_rho(k, t, params, progress=False),
+                          items=n_k, unit="modes", params={"n_k": n_k, "n_t": n_t}))
+
+    n_k, n_t = (100, 200) if quick else (1000, 1000)
+    psi = propagate(H_ms(np.linspace(0.5, 2.0, n_k), params), [1, 0], np.linspace(0, 50, n_t))
+    rho = psi[:, :, None, :] * np.conj(psi[:, None, :, :])
+    cases.append(dict(name="entanglement_entropy", func=lambda: entanglement_entropy(rho),
+                      items=n_k * n_t, unit="samples", params={"n_k": n_k, "n_t": n_t}))
+    cases.append(dict(name="von_neumann_entropy", func=lambda: von_neumann_entropy(rho),
+                      items=n_k * n_t, unit="samples", params={"n_k": n_k, "n_t": n_t}))
+    k_grid, t_grid = np.linspace(0.5, 2.0, n_k), np.linspace(0, 50, n_t)
+    cases.append(dict(name="fused_conversion", func=lambda: fused_conversion(k_grid, t_grid, 0.1, 1.0),
+                      items=n_k * n_t, unit="samples", params={"n_k": n_k, "n_t": n_t}))
+
+    n_grid = 200 if quick else 2000
+    couplings = np.logspace(-11, -4, n_grid)
+    masses = np.logspace(-26, -18, n_grid)
+    cases.append(dict(name="conversion_map", func=lambda: conversion_map(couplings, masses),
+                      items=n_grid**2, unit="points", params={"n_grid": n_grid}))
+    cases.append(dict(name="viable_mask", func=lambda: viable_mask(couplings, masses),
+                      items=n_grid**2, unit="points", params={"n_grid": n_grid}))
+
+    ell = np.arange(2, 3000 if quick else 30000)
+    cases.append(dict(name="cmb_spectra", func=lambda: modified_spectra(ell),
+                      items=len(ell), unit="multipoles", params={"n_ell": len(ell)}))
+
+    n_pairs = 10_000 if quick else 1_000_000
+    A, B = simulate_data(n_pairs, 0.05, np.random.default_rng(42))
+    cases.append(dict(name="detection_statistic", func=lambda: detection_statistic(A, B),
+                      items=n_pairs, unit="pairs", params={"n_pairs": n_pairs}))
+    return cases
+
+
+def run_suite(cases, repeats=3):
+    """Run every case and return the list of result dicts."""
+    results = []
+    for case in cases:
+        logger.info("Running %s", case["name"])
+        results.append(run_case(repeats=repeats, **case))
+    return results
+
+
+def environment_info():
+    """Commit, interpreter and library versions recorded with each run."""
+    try:
+        commit = subprocess.run(["git", "-C", REPO_ROOT, "rev-parse", "HEAD"],
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "repo_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+    }
+
+
+def append_history(results, path=HISTORY_FILE):
+    """Append one run (environment + results) as a JSON line."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    entry = dict(environment_info(), results=results)
+    with open(path, "a") as fh:
+        fh.write(json.dumps(entry) + "\n")
+    return entry
+
+
+def load_history(path=HISTORY_FILE):
+    """Read all runs from a history file."""
+    if not os.path.exists(path):
+        return []
+    with open(path) as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def save_baseline(results, path=BASELINE_FILE):
+    """Store results as the baseline, keyed by case name."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    baseline = dict(environment_info(), results={r["name"]: r for r in results})
+    with open(path, "w") as fh:
+        json.dump(baseline, fh, indent=2)
+    return baseline
+
+
+def load_baseline(path=BASELINE_FILE):
+    """Load a stored baseline; None if there is none."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Compare results with a baseline.
+
+    A case is a regression if its best wall time exceeds the baseline by
+    more than ``tolerance`` (fractional), and improved if it is faster by
+    more than ``tolerance``.
+
+    Returns
+    -------
+    comparison : list of dict
+        ``name``, ``wall_time``, ``baseline_time``, ``ratio`` and ``status``
+        ('ok', 'regression', 'improved' or 'new')
+    """
+    reference = (baseline or {}).get("results", {})
+    comparison = []
+    for r in results:
+        ref = reference.get(r["name"])
+        row = {"name": r["name"], "wall_time": r["wall_time"],
+               "baseline_time": None, "ratio": None, "status": "new"}
+        if ref is not None:
+            ratio = r["wall_time"] / ref["wall_time"]
+            status = "ok"
+            if ratio > 1 + tolerance:
+                status = "regression"
+            elif ratio < 1 / (1 + tolerance):
+                status = "improved"
+            row.update(baseline_time=ref["wall_time"], ratio=ratio, status=status)
+        comparison.append(row)
+    return comparison
+
+
+def format_report(results, comparison):
+    """Plain-text summary table."""
+    status = {row["name"]: row for row in comparison}
+    lines = [f"{'case':<28} {'time [s]':>10} {'peak [MB]':>10} {'throughput':>27} {'vs base':>9}  status"]
+    for r in results:
+        row = status[r["name"]]
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+        lines.append(f"{r['name']:<28} {r['wall_time']:>10.4f} {r['peak_memory_bytes'] / 1e6:>10.2f} "
+                     f"{r['throughput']:>12.3g} {r['unit']:<14} {ratio:>9}  {row['status']}")
+    return "\n".join(lines)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Benchmark the physics hot paths")
+    p.add_argument("--quick", action="store_true", help="small problem sizes")
+    p.add_argument("--repeats", type=int, default=3, help="timed calls per case")
+    p.add_argument("--history", type=str, default=HISTORY_FILE, help="JSON-lines history file")
+    p.add_argument("--baseline", type=str, default=BASELINE_FILE, help="baseline JSON file")
+    p.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    p.add_argument("--tolerance", type=float, default=0.25, help="fractional slowdown tolerated")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
+    args = parse_args()
+    results = run_suite(default_cases(quick=args.quick), repeats=args.repeats)
+    append_history(results, args.history)
+    comparison = compare(results, load_baseline(args.baseline), args.tolerance)
+    print(format_report(results, comparison))
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        logger.info("Baseline saved to %s", args.baseline)
+    sys.exit(1 if any(row["status"] == "regression" for row in comparison) else 0)
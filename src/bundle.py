@@ -0,0 +1,211 @@
+"""
+Reproducible run bundles.
+
+A bundle is a directory holding everything needed to reuse or audit a
+run without recomputing it:
+
+    <bundle>/manifest.json      parameters, code commit, input-file hashes,
+                                array index and derived summaries
+    <bundle>/arrays/<name>.npy  numeric results, stored in binary
+
+Arrays are hashed (sha256 of dtype, shape and bytes) when saved, so two
+bundles can be compared cheaply and ``load_bundle(..., verify=True)``
+detects corrupted files. Loading memory-maps the arrays, so reloading a
+bundle costs a JSON read regardless of its size.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """sha256 of a file, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def array_sha256(array):
+    """sha256 of an array's dtype, shape and contents."""
+    array = np.ascontiguousarray(array)
+    h = hashlib.sha256(f"{array.dtype.str}{array.shape}".encode())
+    h.update(array.data if array.size else b"")
+    return h.hexdigest()
+
+
+def code_version(repo_dir=REPO_ROOT):
+    """(commit, dirty) of a git checkout; (None, None) outside one."""
+    try:
+        commit = subprocess.run(["git", "-C", repo_dir, "rev-parse", "HEAD"],
+                                capture_output=True, text=True).stdout.strip()
+        status = subprocess.run(["git", "-C", repo_dir, "status", "--porcelain", "--untracked-files=no"],
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None, None
+    return (commit, bool(status)) if commit else (None, None)
+
+
+def save_bundle(path, params, arrays, summaries=None, inputs=(), repo_dir=REPO_ROOT, version=None):
+    """
+    Write a run bundle, replacing any bundle already at ``path``.
+
+    Parameters
+    ----------
+    path : str
+        Bundle directory
+    params : dict
+        JSON-serialisable run parameters
+    arrays : dict
+        Name -> array of numeric results
+    summaries : dict, optional
+        JSON-serialisable derived quantities (scalars, short lists)
+    inputs : sequence of str
+        Input files, recorded by sha256
+    repo_dir : str
+        Checkout whose commit is recorded
+    version : tuple, optional
+        (commit, dirty) to record instead of querying ``repo_dir``, e.g.
+        when several bundles written into the checkout share one state
+
+    Returns
+    -------
+    manifest : dict
+    """
+    commit, dirty = version or code_version(repo_dir)
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "dirty": dirty,
+        "params": params,
+        "inputs": {os.path.basename(str(p)): {"path": str(p), "sha256": file_sha256(p)} for p in inputs},
+        "arrays": {},
+        "summaries": summaries or {},
+    }
+
+    # Build next to the target and swap in, so readers never see half a
+    # bundle; the old bundle is renamed aside first and only removed once
+    # the new one is in place, so a crash always leaves one of the two
+    path = os.fspath(path)
+    token = uuid.uuid4().hex[:8]
+    tmp = f"{path}.tmp-{token}"
+    os.makedirs(os.path.join(tmp, "arrays"))
+    for name, array in arrays.items():
+        array = np.asarray(array)
+        np.save(os.path.join(tmp, "arrays", f"{name}.npy"), array)
+        manifest["arrays"][name] = {
+            "file": f"arrays/{name}.npy",
+            "shape": list(array.shape),
+            "dtype": array.dtype.str,
+            "sha256": array_sha256(array),
+        }
+    with open(os.path.join(tmp, MANIFEST), "w") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    old = f"{path}.old-{token}"
+    if os.path.exists(path):
+        os.rename(path, old)
+    os.replace(tmp, path)
+    if os.path.exists(old):
+        shutil.rmtree(old)
+    return manifest
+
+
+def _recover(path):
+    # Restore a bundle renamed aside by a save that crashed before the swap
+    if not os.path.exists(path):
+        aside = sorted(glob.glob(f"{glob.escape(os.fspath(path))}.old-*"), key=os.path.getmtime)
+        if aside:
+            os.rename(aside[-1], path)
+
+
+def load_manifest(path):
+    """A bundle's manifest."""
+    _recover(path)
+    with open(os.path.join(path, MANIFEST)) as fh:
+        return json.load(fh)
+
+
+def load_bundle(path, mmap=True, verify=False):
+    """
+    Reload a bundle.
+
+    Parameters
+    ----------
+    path : str
+        Bundle directory
+    mmap : bool
+        Memory-map the arrays instead of reading them
+    verify : bool
+        Re-hash the arrays and raise ``ValueError`` on a mismatch
+
+    Returns
+    -------
+    bundle : dict
+        The manifest entries with ``arrays`` mapping names to arrays
+    """
+    manifest = load_manifest(path)
+    arrays = {}
+    for name, entry in manifest["arrays"].items():
+        arrays[name] = np.load(os.path.join(path, entry["file"]), mmap_mode="r" if mmap else None)
+        if verify and array_sha256(arrays[name]) != entry["sha256"]:
+            raise ValueError(f"Array '{name}' in bundle {path} does not match its recorded hash")
+    return {**manifest, "arrays": arrays}
+
+
+def _dict_diff(a, b):
+    keys = sorted(set(a) | set(b))
+    return {k: (a.get(k), b.get(k)) for k in keys if a.get(k) != b.get(k)}
+
+
+def diff_bundles(path_a, path_b):
+    """
+    Differences between two bundles.
+
+    Arrays are compared by hash; for changed arrays of equal shape the
+    maximum absolute difference is reported as well.
+
+    Returns
+    -------
+    diff : dict
+        ``commit``, ``params``, ``inputs`` and ``summaries`` as
+        {key: (a, b)}, ``arrays`` as {name: info}, and ``identical``, true
+        when everything but the commit matches
+    """
+    a, b = load_manifest(path_a), load_manifest(path_b)
+    arrays = {}
+    for name in sorted(set(a["arrays"]) | set(b["arrays"])):
+        ea, eb = a["arrays"].get(name), b["arrays"].get(name)
+        if ea is None or eb is None:
+            arrays[name] = {"status": "only in a" if eb is None else "only in b"}
+        elif ea["sha256"] != eb["sha256"]:
+            info = {"status": "changed", "shape": (ea["shape"], eb["shape"])}
+            if ea["shape"] == eb["shape"]:
+                xa = np.load(os.path.join(path_a, ea["file"]), mmap_mode="r")
+                xb = np.load(os.path.join(path_b, eb["file"]), mmap_mode="r")
+                info["max_abs_diff"] = float(np.max(np.abs(xa - xb))) if xa.size else 0.0
+            arrays[name] = info
+
+    diff = {
+        "commit": _dict_diff({"commit": a["commit"]}, {"commit": b["commit"]}),
+        "params": _dict_diff(a["params"], b["params"]),
+        "inputs": _dict_diff({k: v["sha256"] for k, v in a["inputs"].items()},
+                             {k: v["sha256"] for k, v in b["inputs"].items()}),
+        "summaries": _dict_diff(a["summaries"], b["summaries"]),
+        "arrays": arrays,
+    }
+    diff["identical"] = not any(diff[k] for k in ("params", "inputs", "summaries", "arrays"))
+    return diff
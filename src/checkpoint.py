@@ -0,0 +1,81 @@
+"""
+Checkpoint files for long per-item loops (k-mode runs, sweeps).
+
+A checkpoint is an ``.npz`` file holding the output arrays of a run, a
+boolean ``done`` mask over the items and the hash of everything that
+determines the result (inputs, parameters, solver settings). Resuming
+from a checkpoint written for a different run is an error rather than a
+silent mix of results. Files are replaced atomically, so a job killed
+mid-write leaves the previous checkpoint intact.
+"""
+
+import logging
+import os
+
+import numpy as np
+
+from sharding import sweep_hash
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """
+    Periodically saved per-item results.
+
+    Parameters
+    ----------
+    path : str
+        Checkpoint file (``.npz``)
+    items : array_like
+        Work items; their number sets the length of every output array
+    meta : dict
+        Parameters and solver settings, hashed together with ``items``
+    every : int
+        Save after this many newly completed items
+    """
+
+    def __init__(self, path, items, meta, every=100):
+        self.path = path
+        self.n_items = len(items)
+        self.run_hash = sweep_hash(np.asarray(items), meta)
+        self.every = every
+        self.done = np.zeros(self.n_items, dtype=bool)
+        self.arrays = {}
+        self._unsaved = 0
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with np.load(self.path) as ckpt:
+            if str(ckpt["run_hash"]) != self.run_hash:
+                raise ValueError(f"checkpoint {self.path} belongs to a different run "
+                                 "(inputs, parameters or solver settings changed)")
+            self.done = ckpt["done"].copy()
+            self.arrays = {key[5:]: ckpt[key].copy() for key in ckpt.files if key.startswith("data_")}
+        logger.info("Resuming from %s: %d/%d items done", self.path, self.done.sum(), self.n_items)
+
+    def pending(self):
+        """Indices of items still to compute."""
+        return np.flatnonzero(~self.done)
+
+    def update(self, index, **values):
+        """Store the outputs of item ``index``; saves every ``every`` items."""
+        for key, value in values.items():
+            value = np.asarray(value)
+            if key not in self.arrays:
+                self.arrays[key] = np.zeros((self.n_items,) + value.shape, dtype=value.dtype)
+            self.arrays[key][index] = value
+        self.done[index] = True
+        self._unsaved += 1
+        if self._unsaved >= self.every:
+            self.save()
+
+    def save(self):
+        """Write the checkpoint atomically."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp.npz"
+        np.savez(tmp, done=self.done, run_hash=self.run_hash,
+                 **{f"data_{key}": value for key, value in self.arrays.items()})
+        os.replace(tmp, self.path)
+        self._unsaved = 0
@@ -0,0 +1,221 @@
+"""
+FFT cross-correlation and cross-power spectra of co-registered maps.
+
+For maps a, b on the same pixel grid the cross-correlation at lag d is
+
+    C(d) = sum_x a'(x + d) b'(x),    a' = a - <a>,  b' = b - <b>,
+
+normalised by N sigma_a sigma_b so that C(0) is the Pearson correlation
+of the two maps. It is evaluated with real-to-complex transforms
+(``scipy.fft.rfft2``) zero-padded to a fast length, so a full mosaic
+costs a few FFTs instead of a per-pixel loop.
+
+Maps larger than memory (e.g. ``np.memmap`` mosaics) are handled by
+``tiled_cross_correlate``, an overlap-save scheme over a bounded lag
+window: each tile of ``b`` is correlated with the matching tile of ``a``
+extended by the maximum lag, and the valid lags are accumulated. Every
+tile uses the same transform shape from a ``CorrelationPlan``, so the
+FFT plans cached by ``scipy.fft`` are reused across tiles and maps.
+"""
+
+import numpy as np
+from scipy import fft
+
+
+class CorrelationPlan:
+    """
+    Fixed transform shape and worker count shared by repeated correlations.
+
+    Parameters
+    ----------
+    shape : (int, int)
+        Minimum transform shape; rounded up to fast FFT lengths unless ``exact``
+    workers : int, optional
+        Threads per transform (``scipy.fft`` workers); -1 uses all cores
+    exact : bool
+        Use ``shape`` as is (needed for spectra, which must not be padded)
+    """
+
+    def __init__(self, shape, workers=None, exact=False):
+        self.shape = tuple(int(n) if exact else fft.next_fast_len(int(n), real=True) for n in shape)
+        self.workers = workers
+
+    def forward(self, x):
+        """Real-to-complex transform of ``x`` zero-padded to the plan shape."""
+        return fft.rfft2(x, s=self.shape, workers=self.workers)
+
+    def correlate(self, a, b):
+        """Circular correlation sum_x a(x + d) b(x) on the plan shape."""
+        return fft.irfft2(self.forward(a) * np.conj(self.forward(b)), s=self.shape, workers=self.workers)
+
+
+def _moments(x):
+    x = np.asarray(x, dtype=float)
+    mean = x.mean()
+    return mean, np.sqrt(np.mean((x - mean)**2))
+
+
+def cross_correlate(a, b, max_lag=None, normalize=True, plan=None, workers=None):
+    """
+    2-D cross-correlation of two maps via FFT.
+
+    Parameters
+    ----------
+    a, b : array_like
+        2-D maps on the same pixel grid
+    max_lag : int or (int, int), optional
+        Return only lags |d| <= max_lag along each axis; default all lags
+    normalize : bool
+        Subtract the means and divide by N sigma_a sigma_b (Pearson r at
+        zero lag); otherwise the raw correlation sum
+    plan : CorrelationPlan, optional
+        Plan to reuse; must cover ``a.shape`` plus the largest lag on each
+        axis (``2 * a.shape - 1`` for all lags)
+    workers : int, optional
+        Threads per transform when no plan is given
+
+    Returns
+    -------
+    corr : ndarray
+        Correlation indexed by lag, zero lag at the centre, of shape
+        (2 L_y + 1, 2 L_x + 1); with ``max_lag=None`` L = shape - 1
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    if a.shape != b.shape:
+        raise ValueError(f"Maps must be co-registered, got shapes {a.shape} and {b.shape}")
+    lags = _lags(a.shape, max_lag)
+    scale = 1.0
+    if normalize:
+        (mean_a, std_a), (mean_b, std_b) = _moments(a), _moments(b)
+        a, b = a - mean_a, b - mean_b
+        scale = a.size * std_a * std_b
+    # Lags |d| <= L are free of wrap-around on a transform of length n + L
+    needed = tuple(n + l for n, l in zip(a.shape, lags))
+    plan = plan or CorrelationPlan(needed, workers)
+    if any(p < m for p, m in zip(plan.shape, needed)):
+        raise ValueError(f"Plan shape {plan.shape} is too small for maps of shape {a.shape} with lags "
+                         f"up to {lags}; it needs at least {needed}")
+    circular = plan.correlate(a, b)
+    rows = np.arange(-lags[0], lags[0] + 1) % plan.shape[0]
+    cols = np.arange(-lags[1], lags[1] + 1) % plan.shape[1]
+    return circular[np.ix_(rows, cols)] / scale
+
+
+def _lags(shape, max_lag):
+    if max_lag is None:
+        return tuple(n - 1 for n in shape)
+    lags = (max_lag, max_lag) if np.isscalar(max_lag) else tuple(max_lag)
+    return tuple(min(int(l), n - 1) for l, n in zip(lags, shape))
+
+
+def _tiled_moments(x, tile):
+    # Streaming mean and standard deviation, one tile in memory at a time
+    total = total_sq = 0.0
+    for r in range(0, x.shape[0], tile[0]):
+        for c in range(0, x.shape[1], tile[1]):
+            block = np.asarray(x[r:r + tile[0], c:c + tile[1]], dtype=float)
+            total += block.sum()
+            total_sq += np.square(block).sum()
+    mean = total / x.size
+    return mean, np.sqrt(max(total_sq / x.size - mean**2, 0.0))
+
+
+def tiled_cross_correlate(a, b, max_lag, tile=1024, normalize=True, workers=None):
+    """
+    Cross-correlation over |d| <= max_lag by tiled overlap-save.
+
+    Only one tile of ``b`` and its halo-extended tile of ``a`` are in
+    memory at a time, so ``a`` and ``b`` can be memory-mapped mosaics.
+    The result equals ``cross_correlate(a, b, max_lag)``.
+
+    Parameters
+    ----------
+    a, b : array_like
+        2-D maps on the same pixel grid (sliceable, e.g. ``np.memmap``)
+    max_lag : int or (int, int)
+        Largest lag along each axis
+    tile : int or (int, int)
+        Tile shape of ``b``
+    normalize : bool
+        As in ``cross_correlate``
+    workers : int, optional
+        Threads per transform
+
+    Returns
+    -------
+    corr : ndarray
+        Shape (2 L_y + 1, 2 L_x + 1), zero lag at the centre
+    """
+    if a.shape != b.shape:
+        raise ValueError(f"Maps must be co-registered, got shapes {a.shape} and {b.shape}")
+    ny, nx = a.shape
+    ly, lx = _lags(a.shape, max_lag)
+    ty, tx = (tile, tile) if np.isscalar(tile) else tile
+    ty, tx = min(ty, ny), min(tx, nx)
+
+    mean_a = mean_b = 0.0
+    scale = 1.0
+    if normalize:
+        (mean_a, std_a), (mean_b, std_b) = _tiled_moments(a, (ty, tx)), _tiled_moments(b, (ty, tx))
+        scale = a.size * std_a * std_b
+
+    # Extended tile of a covers lags 0..2L of the shifted correlation without wrap-around
+    plan = CorrelationPlan((ty + 2 * ly, tx + 2 * lx), workers)
+    corr = np.zeros((2 * ly + 1, 2 * lx + 1))
+    for r in range(0, ny, ty):
+        for c in range(0, nx, tx):
+            b_tile = np.asarray(b[r:r + ty, c:c + tx], dtype=float) - mean_b
+            a_ext = np.zeros((ty + 2 * ly, tx + 2 * lx))
+            r0, r1 = max(r - ly, 0), min(r + ty + ly, ny)
+            c0, c1 = max(c - lx, 0), min(c + tx + lx, nx)
+            a_ext[r0 - (r - ly):r1 - (r - ly), c0 - (c - lx):c1 - (c - lx)] = \
+                np.asarray(a[r0:r1, c0:c1], dtype=float) - mean_a
+            corr += plan.correlate(a_ext, b_tile)[:2 * ly + 1, :2 * lx + 1]
+    return corr / scale
+
+
+def cross_power_spectrum(a, b, pixel_scale=1.0, n_bins=32, plan=None, workers=None):
+    """
+    Azimuthally averaged cross-power spectrum of two maps.
+
+    Parameters
+    ----------
+    a, b : array_like
+        2-D maps on the same pixel grid
+    pixel_scale : float
+        Pixel size; wavenumbers are in cycles per unit of ``pixel_scale``
+    n_bins : int
+        Number of linear |k| bins up to the Nyquist frequency
+    plan : CorrelationPlan, optional
+        Exact plan of shape ``a.shape`` to reuse across map pairs
+    workers : int, optional
+        Threads per transform when no plan is given
+
+    Returns
+    -------
+    spectrum : dict
+        ``k`` (bin centres), ``power`` (mean of Re(A B*) / N^2 per bin,
+        which summed over the full k plane is the covariance of the maps),
+        ``counts`` per bin and the 2-D half-plane ``power_2d``
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    if a.shape != b.shape:
+        raise ValueError(f"Maps must be co-registered, got shapes {a.shape} and {b.shape}")
+    plan = plan or CorrelationPlan(a.shape, workers, exact=True)
+    if plan.shape != a.shape:
+        raise ValueError(f"Plan shape {plan.shape} does not match map shape {a.shape}")
+    power_2d = np.real(plan.forward(a - a.mean()) * np.conj(plan.forward(b - b.mean()))) / a.size**2
+
+    ky = fft.fftfreq(a.shape[0], d=pixel_scale)
+    kx = fft.rfftfreq(a.shape[1], d=pixel_scale)
+    k = np.hypot(ky[:, None], kx[None, :])
+    edges = np.linspace(0, 0.5 / pixel_scale, n_bins + 1)
+    index = np.clip(np.digitize(k, edges) - 1, 0, n_bins - 1)
+    inside = k <= edges[-1]
+    counts = np.bincount(index[inside], minlength=n_bins)
+    sums = np.bincount(index[inside], weights=power_2d[inside], minlength=n_bins)
+    with np.errstate(invalid="ignore"):
+        power = sums / counts
+    return {"k": 0.5 * (edges[1:] + edges[:-1]), "power": power, "counts": counts, "power_2d": power_2d}
@@ -0,0 +1,162 @@
+"""
+Display-aware reduction of plotted data.
+
+A line plot cannot show more than a few distinct values per pixel column
+and an image cannot show more than one value per pixel, so dense
+trajectories and maps are reduced to the resolution they are drawn at
+before they reach matplotlib:
+
+* ``minmax_decimate`` keeps the first, last, minimum and maximum sample
+  of every pixel column (the M4 reduction), which rasterises to the same
+  line as the full series.
+* ``block_reduce`` and ``display_image`` average (or max-reduce) images in
+  integer blocks down to no fewer samples than output pixels.
+
+``plot_decimated`` and ``imshow_reduced`` size the reduction from the
+axes extent and the dpi the figure will be saved at, so rendering cost
+and file size follow the output size instead of the data size.
+"""
+
+import numpy as np
+from matplotlib import rcParams
+
+
+def axes_pixels(ax, dpi=None):
+    """
+    (width, height) of an axes in output pixels.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+    dpi : float, optional
+        Resolution the figure will be saved at; defaults to the figure dpi
+    """
+    fig = ax.figure
+    bbox = ax.get_position()
+    width, height = fig.get_size_inches()
+    dpi = dpi or fig.dpi
+    return max(1, int(np.ceil(bbox.width * width * dpi))), max(1, int(np.ceil(bbox.height * height * dpi)))
+
+
+def minmax_decimate(x, y, n_bins):
+    """
+    Reduce a series to the first, last, min and max sample of each x bin.
+
+    Parameters
+    ----------
+    x : array_like
+        Monotonic abscissa
+    y : array_like
+        Values, same length as ``x``
+    n_bins : int
+        Number of bins over the x range, normally the pixel width
+
+    Returns
+    -------
+    x, y : ndarray
+        At most ``4 * n_bins`` samples in their original order; the input
+        unchanged if it is already that short
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(x) <= 4 * n_bins:
+        return x, y
+
+    span = x[-1] - x[0]
+    scaled = (x - x[0]) / span if span != 0 else np.zeros(len(x))
+    bins = np.clip((scaled * n_bins).astype(np.int64), 0, n_bins - 1)
+
+    # x is monotonic, so every bin is one contiguous run of samples
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    counts = np.diff(np.r_[starts, len(x)])
+    index = np.arange(len(x))
+    first_at = []
+    for reduce in (np.fmin, np.fmax):
+        extreme = np.repeat(reduce.reduceat(y, starts), counts)
+        hit = np.where(y == extreme, index, len(x))
+        first_at.append(np.minimum.reduceat(hit, starts))
+    keep = np.concatenate([starts, starts + counts - 1] + first_at)
+    keep = np.unique(keep[keep < len(x)])
+    return x[keep], y[keep]
+
+
+def block_reduce(image, factor, func=np.nanmean):
+    """
+    Reduce an image by integer block factors.
+
+    Parameters
+    ----------
+    image : array_like
+        2-D image
+    factor : int or (int, int)
+        Block size along (rows, columns)
+    func : callable
+        Reducer taking ``axis=(1, 3)``; edge blocks are NaN padded, so use a
+        NaN-aware reducer
+
+    Returns
+    -------
+    reduced : ndarray
+        Shape ``ceil(image.shape / factor)``
+    """
+    fy, fx = (factor, factor) if np.isscalar(factor) else factor
+    image = np.asarray(image)
+    if fy == 1 and fx == 1:
+        return image
+    ny, nx = -(-image.shape[0] // fy), -(-image.shape[1] // fx)
+    padded = np.full((ny * fy, nx * fx), np.nan)
+    padded[:image.shape[0], :image.shape[1]] = image
+    return func(padded.reshape(ny, fy, nx, fx), axis=(1, 3))
+
+
+def display_factor(shape, pixels):
+    """Largest block factors that keep at least one sample per output pixel."""
+    return tuple(max(1, n // p) for n, p in zip(shape, pixels))
+
+
+def display_image(image, pixels, func=np.nanmean):
+    """
+    Block-reduce an image to the resolution of a (height, width) pixel target.
+
+    Returns
+    -------
+    reduced : ndarray
+    factor : (int, int)
+        Block factors applied along (rows, columns)
+    """
+    image = np.asarray(image)
+    factor = display_factor(image.shape[:2], pixels)
+    return block_reduce(image, factor, func), factor
+
+
+def plot_decimated(ax, x, y, *args, dpi=None, **kwargs):
+    """``ax.plot`` of ``minmax_decimate(x, y)`` at the axes pixel width."""
+    width, _ = axes_pixels(ax, dpi)
+    xd, yd = minmax_decimate(x, y, width)
+    return ax.plot(xd, yd, *args, **kwargs)
+
+
+def imshow_reduced(ax, image, dpi=None, func=np.nanmean, **kwargs):
+    """
+    ``ax.imshow`` of an image reduced to the axes pixel size.
+
+    Pixel coordinates, and so any overlays, stay those of the full image.
+    Images drawn with an explicit ``extent`` are passed through unreduced.
+    """
+    image = np.asarray(image)
+    if "extent" in kwargs or image.ndim != 2:
+        return ax.imshow(image, **kwargs)
+    width, height = axes_pixels(ax, dpi)
+    reduced, (fy, fx) = display_image(image, (height, width), func)
+    if (fy, fx) == (1, 1):
+        return ax.imshow(image, **kwargs)
+
+    ny, nx = image.shape[:2]
+    top = -0.5 + reduced.shape[0] * fy
+    right = -0.5 + reduced.shape[1] * fx
+    lower = kwargs.get("origin", rcParams["image.origin"]) == "lower"
+    extent = (-0.5, right, -0.5, top) if lower else (-0.5, right, top, -0.5)
+    im = ax.imshow(reduced, extent=extent, **kwargs)
+    ax.set_xlim(-0.5, nx - 0.5)
+    ax.set_ylim((-0.5, ny - 0.5) if lower else (ny - 0.5, -0.5))
+    return im
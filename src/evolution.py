@@ -0,0 +1,262 @@
+"""
+Time-dependent evolution of photon-dark photon states.
+
+The Hamiltonian follows an expansion history (see ``expansion.py``) and is
+propagated with Magnus-type exponential integrators. Each step applies an
+exact matrix exponential, so a step is only limited by how fast H(t)
+changes, not by how fast the state oscillates: adiabatic stretches are
+crossed in a handful of large steps. All k modes are advanced together as
+one stacked (N_k, 2, 2) batch.
+"""
+
+import numpy as np
+
+from hamiltonian import H_ms
+
+# Gauss-Legendre nodes for the fourth-order Magnus expansion
+_GAUSS_C1 = 0.5 - np.sqrt(3) / 6
+_GAUSS_C2 = 0.5 + np.sqrt(3) / 6
+
+PHOTON_STATE = np.array([1.0 + 0j, 0.0 + 0j])
+
+
+def expm_hermitian(M):
+    """
+    Compute exp(-i M) for a stack of Hermitian matrices.
+
+    Parameters
+    ----------
+    M : ndarray
+        Hermitian matrices of shape (..., n, n)
+
+    Returns
+    -------
+    U : ndarray
+        Unitary matrices of shape (..., n, n)
+    """
+    M = np.asarray(M, dtype=complex)
+    if M.shape[-1] == 2:
+        # Closed form: M = m0 I + m.sigma, exp(-iM) = e^{-i m0}(cos|m| - i sin|m| m.sigma/|m|)
+        m0 = 0.5 * (M[..., 0, 0] + M[..., 1, 1]).real
+        mz = 0.5 * (M[..., 0, 0] - M[..., 1, 1]).real
+        norm = np.sqrt(mz**2 + np.abs(M[..., 0, 1])**2)
+        traceless = M - m0[..., None, None] * np.eye(2)
+        sinc = np.sinc(norm / np.pi)
+        U = np.cos(norm)[..., None, None] * np.eye(2) - 1j * sinc[..., None, None] * traceless
+        return np.exp(-1j * m0)[..., None, None] * U
+
+    w, V = np.linalg.eigh(M)
+    return (V * np.exp(-1j * w)[..., None, :]) @ np.conj(np.swapaxes(V, -1, -2))
+
+
+def _apply(U, psi):
+    return np.einsum("...ij,...j->...i", U, psi)
+
+
+def magnus_evolve(hamiltonian, psi0, t_eval, method="magnus4", rtol=1e-8,
+                  first_step=None, max_step=np.inf, max_factor=10.0):
+    """
+    Propagate i d(psi)/dt = H(t) psi with an adaptive Magnus integrator.
+
+    ``'magnus4'`` uses the fourth-order Magnus propagator (H at the two Gauss
+    points) with a step-doubling error estimate; ``'midpoint'`` uses the
+    exponential midpoint rule, checked against the fourth-order propagator.
+    Both are exact for a constant H, so the step size is set by the
+    variation of H(t) alone, however fast the state itself oscillates.
+
+    Parameters
+    ----------
+    hamiltonian : callable
+        ``hamiltonian(t)`` returning Hermitian matrices of shape (..., n, n)
+    psi0 : array_like
+        Initial state(s), shape (..., n)
+    t_eval : array_like
+        Increasing output times; integration starts at ``t_eval[0]``
+    method : {'magnus4', 'midpoint'}
+        Propagator used for accepted steps
+    rtol : float
+        Tolerance on the estimated local error of a step (states are unit norm)
+    first_step : float, optional
+        Initial step; defaults to 1% of the integration span
+    max_step : float
+        Largest allowed step
+    max_factor : float
+        Largest step growth factor between consecutive steps
+
+    Returns
+    -------
+    psi : ndarray
+        States of shape (..., n, len(t_eval))
+    stats : dict
+        ``nsteps``, ``nrejected`` and ``nfev`` (Hamiltonian evaluations)
+    """
+    if method not in ("magnus4", "midpoint"):
+        raise ValueError(f"Unknown method '{method}'")
+
+    t_eval = np.asarray(t_eval, dtype=float)
+    if np.any(np.diff(t_eval) <= 0):
+        raise ValueError("t_eval must be strictly increasing")
+
+    psi = np.array(psi0, dtype=complex)
+    out = np.empty(psi.shape + (len(t_eval),), dtype=complex)
+    out[..., 0] = psi
+
+    span = t_eval[-1] - t_eval[0]
+    h = min(first_step if first_step is not None else 0.01 * span, max_step)
+    t = t_eval[0]
+    order = 5 if method == "magnus4" else 3
+    stats = {"nsteps": 0, "nrejected": 0, "nfev": 0}
+
+    for j in range(1, len(t_eval)):
+        target = t_eval[j]
+        while t < target:
+            h_try = min(h, target - t, max_step)
+            if method == "magnus4":
+                psi_full = _apply(magnus4_propagator(hamiltonian, t, h_try), psi)
+                psi_new = _apply(magnus4_propagator(hamiltonian, t, 0.5 * h_try), psi)
+                psi_new = _apply(magnus4_propagator(hamiltonian, t + 0.5 * h_try, 0.5 * h_try), psi_new)
+                err = np.max(np.linalg.norm(psi_new - psi_full, axis=-1)) / (15 * rtol)
+                stats["nfev"] += 6
+            else:
+                psi_new = _apply(expm_hermitian(h_try * hamiltonian(t + 0.5 * h_try)), psi)
+                psi_ref = _apply(magnus4_propagator(hamiltonian, t, h_try), psi)
+                err = np.max(np.linalg.norm(psi_new - psi_ref, axis=-1)) / rtol
+                stats["nfev"] += 3
+
+            if err <= 1.0:
+                t = target if target - t - h_try <= 1e-12 * abs(target) else t + h_try
+                psi = psi_new
+                stats["nsteps"] += 1
+            else:
+                stats["nrejected"] += 1
+
+            factor = max_factor if err == 0 else min(max_factor, max(0.2, 0.9 * err ** (-1 / order)))
+            # A step clipped to hit an output time must not shrink the next one
+            h = max(h, h_try * factor) if (err <= 1.0 and h_try < h) else h_try * factor
+
+        out[..., j] = psi
+
+    return out, stats
+
+
+def magnus4_propagator(hamiltonian, t, h):
+    """
+    Fourth-order Magnus propagator over [t, t + h].
+
+    With H1, H2 evaluated at the Gauss-Legendre nodes,
+    U = exp(-i [h/2 (H1 + H2) + i sqrt(3)/12 h^2 [H1, H2]]).
+    """
+    H1 = hamiltonian(t + _GAUSS_C1 * h)
+    H2 = hamiltonian(t + _GAUSS_C2 * h)
+    commutator = H1 @ H2 - H2 @ H1
+    return expm_hermitian(0.5 * h * (H1 + H2) + 1j * (np.sqrt(3) / 12) * h**2 * commutator)
+
+
+def background_hamiltonian(k_vals, params, history):
+    """
+    Build the mixing Hamiltonian H(t) for comoving modes in an expanding background.
+
+    This is ``H_ms`` evaluated with the scale factor a(t) and plasma mass
+    m_p(t) of ``history``.
+
+    Parameters
+    ----------
+    k_vals : array_like
+        Comoving momenta [eV]
+    params : dict
+        Physical parameters with ``epsilon`` and ``m_dark`` [eV]
+    history : ExpansionHistory
+        Background providing a(t) and m_p(t)
+
+    Returns
+    -------
+    hamiltonian : callable
+        ``hamiltonian(t)`` returning an array of shape (N_k, 2, 2)
+    """
+    k_vals = np.atleast_1d(np.asarray(k_vals, dtype=float))
+
+    def hamiltonian(t):
+        return H_ms(k_vals, dict(params, a=history.scale_factor(t),
+                                 m_plasma=history.plasma_mass(t)))
+
+    return hamiltonian
+
+
+def background_mode_hamiltonian(k_vals, params, history):
+    """
+    Mixing Hamiltonian of selected modes at selected times.
+
+    Parameters
+    ----------
+    k_vals : array_like
+        Comoving momenta [eV]
+    params : dict
+        Physical parameters with ``epsilon`` and ``m_dark`` [eV]
+    history : ExpansionHistory
+        Background providing a(t) and m_p(t)
+
+    Returns
+    -------
+    mode_hamiltonian : callable
+        ``mode_hamiltonian(t, modes)`` for times ``t`` and mode indices
+        ``modes`` broadcast together, returning shape broadcast + (2, 2)
+    """
+    k_vals = np.atleast_1d(np.asarray(k_vals, dtype=float))
+
+    def mode_hamiltonian(t, modes):
+        return H_ms(k_vals[modes], dict(params, a=history.scale_factor(t),
+                                        m_plasma=history.plasma_mass(t)))
+
+    return mode_hamiltonian
+
+
+def evolve_in_background(k_vals, t_eval, params, history, psi0=None, **kwargs):
+    """
+    Evolve photon-dark photon states of many k modes through an expansion history.
+
+    Parameters
+    ----------
+    k_vals : array_like
+        Comoving momenta [eV]
+    t_eval : array_like
+        Output times [eV^-1]
+    params : dict
+        Physical parameters (``epsilon``, ``m_dark``)
+    history : ExpansionHistory
+        Background providing a(t), H(t) and m_p(t)
+    psi0 : array_like, optional
+        Initial state, broadcast over k; defaults to a pure photon
+    **kwargs
+        Passed to ``magnus_evolve``. Unless given, ``first_step`` is a tenth
+        of the Hubble time at the start, the scale on which the background
+        itself changes.
+
+    Returns
+    -------
+    psi : ndarray
+        States of shape (N_k, 2, N_t)
+    stats : dict
+        Integrator statistics from ``magnus_evolve``
+    """
+    k_vals = np.atleast_1d(np.asarray(k_vals, dtype=float))
+    t_eval = np.asarray(t_eval, dtype=float)
+    if psi0 is None:
+        psi0 = PHOTON_STATE
+    psi0 = np.broadcast_to(np.asarray(psi0, dtype=complex), k_vals.shape + (2,))
+
+    if "first_step" not in kwargs:
+        hubble = float(history.hubble_rate(t_eval[0]))
+        if hubble > 0:
+            kwargs["first_step"] = min(0.1 / hubble, t_eval[-1] - t_eval[0])
+
+    hamiltonian = background_hamiltonian(k_vals, params, history)
+    return magnus_evolve(hamiltonian, psi0, t_eval, **kwargs)
+
+
+def density_matrices(psi):
+    """
+    Convert states (..., n, N_t) to density matrices (..., n, n, N_t).
+
+    The layout matches the output of ``compute_rho``.
+    """
+    return psi[..., :, None, :] * np.conj(psi[..., None, :, :])
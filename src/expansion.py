@@ -0,0 +1,139 @@
+"""
+Background expansion histories for photon-dark photon evolution.
+
+All quantities are in natural units: time in eV^-1, rates and masses in eV.
+An expansion history supplies the scale factor a(t), the Hubble rate H(t)
+and the plasma (effective photon) mass m_p(t); the photon energy of a
+comoving mode is omega(k, t) = k / a(t).
+"""
+
+import numpy as np
+
+
+class ExpansionHistory:
+    """
+    Base class for a cosmological background.
+
+    Subclasses implement ``scale_factor``, ``hubble_rate`` and
+    ``plasma_mass``; each accepts scalar or array time and broadcasts.
+    """
+
+    def scale_factor(self, t):
+        raise NotImplementedError
+
+    def hubble_rate(self, t):
+        raise NotImplementedError
+
+    def plasma_mass(self, t):
+        raise NotImplementedError
+
+    def omega(self, k, t):
+        """Physical photon energy of comoving momentum ``k`` at time ``t``."""
+        return np.asarray(k, dtype=float) / self.scale_factor(t)
+
+
+class StaticBackground(ExpansionHistory):
+    """
+    Non-expanding background with a constant plasma mass.
+
+    This reproduces the constant-Hamiltonian runs used throughout the
+    test suites and is the natural reference for the time-dependent engine.
+    """
+
+    def __init__(self, m_plasma=0.0):
+        self.m_plasma = float(m_plasma)
+
+    def scale_factor(self, t):
+        return np.ones_like(np.asarray(t, dtype=float))
+
+    def hubble_rate(self, t):
+        return np.zeros_like(np.asarray(t, dtype=float))
+
+    def plasma_mass(self, t):
+        return np.full_like(np.asarray(t, dtype=float), self.m_plasma)
+
+
+class PowerLawHistory(ExpansionHistory):
+    """
+    Analytic power-law expansion a(t) = (t / t0)^n.
+
+    n = 1/2 is radiation domination, n = 2/3 matter domination. The plasma
+    mass follows the free-electron density, m_p^2 ~ n_e ~ a^-3, so
+    m_p(t) = m_plasma0 * a(t)^(-3/2).
+
+    Parameters
+    ----------
+    t0 : float
+        Reference time at which a = 1 [eV^-1]
+    n : float
+        Power-law index
+    m_plasma0 : float
+        Plasma mass at ``t0`` [eV]
+    """
+
+    def __init__(self, t0, n=0.5, m_plasma0=0.0):
+        if t0 <= 0:
+            raise ValueError("t0 must be positive")
+        self.t0 = float(t0)
+        self.n = float(n)
+        self.m_plasma0 = float(m_plasma0)
+
+    def scale_factor(self, t):
+        return (np.asarray(t, dtype=float) / self.t0) ** self.n
+
+    def hubble_rate(self, t):
+        return self.n / np.asarray(t, dtype=float)
+
+    def plasma_mass(self, t):
+        return self.m_plasma0 * self.scale_factor(t) ** -1.5
+
+
+class TabulatedHistory(ExpansionHistory):
+    """
+    Expansion history interpolated from tabulated values.
+
+    The scale factor is interpolated linearly in log-log space, which is
+    exact for power-law segments; the other columns are interpolated
+    linearly in log t. If ``hubble`` is not given it is obtained from d(ln a)/dt of
+    the table; if ``m_plasma`` is not given the plasma mass is zero.
+
+    Parameters
+    ----------
+    t : array_like
+        Strictly increasing, positive sample times [eV^-1]
+    a : array_like
+        Scale factor at ``t``
+    m_plasma : array_like, optional
+        Plasma mass at ``t`` [eV]
+    hubble : array_like, optional
+        Hubble rate at ``t`` [eV]
+    """
+
+    def __init__(self, t, a, m_plasma=None, hubble=None):
+        t = np.asarray(t, dtype=float)
+        a = np.asarray(a, dtype=float)
+        if t.ndim != 1 or t.shape != a.shape or len(t) < 2:
+            raise ValueError("t and a must be 1-D arrays of equal length >= 2")
+        if np.any(np.diff(t) <= 0) or t[0] <= 0 or np.any(a <= 0):
+            raise ValueError("t must be positive and strictly increasing, a positive")
+
+        self._log_t = np.log(t)
+        self._log_a = np.log(a)
+        if hubble is None:
+            hubble = np.gradient(self._log_a, t)
+        self._hubble = np.asarray(hubble, dtype=float)
+        if m_plasma is None:
+            m_plasma = np.zeros_like(t)
+        self._m_plasma = np.asarray(m_plasma, dtype=float)
+
+    def _interp(self, t, values):
+        return np.interp(np.log(np.asarray(t, dtype=float)), self._log_t, values)
+
+    def scale_factor(self, t):
+        return np.exp(self._interp(t, self._log_a))
+
+    def hubble_rate(self, t):
+        return self._interp(t, self._hubble)
+
+    def plasma_mass(self, t):
+        return self._interp(t, self._m_plasma)
@@ -0,0 +1,285 @@
+"""
+Incremental, parallel figure builds with cached data products.
+
+Two caches keep rebuilds cheap:
+
+* ``DataCache`` stores the arrays a figure is drawn from as run bundles
+  (``bundle.save_bundle``), keyed by the hash of the computing function's
+  source and its inputs, so restyling or re-captioning a figure never
+  recomputes its physics.
+* ``build_figures`` fingerprints every figure method (its source, the
+  sources of the project functions, classes and modules it reaches,
+  transitively and through ``self``, the constants they read, the
+  module-level style setup and the output settings) and re-renders only figures whose
+  fingerprint changed or whose outputs are missing. Stale figures render
+  in parallel worker processes.
+
+A figure script exposes a class whose constructor accepts ``fig_dir``,
+``cache_dir``, ``formats`` and ``dpi`` and whose figure methods record the
+files they write in ``self.saved``; see ``ManuscriptFigures`` in the
+figure generation script.
+"""
+
+import ast
+import hashlib
+import importlib.util
+import inspect
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import sysconfig
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+from bundle import MANIFEST as BUNDLE_MANIFEST, load_bundle, save_bundle
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+
+def _hash(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(json.dumps(part, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+# Code under these roots belongs to Python or installed packages, whose
+# version is not part of a fingerprint
+_SYSTEM_ROOTS = tuple(os.path.realpath(path) + os.sep for key, path in sysconfig.get_paths().items()
+                      if key in ("stdlib", "platstdlib", "purelib", "platlib"))
+_CONSTANT_TYPES = (bool, int, float, str, tuple, list, dict, type(None))
+
+
+def _is_project(obj):
+    try:
+        path = inspect.getsourcefile(obj)
+    except TypeError:
+        return False
+    return (path is not None and os.path.exists(path)
+            and not os.path.realpath(path).startswith(_SYSTEM_ROOTS))
+
+
+def _is_plain(value):
+    # Only plain data hashes the same in every process
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _code_names(func):
+    names, stack = set(), [func.__code__]
+    while stack:
+        code = stack.pop()
+        names.update(code.co_names)
+        stack.extend(c for c in code.co_consts if isinstance(c, types.CodeType))
+    return names
+
+
+def _dependencies(func, namespace, owner=None):
+    """
+    Project code reachable from ``func``, followed transitively.
+
+    Names are resolved in the defining namespace of each function and, for
+    methods, on their class (so ``self.helper`` is followed; ``__init__``
+    always counts). Returns the functions, classes and modules defined in
+    the project, and the plain-data constants they read, as
+    ``(label, source or value)`` pairs.
+    """
+    found, seen = [], set()
+    stack = [(func, namespace, owner)]
+    init = vars(owner).get("__init__") if owner is not None else None
+    if isinstance(init, types.FunctionType):
+        # Sets up the instance state every method relies on
+        seen.add(id(init))
+        found.append((init.__qualname__, inspect.getsource(init)))
+        stack.append((init, init.__globals__, owner))
+    while stack:
+        f, names, cls = stack.pop()
+        for name in sorted(_code_names(f)):
+            candidates = [(name, names.get(name), None)]
+            if cls is not None:
+                candidates.append((f"{cls.__qualname__}.{name}", inspect.getattr_static(cls, name, None), cls))
+            for label, obj, obj_cls in candidates:
+                if isinstance(obj, (staticmethod, classmethod)):
+                    obj = obj.__func__
+                if isinstance(obj, _CONSTANT_TYPES):
+                    if label not in seen and _is_plain(obj):
+                        seen.add(label)
+                        found.append((label, obj))
+                    continue
+                if (not isinstance(obj, (types.FunctionType, type, types.ModuleType))
+                        or id(obj) in seen or not _is_project(obj)):
+                    continue
+                seen.add(id(obj))
+                found.append((getattr(obj, "__qualname__", obj.__name__), inspect.getsource(obj)))
+                if isinstance(obj, types.FunctionType):
+                    stack.append((obj, obj.__globals__, obj_cls))
+                elif isinstance(obj, type):
+                    stack.extend((m, m.__globals__, obj) for m in vars(obj).values()
+                                 if isinstance(m, types.FunctionType))
+                else:
+                    stack.extend((m, vars(obj), None) for m in vars(obj).values()
+                                 if isinstance(m, types.FunctionType) and m.__module__ == obj.__name__)
+    return found
+
+
+def fingerprint(func, namespace=None, owner=None):
+    """
+    Hash of a function's source and of the project code it depends on.
+
+    Parameters
+    ----------
+    func : function
+        Function or method
+    namespace : dict, optional
+        Namespace its global names resolve in; defaults to ``func.__globals__``
+    owner : type, optional
+        Class of a method, whose attributes ``self.name`` may refer to
+    """
+    namespace = namespace if namespace is not None else func.__globals__
+    return _hash([inspect.getsource(func)] + _dependencies(func, namespace, owner))
+
+
+class DataCache:
+    """
+    On-disk cache of figure data products.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory for the cached bundles
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = os.path.join(cache_dir, "data")
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, name, func, **inputs):
+        """
+        Return ``func(**inputs)``, a dict of arrays, computing it only on a miss.
+        """
+        key = _hash(name, inputs, fingerprint(func))
+        path = self.path(name, key)
+        if os.path.exists(os.path.join(path, BUNDLE_MANIFEST)):
+            return load_bundle(path)["arrays"]
+        data = func(**inputs)
+        save_bundle(path, params={"product": name, "function": func.__name__, "inputs": inputs, "key": key},
+                    arrays=data)
+        return data
+
+    def path(self, name, key):
+        """Bundle directory of a data product."""
+        return os.path.join(self.cache_dir, f"{name}-{key[:16]}")
+
+
+def load_script(path):
+    """Import a Python file by path (figure scripts need not be importable names)."""
+    name = "figure_script_" + hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _style_hash(path):
+    # Module-level statements other than class/function definitions (rcParams, palettes)
+    with open(path, encoding="utf-8") as fh:
+        tree = ast.parse(fh.read())
+    body = [node for node in tree.body
+            if not isinstance(node, (ast.FunctionDef, ast.ClassDef, ast.If))]
+    return _hash([ast.dump(node) for node in body])
+
+
+def _render(path, class_name, method, init_kwargs):
+    module = load_script(path)
+    figures = getattr(module, class_name)(**init_kwargs)
+    getattr(figures, method)()
+    return list(getattr(figures, "saved", []))
+
+
+def build_figures(path, class_name, methods, fig_dir, cache_dir=None, workers=None, force=False,
+                  formats=("png", "pdf"), dpi=300):
+    """
+    Render the figures of a script whose inputs or code changed.
+
+    Parameters
+    ----------
+    path : str
+        Figure script
+    class_name : str
+        Figure class in the script
+    methods : sequence of str
+        Figure methods to build
+    fig_dir : str
+        Output directory
+    cache_dir : str, optional
+        Data cache and manifest directory; defaults to ``<fig_dir>/.cache``
+    workers : int, optional
+        Worker processes; 1 renders in this process
+    force : bool
+        Re-render every figure
+    formats : sequence of str
+        Output formats passed to the figure class
+    dpi : int
+        Raster resolution passed to the figure class
+
+    Returns
+    -------
+    status : dict
+        Method name -> 'built', 'up to date' or 'failed: <error>'; a failed
+        figure does not stop the others and is retried on the next build
+    """
+    cache_dir = cache_dir or os.path.join(fig_dir, ".cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest_path = os.path.join(cache_dir, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as fh:
+            manifest = json.load(fh)
+
+    module = load_script(path)
+    cls = getattr(module, class_name)
+    style = _style_hash(path)
+    settings = {"formats": list(formats), "dpi": dpi}
+    prints = {m: _hash(fingerprint(getattr(cls, m), vars(module), cls), style, settings) for m in methods}
+
+    def up_to_date(m):
+        entry = manifest.get(m)
+        return (not force and entry is not None and entry["fingerprint"] == prints[m]
+                and all(os.path.exists(f) for f in entry["outputs"]))
+
+    stale = [m for m in methods if not up_to_date(m)]
+    init_kwargs = dict(fig_dir=fig_dir, cache_dir=cache_dir, formats=tuple(formats), dpi=dpi)
+    outputs, failed = {}, {}
+    if workers == 1 or len(stale) <= 1:
+        for m in stale:
+            try:
+                outputs[m] = _render(path, class_name, m, init_kwargs)
+            except Exception as exc:
+                failed[m] = exc
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = {m: pool.submit(_render, path, class_name, m, init_kwargs) for m in stale}
+            for m, future in futures.items():
+                try:
+                    outputs[m] = future.result()
+                except Exception as exc:
+                    failed[m] = exc
+
+    for m, files in outputs.items():
+        manifest[m] = {"fingerprint": prints[m], "outputs": files}
+        logger.info("Rendered %s -> %s", m, ", ".join(files))
+    for m, exc in failed.items():
+        manifest.pop(m, None)
+        logger.error("Failed to render %s: %s", m, exc)
+    with open(manifest_path, "w") as fh:
+        json.dump(manifest, fh, indent=2)
+    return {m: "built" if m in outputs else f"failed: {failed[m]}" if m in failed else "up to date"
+            for m in methods}
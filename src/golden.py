@@ -0,0 +1,243 @@
+"""
+Golden-result regression checks.
+
+Reference outputs of the slow, trusted code paths are stored once as run
+bundles (``bundle.save_bundle``) in a golden store, one bundle per case.
+Faster backends (solver selection, the analytic fused kernel, float32)
+and later versions of the reference path are then checked against them:
+
+* ``'full'`` mode compares whole arrays elementwise with
+  |new - ref| <= atol + rtol |ref| in one vectorized pass;
+* ``'summary'`` mode compares only a downsampled summary (block means
+  to ``SUMMARY_LENGTH`` points, stored in the manifest) and accepts on a
+  matching summary hash without reading the reference arrays at all.
+
+Each case names its reference function and backends with per-backend
+tolerances; ``run_cases`` evaluates them and returns a report per
+(case, backend).
+"""
+
+import hashlib
+import os
+
+import numpy as np
+
+from bundle import code_version, load_bundle, load_manifest, save_bundle
+from cmb import modified_spectra
+from kernels import fused_conversion
+from parameter_space import conversion_map
+from physics import compute_rho, entanglement_entropy
+
+SUMMARY_LENGTH = 64
+SUMMARY_DIGITS = 6
+
+
+def summarize(array, length=SUMMARY_LENGTH):
+    """Block means of the flattened array, at most ``length`` values."""
+    array = np.asarray(array)
+    flat = (np.abs(array) if np.iscomplexobj(array) else array).astype(float).ravel()
+    if flat.size == 0:
+        return flat
+    return np.array([block.mean() for block in np.array_split(flat, min(length, flat.size))])
+
+
+def summary_hash(summary, digits=SUMMARY_DIGITS):
+    """Hash of a summary rounded to ``digits`` significant digits of its scale."""
+    summary = np.asarray(summary, dtype=float)
+    scale = np.max(np.abs(summary)) if summary.size else 0.0
+    rounded = np.round(summary / scale, digits) if scale > 0 else summary
+    h = hashlib.sha256(np.format_float_scientific(scale, precision=digits).encode())
+    h.update(np.ascontiguousarray(rounded + 0.0).tobytes())
+    return h.hexdigest()
+
+
+def compare_arrays(new, ref, rtol, atol):
+    """
+    Elementwise tolerance check of two arrays.
+
+    Returns
+    -------
+    result : dict
+        ``passed``, ``n_failed``, ``max_abs_error`` and ``max_rel_error``
+    """
+    new, ref = np.asarray(new), np.asarray(ref)
+    if new.shape != ref.shape:
+        return {"passed": False, "n_failed": None, "max_abs_error": None, "max_rel_error": None,
+                "reason": f"shape {new.shape} != {ref.shape}"}
+    error = np.abs(new - ref)
+    scale = np.abs(ref)
+    bad = (error > atol + rtol * scale) | (np.isnan(new) != np.isnan(ref))
+    rel = np.divide(error, scale, out=np.zeros_like(error, dtype=float), where=scale > 0)
+    return {
+        "passed": not bad.any(),
+        "n_failed": int(bad.sum()),
+        "max_abs_error": float(np.nanmax(error)) if error.size else 0.0,
+        "max_rel_error": float(np.nanmax(rel)) if rel.size else 0.0,
+    }
+
+
+def save_golden(store, case, arrays, rtol=1e-8, atol=1e-12, params=None, version=None):
+    """
+    Store reference arrays and their summaries for a case.
+
+    Returns
+    -------
+    manifest : dict
+        The golden bundle's manifest
+    """
+    summaries = {}
+    for name, array in arrays.items():
+        summary = summarize(array)
+        summaries[name] = {"summary": summary.tolist(), "hash": summary_hash(summary)}
+    return save_bundle(os.path.join(store, case), params={"case": case, "rtol": rtol, "atol": atol,
+                                                          **(params or {})},
+                       arrays=arrays, summaries=summaries, version=version)
+
+
+def check_golden(store, case, arrays, rtol=None, atol=None, mode="full"):
+    """
+    Check arrays against a stored golden case.
+
+    Parameters
+    ----------
+    store : str
+        Golden store directory
+    case : str
+        Case name
+    arrays : dict
+        Name -> new array; every golden array must be present
+    rtol, atol : float, optional
+        Tolerances; default to those stored with the case
+    mode : {'full', 'summary'}
+        Compare whole arrays or only the downsampled summaries
+
+    Returns
+    -------
+    report : dict
+        ``passed`` and per-array results under ``arrays``; each result has
+        ``via`` set to 'hash', 'summary' or 'full'
+    """
+    path = os.path.join(store, case)
+    manifest = load_manifest(path)
+    rtol = manifest["params"]["rtol"] if rtol is None else rtol
+    atol = manifest["params"]["atol"] if atol is None else atol
+    reference = load_bundle(path)["arrays"] if mode == "full" else None
+
+    results = {}
+    for name, golden in manifest["summaries"].items():
+        if name not in arrays:
+            results[name] = {"passed": False, "via": mode, "reason": "missing"}
+            continue
+        if mode == "full":
+            results[name] = {**compare_arrays(arrays[name], reference[name], rtol, atol), "via": "full"}
+            continue
+        summary = summarize(arrays[name])
+        if summary_hash(summary) == golden["hash"]:
+            results[name] = {"passed": True, "via": "hash"}
+        else:
+            results[name] = {**compare_arrays(summary, golden["summary"], rtol, atol), "via": "summary"}
+    return {"case": case, "passed": all(r["passed"] for r in results.values()), "arrays": results}
+
+
+# Reference paths and the backends validated against them
+
+def _entropy_grid():
+    return np.linspace(0.5, 2.0, 16), np.linspace(0, 50, 101), {"epsilon": 0.1, "m_dark": 1.0}
+
+
+def entropy_reference():
+    k_vals, t_eval, params = _entropy_grid()
+    rho = compute_rho(k_vals, t_eval, params, progress=False)
+    return {"entropy": entanglement_entropy(rho), "conversion": np.real(rho[:, 1, 1, :])}
+
+
+def entropy_auto():
+    k_vals, t_eval, params = _entropy_grid()
+    rho = compute_rho(k_vals, t_eval, params, progress=False, solver="auto")
+    return {"entropy": entanglement_entropy(rho), "conversion": np.real(rho[:, 1, 1, :])}
+
+
+def entropy_analytic(precision="float64"):
+    k_vals, t_eval, params = _entropy_grid()
+    _, p_dark, entropy = fused_conversion(k_vals, t_eval, params["epsilon"], params["m_dark"],
+                                          backend="numpy", precision=precision)
+    return {"entropy": entropy, "conversion": p_dark}
+
+
+def _map_grid():
+    return np.logspace(-11, -4, 64), np.logspace(-9, -4, 64)
+
+
+def conversion_map_reference(precision="float64"):
+    couplings, masses = _map_grid()
+    return {"conversion": conversion_map(couplings, masses, precision=precision)}
+
+
+def cmb_reference():
+    spectra = modified_spectra(np.arange(2, 2500))
+    return {f"{name}_{kind}": spectrum for name, pair in spectra.items()
+            for kind, spectrum in zip(("standard", "modified"), pair)}
+
+
+CASES = {
+    "entropy_traces": {
+        "reference": entropy_reference,
+        "rtol": 1e-8, "atol": 1e-10,
+        "backends": {
+            "auto": (entropy_auto, {"rtol": 1e-6, "atol": 1e-8}),
+            "analytic": (entropy_analytic, {"rtol": 1e-6, "atol": 1e-8}),
+            "analytic_float32": (lambda: entropy_analytic("float32"), {"rtol": 1e-3, "atol": 1e-5}),
+        },
+    },
+    "conversion_map": {
+        "reference": conversion_map_reference,
+        "rtol": 1e-12, "atol": 1e-15,
+        "backends": {
+            "float32": (lambda: conversion_map_reference("float32"), {"rtol": 1e-5, "atol": 1e-6}),
+        },
+    },
+    "cmb_spectra": {
+        "reference": cmb_reference,
+        "rtol": 1e-12, "atol": 0.0,
+        "backends": {},
+    },
+}
+
+
+def update_golden(store, cases=None, allow_dirty=False):
+    """
+    Recompute the reference path of each case and store it.
+
+    Golden results must be reproducible from the commit they record, so
+    this refuses to run from a checkout with uncommitted changes (or
+    outside git) unless ``allow_dirty`` is set, e.g. for scratch stores.
+    """
+    # Checked once: the store may live in the checkout, and writing the
+    # first case must not mark the later ones dirty
+    version = commit, dirty = code_version()
+    if dirty is not False and not allow_dirty:
+        state = "has uncommitted changes" if dirty else "is not a git checkout"
+        raise RuntimeError(f"Refusing to write golden results: the source tree {state}; "
+                           "commit first so the results can be reproduced")
+    for case in cases or CASES:
+        spec = CASES[case]
+        save_golden(store, case, spec["reference"](), spec["rtol"], spec["atol"], version=version)
+
+
+def run_cases(store, cases=None, mode="full", reference=True):
+    """
+    Check the backends (and optionally the reference path) of each case.
+
+    Returns
+    -------
+    reports : list of dict
+        One ``check_golden`` report per (case, backend), with ``backend`` set
+    """
+    reports = []
+    for case in cases or CASES:
+        spec = CASES[case]
+        runs = ({"reference": (spec["reference"], {})} if reference else {}) | spec["backends"]
+        for backend, (func, tol) in runs.items():
+            report = check_golden(store, case, func(), mode=mode, **tol)
+            reports.append({**report, "backend": backend})
+    return reports
@@ -0,0 +1,76 @@
+"""
+Photon-dark photon mixing Hamiltonian shared by every solver backend.
+
+Conventions (natural units, all masses and energies in eV, time in eV^-1):
+in the (photon, dark photon) basis, with the common energy omega dropped
+as a global phase,
+
+    H = 1/(2 omega) [[m_p^2,          eps m_A'^2],
+                     [eps m_A'^2,     m_A'^2    ]]
+
+where omega = k / a is the physical energy of comoving momentum k at scale
+factor a, m_p the plasma mass, m_A' the dark-photon mass and eps the
+kinetic mixing. The inline forms used by the test suites, [[0, g], [g, m]]
+and [[0, eps H_inf], [eps H_inf, m^2 / 2 H_inf]], are this matrix with
+m_p = 0 and the entries already reduced to single numbers.
+
+Every argument broadcasts, so arrays of k and parameter grids produce the
+whole stacked (..., 2, 2) tensor in one vectorized call.
+"""
+
+import numpy as np
+
+
+def mixing_matrix(omega, epsilon, m_dark, m_plasma=0.0):
+    """
+    Mixing Hamiltonian for photon energy ``omega``.
+
+    Parameters
+    ----------
+    omega : array_like
+        Physical photon energy [eV]
+    epsilon : array_like
+        Kinetic mixing parameter
+    m_dark : array_like
+        Dark-photon mass [eV]
+    m_plasma : array_like
+        Plasma (effective photon) mass [eV]
+
+    Returns
+    -------
+    H : ndarray
+        Hamiltonians of shape broadcast(omega, epsilon, m_dark, m_plasma) + (2, 2)
+    """
+    omega, epsilon, m_dark, m_plasma = np.broadcast_arrays(
+        np.asarray(omega, dtype=float), epsilon, m_dark, m_plasma)
+    inv_2omega = 0.5 / omega
+    H = np.empty(omega.shape + (2, 2), dtype=complex)
+    H[..., 0, 0] = m_plasma**2 * inv_2omega
+    H[..., 0, 1] = H[..., 1, 0] = epsilon * m_dark**2 * inv_2omega
+    H[..., 1, 1] = m_dark**2 * inv_2omega
+    return H
+
+
+def H_ms(k, params):
+    """
+    Compute the mixing Hamiltonian for photon-dark photon system.
+
+    Parameters
+    ----------
+    k : array_like
+        Comoving momentum [eV]
+    params : dict
+        Physical parameters including masses and mixing: ``epsilon`` and
+        ``m_dark`` are required, ``m_plasma`` (default 0) and scale factor
+        ``a`` (default 1) are optional. Values may be arrays broadcastable
+        against ``k``.
+
+    Returns
+    -------
+    H : ndarray
+        Hamiltonians of shape broadcast(k, params...) + (2, 2); a single
+        2x2 matrix for scalar inputs
+    """
+    omega = np.asarray(k, dtype=float) / np.asarray(params.get("a", 1.0), dtype=float)
+    return mixing_matrix(omega, params["epsilon"], params["m_dark"],
+                         params.get("m_plasma", 0.0))
@@ -0,0 +1,185 @@
+"""
+Lightweight per-stage instrumentation for test suites and pipeline runners.
+
+    instr = Instrumentation()
+    with instr.stage("download"):
+        ...
+    sol = solve_ivp(...)
+    instr.record_solver(sol)          # nfev / njev / nlu into the open stage
+    print(instr.report())
+    metadata["instrumentation"] = instr.summary()
+
+Each stage records wall time, call count, solver runs and their
+counters, and the process memory high-water mark. cProfile capture and tracemalloc peaks are opt-in
+because they slow the instrumented code down.
+"""
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SOLVER_COUNTERS = ("nfev", "njev", "nlu")
+
+
+def max_rss_bytes():
+    """Process resident-set high-water mark in bytes, or None if unavailable."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return rss if os.uname().sysname == "Darwin" else rss * 1024
+
+
+def json_default(obj):
+    """``json.dump`` fallback for NumPy scalars and arrays."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)
+
+
+class Instrumentation:
+    """
+    Collects timings, solver counters and memory marks per named stage.
+
+    Parameters
+    ----------
+    profile : bool
+        Capture a cProfile of every outermost stage (it includes the
+        stages nested in it)
+    profile_dir : str, optional
+        If given, dump each stage's profile to ``<profile_dir>/<stage>.prof``
+    trace_memory : bool
+        Record the Python-allocation peak of each stage with tracemalloc;
+        an outer stage's peak includes those of its nested stages
+    profile_top : int
+        Number of functions kept in the per-stage profile summary
+    """
+
+    def __init__(self, profile=False, profile_dir=None, trace_memory=False, profile_top=10):
+        self.profile = profile
+        self.profile_dir = profile_dir
+        self.trace_memory = trace_memory
+        self.profile_top = profile_top
+        self.stages = {}
+        self._stack = []
+        self._profiling = False
+        self._peaks = []
+
+    def _entry(self, name):
+        if name not in self.stages:
+            self.stages[name] = {"wall_time": 0.0, "calls": 0, "solves": 0,
+                                 **{c: 0 for c in SOLVER_COUNTERS},
+                                 "max_rss_bytes": None}
+        return self.stages[name]
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block as a stage; nested stages are named ``outer/inner``."""
+        full_name = "/".join(self._stack + [name])
+        entry = self._entry(full_name)
+        self._stack.append(name)
+
+        # One profiler at a time (nested enables raise on Python >= 3.12):
+        # the outermost stage's profile covers its nested stages
+        profiler = cProfile.Profile() if self.profile and not self._profiling else None
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            # The enclosing stage keeps the peak it reached so far
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+            self._peaks.append(0)
+            tracemalloc.reset_peak()
+
+        start = time.perf_counter()
+        if profiler is not None:
+            self._profiling = True
+            profiler.enable()
+        try:
+            yield entry
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self._profiling = False
+            entry["wall_time"] += time.perf_counter() - start
+            entry["calls"] += 1
+            entry["max_rss_bytes"] = max_rss_bytes()
+            if self.trace_memory:
+                peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+                entry["traced_peak_bytes"] = max(peak, entry.get("traced_peak_bytes", 0))
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+                if started_tracing:
+                    tracemalloc.stop()
+            if profiler is not None:
+                self._store_profile(full_name, entry, profiler)
+            self._stack.pop()
+
+    def timed(self, name=None):
+        """Decorator form of ``stage``; defaults to the function name."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name or func.__name__):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _store_profile(self, name, entry, profiler):
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(self.profile_dir, name.replace("/", "__") + ".prof"))
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream).sort_stats("cumulative")
+        stats.print_stats(self.profile_top)
+        entry["profile"] = stream.getvalue()
+
+    def record_solver(self, sol, stage=None):
+        """
+        Add ``solve_ivp`` evaluation counters to a stage.
+
+        Parameters
+        ----------
+        sol : OdeResult or dict
+            Result of ``scipy.integrate.solve_ivp``, or a dict with any of
+            the counters (e.g. the per-mode info of ``compute_rho``)
+        stage : str, optional
+            Stage name; defaults to the innermost open stage, or ``"solver"``
+        """
+        name = stage or ("/".join(self._stack) if self._stack else "solver")
+        entry = self._entry(name)
+        entry["solves"] += 1
+        for counter in SOLVER_COUNTERS:
+            value = sol.get(counter) if isinstance(sol, dict) else getattr(sol, counter, 0)
+            entry[counter] += int(value or 0)
+
+    def summary(self):
+        """JSON-serialisable copy of all stage records."""
+        return {name: dict(entry) for name, entry in self.stages.items()}
+
+    def report(self):
+        """Summary table of all stages, slowest first."""
+        total = sum(e["wall_time"] for n, e in self.stages.items() if "/" not in n) or 1.0
+        lines = [f"{'stage':<40} {'time [s]':>10} {'share':>7} {'calls':>6} "
+                 f"{'nfev':>9} {'njev':>6} {'max RSS [MB]':>13}"]
+        for name, e in sorted(self.stages.items(), key=lambda item: -item[1]["wall_time"]):
+            rss = f"{e['max_rss_bytes'] / 1e6:.1f}" if e["max_rss_bytes"] else "-"
+            lines.append(f"{name:<40} {e['wall_time']:>10.3f} {e['wall_time'] / total:>7.1%} "
+                         f"{e['calls']:>6} {e['nfev']:>9} {e['njev']:>6} {rss:>13}")
+        return "\n".join(lines)
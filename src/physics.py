@@ -0,0 +1,262 @@
+"""
+Core physics implementation: von Neumann evolution of the photon-dark
+photon density matrix with an adaptive Runge-Kutta solver.
+
+This is the reference (slow, high-accuracy) backend; the Magnus, Landau-Zener,
+Lindblad and mixing engines share its Hamiltonian, ``hamiltonian.H_ms``.
+"""
+
+import logging
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from checkpoint import Checkpoint
+from hamiltonian import H_ms
+from progress import make_reporter
+from solver_select import SOLVERS, solve_auto
+
+logger = logging.getLogger(__name__)
+
+# Initial state: pure visible photon |gamma><gamma|
+rho0 = np.array([[1.0, 0.0], [0.0, 0.0]], dtype=complex)
+
+# Reference solver settings for compute_rho
+SOLVER_SETTINGS = {"method": "DOP853", "rtol": 1e-10, "atol": 1e-12}
+
+# Integrators a mode can report; checkpoints store the index into this
+MODE_SOLVERS = ("reference",) + SOLVERS
+
+# Suggested fallbacks for modes that fail: tighter tolerances, then a stiff
+# method (BDF; Radau does not support the complex state)
+RETRY_SETTINGS = ({"rtol": 1e-12, "atol": 1e-14}, {"method": "BDF"})
+
+
+def von_neumann(t, rho_flat, k, params):
+    """
+    Right-hand side of the von Neumann equation d(rho)/dt = -i [H, rho].
+
+    Parameters
+    ----------
+    t : float
+        Time [eV^-1]
+    rho_flat : ndarray
+        Row-major flattened 2x2 density matrix
+    k : float
+        Comoving momentum [eV]
+    params : dict
+        Physical parameters passed to ``H_ms``
+
+    Returns
+    -------
+    drho_flat : ndarray
+        Flattened time derivative
+    """
+    rho = rho_flat.reshape(2, 2)
+    H = H_ms(k, params)
+    return (-1j * (H @ rho - rho @ H)).ravel()
+
+
+def solve_mode(k, t_eval, params, **settings):
+    """
+    Integrate the von Neumann equation for one mode.
+
+    Parameters
+    ----------
+    k : float
+        Comoving momentum [eV]
+    t_eval : array_like
+        Output times
+    params : dict
+        Physical parameters passed to ``H_ms``
+    **settings
+        ``solve_ivp`` options overriding ``SOLVER_SETTINGS``
+
+    Returns
+    -------
+    sol : OdeResult
+    """
+    return solve_ivp(von_neumann, [t_eval[0], t_eval[-1]], rho0.flatten(),
+                     t_eval=t_eval, args=(k, params), **dict(SOLVER_SETTINGS, **settings))
+
+
+def _solve_with_retry(k, t_eval, params, retry):
+    attempts = [{}] + list(retry)
+    for attempt, settings in enumerate(attempts):
+        last = attempt == len(attempts) - 1
+        try:
+            sol = solve_mode(k, t_eval, params, **settings)
+        except Exception:
+            if last:
+                raise
+            continue
+        if sol.success:
+            return sol, attempt
+    raise RuntimeError(f"Integration failed at k = {k:.3e} after {len(attempts)} attempt(s): {sol.message}")
+
+
+def _solve_mode_auto(k, t_eval, params, retry):
+    try:
+        rho_t, info = solve_auto(lambda t: H_ms(k, params), rho0, t_eval,
+                                 rtol=SOLVER_SETTINGS["rtol"], atol=SOLVER_SETTINGS["atol"])
+    except (RuntimeError, np.linalg.LinAlgError) as e:
+        # Integration or eigen-decomposition failed: fall back to the
+        # reference solver (and its retries) for this mode
+        logger.warning("Automatic solver failed at k = %.3e, using the reference solver: %s", k, e)
+        sol, attempt = _solve_with_retry(k, t_eval, params, retry)
+        return sol.y.reshape(2, 2, -1), {"solver": "reference", "nfev": sol.nfev, "attempt": attempt,
+                                         "fallback_error": str(e)}
+    return rho_t, info
+
+
+def compute_rho(k_vals, t_eval, params, instrumentation=None, progress=None,
+                checkpoint=None, checkpoint_every=100, retry=(), solver="reference",
+                metadata=None):
+    """
+    Compute density matrix evolution for photon-dark photon system.
+
+    Parameters
+    ----------
+    k_vals : array_like
+        Comoving momentum values to evaluate
+    t_eval : array_like
+        Time points at which to store the computed solution
+    params : dict
+        Physical parameters (masses, mixing, Hubble)
+    instrumentation : instrumentation.Instrumentation, optional
+        Receives the solver evaluation counters of every mode, for both
+        ``solver`` settings
+    progress : None, False, callable or progress.ProgressReporter
+        Progress reporting: None prints about ten updates with rate and
+        ETA, False disables it, a callable is used as the sink for
+        throttled records (see ``progress.make_reporter``)
+    checkpoint : str, optional
+        Checkpoint file. Completed modes are saved every
+        ``checkpoint_every`` modes and on failure; a rerun with the same
+        inputs skips them. A checkpoint from different inputs, solver or
+        retry settings raises ``ValueError``.
+    checkpoint_every : int
+        Modes between checkpoint saves
+    retry : sequence of dict
+        ``solve_ivp`` settings tried in turn when a mode fails or raises,
+        e.g. ``RETRY_SETTINGS``; a mode that still fails raises
+        ``RuntimeError``; the attempt used per mode is stored in
+        the checkpoint as ``attempt``, the integrator as ``solver`` (an
+        index into ``MODE_SOLVERS``)
+    solver : {'reference', 'auto'}
+        'reference' integrates every mode with ``SOLVER_SETTINGS``; 'auto'
+        probes each mode's Hamiltonian and picks an analytic, explicit,
+        exponential or implicit integrator (``solver_select.solve_auto``),
+        falling back to the reference solver (logged, and recorded as
+        ``fallback_error``) if that integration fails
+    metadata : dict, optional
+        Filled with ``'modes'``, one dict per computed mode holding ``k``,
+        the ``solver`` used and its ``nfev`` (and ``fallback_error`` for
+        modes where the automatic solver failed)
+
+    Returns
+    -------
+    results : ndarray
+        Array of density matrices for each k and time, shape (N_k, 2, 2, N_t)
+    """
+    ckpt = None
+    if checkpoint is not None:
+        # Everything that changes the per-mode results, retries included, so a
+        # restart with different settings cannot resume incompatible modes
+        meta = {"t_eval": np.asarray(t_eval, dtype=float).tolist(), "params": params,
+                "solver": solver, "settings": SOLVER_SETTINGS, "retry": list(retry)}
+        ckpt = Checkpoint(checkpoint, np.asarray(k_vals, dtype=float), meta, every=checkpoint_every)
+
+    results = np.empty((len(k_vals), 2, 2, len(t_eval)), dtype=complex)
+    indices = range(len(k_vals))
+    if ckpt is not None and "rho" in ckpt.arrays:
+        results[ckpt.done] = ckpt.arrays["rho"][ckpt.done]
+        indices = ckpt.pending()
+
+    i = k = None
+    try:
+        reporter = make_reporter(progress, len(indices))
+
+        for i in indices:
+            k = k_vals[i]
+            if solver == "auto":
+                results[i], info = _solve_mode_auto(k, t_eval, params, retry)
+            else:
+                # Solve von Neumann equation for this k
+                sol, attempt = _solve_with_retry(k, t_eval, params, retry)
+                # Reshape solution back to density matrix format
+                results[i] = sol.y.reshape(2, 2, -1)
+                info = {"solver": "reference", "nfev": sol.nfev, "njev": sol.njev, "nlu": sol.nlu,
+                        "status": sol.status, "attempt": attempt}
+
+            if instrumentation is not None:
+                instrumentation.record_solver(info)
+            if reporter is not None:
+                reporter.update(k=float(k), **info)
+            if metadata is not None:
+                metadata.setdefault("modes", []).append(dict(info, k=float(k)))
+            if ckpt is not None:
+                ckpt.update(i, rho=results[i], solver=MODE_SOLVERS.index(info["solver"]),
+                            attempt=info.get("attempt", 0))
+
+        if ckpt is not None:
+            ckpt.save()
+        return results
+
+    except Exception as e:
+        where = f"at k-index {i}, k = {k:.2e}" if i is not None else "before the first mode"
+        print(f"Computation failed {where}: {str(e)}")
+        if ckpt is not None:
+            ckpt.save()
+        raise
+
+
+def entanglement_entropy(rho):
+    """
+    Photon/dark-photon mode entanglement entropy along a trajectory.
+
+    A single quantum shared between the photon and dark-photon modes,
+    sqrt(1 - P)|1_gamma 0_A'> + sqrt(P)|0_gamma 1_A'>, has reduced photon
+    state diag(1 - P, P), so S = -P ln P - (1 - P) ln(1 - P) with maximum
+    ln 2 at equal mixing.
+
+    Parameters
+    ----------
+    rho : ndarray
+        Density matrices of shape (..., 2, 2, N_t), as returned by ``compute_rho``
+
+    Returns
+    -------
+    S : ndarray
+        Entropy of shape (..., N_t)
+    """
+    p = np.clip(np.real(rho[..., 1, 1, :]) / np.real(rho[..., 0, 0, :] + rho[..., 1, 1, :]), 0, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = -p * np.log(p) - (1 - p) * np.log(1 - p)
+    return np.nan_to_num(terms)
+
+
+def von_neumann_entropy(rho, cutoff=1e-12):
+    """
+    Von Neumann entropy -Tr(rho ln rho) of a stack of density matrices.
+
+    Zero for the pure states of unitary evolution; non-zero once decoherence
+    mixes the photon-dark photon state.
+
+    Parameters
+    ----------
+    rho : ndarray
+        Density matrices of shape (..., n, n, N_t)
+    cutoff : float
+        Eigenvalues below this are treated as numerical zeros
+
+    Returns
+    -------
+    S : ndarray
+        Entropy of shape (..., N_t)
+    """
+    rho = np.moveaxis(rho, -1, -3)
+    rho = rho / np.trace(rho, axis1=-2, axis2=-1)[..., None, None]
+    w = np.linalg.eigvalsh(rho)
+    w = np.where(w > cutoff, w, 1.0)
+    return -np.sum(w * np.log(w), axis=-1)
@@ -0,0 +1,64 @@
+"""
+Precision policy for scanners and analytic propagators.
+
+``'float64'`` (the default everywhere) keeps complex128 results;
+``'float32'`` runs the bulk arithmetic in float32/complex64, halving
+memory traffic for exploratory maps that only feed contour plots.
+Per-cell coefficients are still formed in float64 where the ultralight
+mass scales would underflow float32, so only the large broadcast arrays
+are reduced. ``subsample_check`` measures what the reduced precision
+cost on a random subsample against float64.
+"""
+
+import numpy as np
+
+PRECISIONS = {
+    "float64": (np.float64, np.complex128),
+    "float32": (np.float32, np.complex64),
+}
+
+
+def dtypes(precision):
+    """(real, complex) dtypes of a precision name."""
+    try:
+        return PRECISIONS[precision]
+    except KeyError:
+        raise ValueError(f"Unknown precision '{precision}', expected one of {sorted(PRECISIONS)}")
+
+
+def subsample_check(fast, reference_at, n_samples=256, rng=None, precision="float32"):
+    """
+    Compare a reduced-precision result with float64 on a random subsample.
+
+    Parameters
+    ----------
+    fast : ndarray
+        Result computed at reduced precision
+    reference_at : callable
+        ``reference_at(index)`` returning float64 values at the tuple of
+        index arrays ``index`` (as from ``np.unravel_index``)
+    n_samples : int
+        Number of elements checked
+    rng : numpy.random.Generator, optional
+        Source of the subsample
+    precision : str
+        Recorded in the report
+
+    Returns
+    -------
+    report : dict
+        ``precision``, ``n_samples``, ``max_abs_error`` and ``max_rel_error``
+    """
+    rng = rng or np.random.default_rng()
+    flat = rng.choice(fast.size, size=min(n_samples, fast.size), replace=False)
+    index = np.unravel_index(flat, fast.shape)
+    reference = np.asarray(reference_at(index))
+    error = np.abs(fast[index].astype(reference.dtype) - reference)
+    scale = np.abs(reference)
+    rel = np.divide(error, scale, out=np.zeros_like(error, dtype=float), where=scale > 0)
+    return {
+        "precision": precision,
+        "n_samples": int(len(flat)),
+        "max_abs_error": float(error.max()) if len(flat) else 0.0,
+        "max_rel_error": float(rel.max()) if len(flat) else 0.0,
+    }
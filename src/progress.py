@@ -0,0 +1,147 @@
+"""
+Throttled progress and throughput reporting for long per-mode loops.
+
+A ``ProgressReporter`` counts completed work items, accumulates solver
+counters and hands a record (done, total, rate, ETA, last and cumulative
+stats) to a sink whenever the throttle allows. A sink is any callable
+taking that dict; ``print_sink``, ``logging_sink`` and ``jsonl_sink``
+cover stdout, a logger and a JSON-lines file. Loops that are not given a
+reporter skip the bookkeeping entirely.
+"""
+
+import json
+import logging
+import os
+import time
+
+# Stats summed over all updates; everything else is reported as the last value
+COUNTERS = ("nfev", "njev", "nlu", "nsteps", "nrejected")
+
+
+def print_sink(record):
+    """Print one line per record, in the style of the legacy progress output."""
+    eta = f"{record['eta']:.0f} s" if record["eta"] is not None else "?"
+    line = (f"Progress: {record['done']}/{record['total']} "
+            f"({record['rate']:.3g} {record['unit']}/s, ETA {eta}")
+    if "k" in record["last"]:
+        line += f", k = {record['last']['k']:.2e}"
+    if "nfev" in record["last"]:
+        line += f", nfev {record['last']['nfev']}"
+    print(line + ")")
+
+
+def logging_sink(logger=None, level=logging.INFO):
+    """Sink that logs each record through ``logger`` (default: this module's)."""
+    logger = logger or logging.getLogger(__name__)
+
+    def sink(record):
+        logger.log(level, "%d/%d %s done, %.3g %s/s, ETA %s, totals %s",
+                   record["done"], record["total"], record["unit"], record["rate"],
+                   record["unit"], "?" if record["eta"] is None else f"{record['eta']:.0f} s",
+                   record["totals"])
+    return sink
+
+
+def jsonl_sink(path):
+    """Sink that appends each record as a JSON line to ``path``."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def sink(record):
+        with open(path, "a") as fh:
+            fh.write(json.dumps(record, default=float) + "\n")
+    return sink
+
+
+class ProgressReporter:
+    """
+    Rate, ETA and solver statistics for a loop over ``total`` items.
+
+    Parameters
+    ----------
+    total : int
+        Number of work items
+    sink : callable, optional
+        Receives each emitted record; defaults to ``print_sink``
+    min_interval : float
+        Minimum wall time [s] between records
+    every : int, optional
+        Also emit after every ``every`` items, regardless of time
+    unit : str
+        Name of a work item
+    clock : callable
+        Monotonic time source, replaceable in tests
+    """
+
+    def __init__(self, total, sink=None, min_interval=1.0, every=None, unit="modes",
+                 clock=time.monotonic):
+        self.total = total
+        self.sink = sink or print_sink
+        self.min_interval = min_interval
+        self.every = every
+        self.unit = unit
+        self.clock = clock
+        self.done = 0
+        self.last = {}
+        self.totals = {}
+        self.start = clock()
+        self._last_emit = self.start
+
+    def update(self, n=1, **stats):
+        """Mark ``n`` items done; ``stats`` are that item's solver statistics."""
+        self.done += n
+        self.last = stats
+        for key in COUNTERS:
+            if key in stats:
+                self.totals[key] = self.totals.get(key, 0) + int(stats[key])
+
+        now = self.clock()
+        if (self.done >= self.total
+                or now - self._last_emit >= self.min_interval
+                or (self.every and self.done % self.every == 0)):
+            self._last_emit = now
+            self.sink(self.record(now))
+
+    def record(self, now=None):
+        """Current progress as a dict."""
+        elapsed = (self.clock() if now is None else now) - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - self.done
+        return {
+            "done": self.done,
+            "total": self.total,
+            "unit": self.unit,
+            "elapsed": elapsed,
+            "rate": rate,
+            "eta": remaining / rate if rate > 0 else None,
+            "last": dict(self.last),
+            "totals": dict(self.totals),
+        }
+
+
+def make_reporter(progress, total, **kwargs):
+    """
+    Normalise a ``progress`` argument into a reporter or None.
+
+    Parameters
+    ----------
+    progress : None, False, callable or ProgressReporter
+        False disables reporting, None gives about ten printed updates, a
+        callable is used as the sink and a reporter is used as is
+    total : int
+        Number of work items
+    **kwargs
+        Passed to ``ProgressReporter`` when one is created
+
+    Returns
+    -------
+    reporter : ProgressReporter or None
+    """
+    if progress is False:
+        return None
+    if isinstance(progress, ProgressReporter):
+        return progress
+    if progress is None:
+        kwargs.setdefault("every", max(1, total // 10))
+        kwargs.setdefault("min_interval", float("inf"))
+        return ProgressReporter(total, **kwargs)
+    return ProgressReporter(total, sink=progress, **kwargs)
@@ -0,0 +1,139 @@
+"""
+Tiled multi-resolution pyramids for entanglement maps and raw images.
+
+Level 0 is the full-resolution image; each further level halves both
+axes by 2x2 block averaging (``display.block_reduce``) until the image
+fits in a single tile. Every level is cut into fixed-size PNG tiles
+(edge tiles padded transparent) for viewing and stored as a ``.npy``
+array for analysis, so overviews, zoomed regions and cross-cluster
+comparisons read only the level they need:
+
+    <out_dir>/index.json
+    <out_dir>/<level>/<row>_<col>.png
+    <out_dir>/<level>.npy
+
+Tiles are display oriented: with ``origin='lower'`` (as the maps are
+plotted) tile row 0 is the top of the image, i.e. the last array rows.
+"""
+
+import json
+import os
+
+import matplotlib
+import numpy as np
+from matplotlib import pyplot as plt
+
+from display import block_reduce
+
+INDEX = "index.json"
+
+
+def pyramid_levels(image, tile_size=256, func=np.nanmean):
+    """Full-resolution image followed by 2x reductions down to one tile."""
+    levels = [np.asarray(image, dtype=float)]
+    while max(levels[-1].shape) > tile_size:
+        levels.append(block_reduce(levels[-1], 2, func))
+    return levels
+
+
+def build_pyramid(image, out_dir, tile_size=256, cmap="viridis", clip=(0.0, 100.0), origin="lower",
+                  func=np.nanmean, metadata=None):
+    """
+    Write a tiled pyramid of a 2-D image and its index.
+
+    Parameters
+    ----------
+    image : array_like
+        2-D map; NaNs are transparent in the tiles
+    out_dir : str
+        Pyramid directory
+    tile_size : int
+        Tile edge in pixels
+    cmap : str
+        Colormap of the PNG tiles
+    clip : (float, float)
+        Percentiles of the full image mapped to the ends of the colormap
+    origin : {'lower', 'upper'}
+        Where array row 0 is displayed
+    func : callable
+        NaN-aware block reducer
+    metadata : dict, optional
+        Extra JSON-serialisable entries for the index
+
+    Returns
+    -------
+    index : dict
+        Contents of ``index.json``
+    """
+    image = np.asarray(image, dtype=float)
+    if image.ndim != 2:
+        raise ValueError(f"Expected a 2-D image, got shape {image.shape}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    finite = image[np.isfinite(image)]
+    vmin, vmax = np.percentile(finite, clip) if finite.size else (0.0, 1.0)
+    colormap = matplotlib.colormaps[cmap].with_extremes(bad=(0, 0, 0, 0))
+    norm = matplotlib.colors.Normalize(vmin=vmin, vmax=vmax)
+
+    index = {
+        "shape": list(image.shape),
+        "tile_size": tile_size,
+        "origin": origin,
+        "cmap": cmap,
+        "vmin": float(vmin),
+        "vmax": float(vmax),
+        "levels": [],
+        **(metadata or {}),
+    }
+    for level, data in enumerate(pyramid_levels(image, tile_size, func)):
+        np.save(os.path.join(out_dir, f"{level}.npy"), data)
+        shown = data[::-1] if origin == "lower" else data
+        n_rows, n_cols = -(-shown.shape[0] // tile_size), -(-shown.shape[1] // tile_size)
+
+        # Colourised one tile at a time, so only a tile's RGBA is in memory
+        level_dir = os.path.join(out_dir, str(level))
+        os.makedirs(level_dir, exist_ok=True)
+        tile = np.empty((tile_size, tile_size))
+        for row in range(n_rows):
+            for col in range(n_cols):
+                block = shown[row * tile_size:(row + 1) * tile_size, col * tile_size:(col + 1) * tile_size]
+                tile.fill(np.nan)
+                tile[:block.shape[0], :block.shape[1]] = block
+                rgba = colormap(norm(np.ma.masked_invalid(tile)), bytes=True)
+                plt.imsave(os.path.join(level_dir, f"{row}_{col}.png"), rgba)
+        index["levels"].append({
+            "level": level,
+            "factor": 2**level,
+            "shape": list(data.shape),
+            "rows": n_rows,
+            "cols": n_cols,
+        })
+
+    with open(os.path.join(out_dir, INDEX), "w") as fh:
+        json.dump(index, fh, indent=2)
+    return index
+
+
+def load_index(pyramid_dir):
+    """Read a pyramid's ``index.json``."""
+    with open(os.path.join(pyramid_dir, INDEX)) as fh:
+        return json.load(fh)
+
+
+def select_level(index, max_size):
+    """Finest level whose larger axis is at most ``max_size`` pixels."""
+    for entry in index["levels"]:
+        if max(entry["shape"]) <= max_size:
+            return entry["level"]
+    return index["levels"][-1]["level"]
+
+
+def read_region(pyramid_dir, level, rows=slice(None), cols=slice(None)):
+    """
+    Data of a level, or of a region of it, without loading the rest.
+
+    ``rows`` and ``cols`` are slices in that level's array coordinates;
+    full-resolution coordinates map to level ``n`` by dividing by ``2**n``.
+    """
+    data = np.load(os.path.join(pyramid_dir, f"{level}.npy"), mmap_mode="r")
+    return np.array(data[rows, cols])
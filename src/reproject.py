@@ -0,0 +1,336 @@
+"""
+Reprojection of images onto a common sky grid with cached pixel maps.
+
+Reprojecting an image means finding, for every pixel of the target grid,
+the input pixel that sees the same sky position: target pixel -> world
+(RA, Dec) -> input pixel. That mapping depends only on the two WCS, not
+on the image, so it is computed once per (input WCS, target grid) pair,
+stored on disk and applied to every band and epoch sharing that WCS.
+Applying a cached map is a bilinear gather, far cheaper than the
+spherical trigonometry that produced it.
+
+WCS transforms use ``astropy.wcs`` when astropy is installed (any
+projection and distortion it supports); otherwise a built-in gnomonic
+(TAN) projection reads CRVAL/CRPIX and CD or CDELT/PC from the header.
+Both the mapping and its application run over row tiles in a thread
+pool, as NumPy releases the GIL inside its array loops.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    from astropy.wcs import WCS
+    HAVE_ASTROPY = True
+except ImportError:
+    WCS = None
+    HAVE_ASTROPY = False
+
+logger = logging.getLogger(__name__)
+
+WCS_KEYWORDS = ("NAXIS1", "NAXIS2", "CTYPE1", "CTYPE2", "CRVAL1", "CRVAL2", "CRPIX1", "CRPIX2",
+                "CD1_1", "CD1_2", "CD2_1", "CD2_2", "CDELT1", "CDELT2",
+                "PC1_1", "PC1_2", "PC2_1", "PC2_2", "LONPOLE", "LATPOLE", "A_ORDER", "B_ORDER")
+
+
+class TanWCS:
+    """
+    Gnomonic (TAN) celestial WCS from FITS header keywords.
+
+    Pixel coordinates are 0-based; world coordinates are degrees.
+    """
+
+    def __init__(self, header):
+        for axis in ("CTYPE1", "CTYPE2"):
+            if not str(header.get(axis, "")).endswith("TAN"):
+                raise ValueError(f"Only TAN projections are supported without astropy, got {axis}="
+                                 f"{header.get(axis)!r}")
+        self.crval = np.radians([float(header["CRVAL1"]), float(header["CRVAL2"])])
+        self.crpix = np.array([float(header["CRPIX1"]), float(header["CRPIX2"])]) - 1
+        if "CD1_1" in header:
+            cd = [[header.get("CD1_1", 0.0), header.get("CD1_2", 0.0)],
+                  [header.get("CD2_1", 0.0), header.get("CD2_2", 0.0)]]
+        else:
+            pc = np.array([[header.get("PC1_1", 1.0), header.get("PC1_2", 0.0)],
+                           [header.get("PC2_1", 0.0), header.get("PC2_2", 1.0)]])
+            cd = np.diag([header["CDELT1"], header["CDELT2"]]) @ pc
+        self.cd = np.radians(np.asarray(cd, dtype=float))
+        self.cd_inv = np.linalg.inv(self.cd)
+
+    def pixel_to_world(self, x, y):
+        ra0, dec0 = self.crval
+        u, v = np.asarray(x) - self.crpix[0], np.asarray(y) - self.crpix[1]
+        xi = self.cd[0, 0] * u + self.cd[0, 1] * v
+        eta = self.cd[1, 0] * u + self.cd[1, 1] * v
+        denom = np.cos(dec0) - eta * np.sin(dec0)
+        ra = ra0 + np.arctan2(xi, denom)
+        dec = np.arctan2(eta * np.cos(dec0) + np.sin(dec0), np.hypot(xi, denom))
+        return np.degrees(ra) % 360.0, np.degrees(dec)
+
+    def world_to_pixel(self, ra, dec):
+        ra0, dec0 = self.crval
+        ra, dec = np.radians(ra), np.radians(dec)
+        dra = ra - ra0
+        cos_c = np.sin(dec0) * np.sin(dec) + np.cos(dec0) * np.cos(dec) * np.cos(dra)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            xi = np.where(cos_c > 0, np.cos(dec) * np.sin(dra) / cos_c, np.nan)
+            eta = np.where(cos_c > 0, (np.cos(dec0) * np.sin(dec) - np.sin(dec0) * np.cos(dec) * np.cos(dra))
+                           / cos_c, np.nan)
+        u = self.cd_inv[0, 0] * xi + self.cd_inv[0, 1] * eta
+        v = self.cd_inv[1, 0] * xi + self.cd_inv[1, 1] * eta
+        return u + self.crpix[0], v + self.crpix[1]
+
+
+class _AstropyWCS:
+    # Same interface as TanWCS over astropy.wcs.WCS
+    def __init__(self, header):
+        self.wcs = WCS(header).celestial
+
+    def pixel_to_world(self, x, y):
+        return self.wcs.all_pix2world(x, y, 0)
+
+    def world_to_pixel(self, ra, dec):
+        return self.wcs.all_world2pix(ra, dec, 0)
+
+
+def make_wcs(header):
+    """WCS with ``pixel_to_world``/``world_to_pixel``, via astropy if installed."""
+    return _AstropyWCS(header) if HAVE_ASTROPY else TanWCS(header)
+
+
+def wcs_key(header):
+    """Hash identifying the WCS of a header (SIP distortion coefficients included)."""
+    entries = {k: header[k] for k in WCS_KEYWORDS if k in header}
+    entries.update({k: header[k] for k in header if str(k)[:2] in ("A_", "B_", "AP", "BP")})
+    text = json.dumps({k: str(v) for k, v in entries.items()}, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def target_grid(ra, dec, shape, pixel_scale):
+    """
+    Header of a north-up TAN grid centred on (ra, dec).
+
+    Parameters
+    ----------
+    ra, dec : float
+        Centre [deg]
+    shape : (int, int)
+        (rows, columns)
+    pixel_scale : float
+        Pixel size [arcsec]
+    """
+    scale = pixel_scale / 3600.0
+    return {
+        "NAXIS1": int(shape[1]), "NAXIS2": int(shape[0]),
+        "CTYPE1": "RA---TAN", "CTYPE2": "DEC--TAN",
+        "CRVAL1": float(ra), "CRVAL2": float(dec),
+        "CRPIX1": (shape[1] + 1) / 2.0, "CRPIX2": (shape[0] + 1) / 2.0,
+        "CD1_1": -scale, "CD1_2": 0.0, "CD2_1": 0.0, "CD2_2": scale,
+    }
+
+
+def footprint_centre(headers):
+    """
+    Sky position midway between the centres of several images.
+
+    Parameters
+    ----------
+    headers : iterable of header
+        Image headers with NAXIS1/NAXIS2 and a celestial WCS
+
+    Returns
+    -------
+    ra, dec : float
+        [deg], the normalised mean of the centres' unit vectors
+    """
+    vectors = []
+    for header in headers:
+        ra, dec = make_wcs(header).pixel_to_world((header["NAXIS1"] - 1) / 2.0,
+                                                  (header["NAXIS2"] - 1) / 2.0)
+        ra, dec = np.radians(float(ra)), np.radians(float(dec))
+        vectors.append([np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)])
+    x, y, z = np.mean(vectors, axis=0)
+    return float(np.degrees(np.arctan2(y, x)) % 360.0), float(np.degrees(np.arctan2(z, np.hypot(x, y))))
+
+
+def footprint_cutout(image, header):
+    """
+    Crop an image on a grid to the bounding box of its finite pixels.
+
+    Parameters
+    ----------
+    image : ndarray
+        Image on the grid of ``header``, NaN outside the footprint (as
+        returned by ``apply_mapping``)
+    header : dict
+        Grid, e.g. from ``target_grid``
+
+    Returns
+    -------
+    cutout : ndarray or None
+        The cropped image, None if no pixel is finite
+    cutout_header : dict or None
+        ``header`` with NAXIS and CRPIX shifted so the cutout stays on the
+        same grid
+    """
+    finite = np.isfinite(image)
+    rows, cols = np.flatnonzero(finite.any(axis=1)), np.flatnonzero(finite.any(axis=0))
+    if rows.size == 0:
+        return None, None
+    r0, r1, c0, c1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+    cutout_header = dict(header, NAXIS1=int(c1 - c0), NAXIS2=int(r1 - r0),
+                         CRPIX1=header["CRPIX1"] - c0, CRPIX2=header["CRPIX2"] - r0)
+    return image[r0:r1, c0:c1], cutout_header
+
+
+def _row_tiles(n_rows, tile):
+    return [(r, min(r + tile, n_rows)) for r in range(0, n_rows, tile)]
+
+
+def compute_mapping(input_header, target_header, tile=512, workers=None):
+    """
+    Input-pixel coordinates of every target pixel.
+
+    Returns
+    -------
+    mapping : dict
+        ``x`` and ``y`` (float32, target shape), NaN where the target pixel
+        has no counterpart on the input projection
+    """
+    src, dst = make_wcs(input_header), make_wcs(target_header)
+    ny, nx = int(target_header["NAXIS2"]), int(target_header["NAXIS1"])
+    x = np.empty((ny, nx), dtype=np.float32)
+    y = np.empty((ny, nx), dtype=np.float32)
+
+    def work(rows):
+        yy, xx = np.mgrid[rows[0]:rows[1], 0:nx]
+        ra, dec = dst.pixel_to_world(xx.astype(float), yy.astype(float))
+        x[rows[0]:rows[1]], y[rows[0]:rows[1]] = src.world_to_pixel(ra, dec)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(work, _row_tiles(ny, tile)))
+    return {"x": x, "y": y}
+
+
+class MappingCache:
+    """
+    On-disk cache of pixel maps keyed by (input WCS, target grid).
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory for the ``.npz`` maps
+    tile, workers : int
+        Passed to ``compute_mapping``
+    """
+
+    def __init__(self, cache_dir, tile=512, workers=None):
+        self.cache_dir = cache_dir
+        self.tile = tile
+        self.workers = workers
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, input_header, target_header):
+        """Cached pixel map of ``input_header`` onto ``target_header``."""
+        path = os.path.join(self.cache_dir, f"{wcs_key(input_header)}-{wcs_key(target_header)}.npz")
+        if os.path.exists(path):
+            self.hits += 1
+            with np.load(path) as cached:
+                return {"x": cached["x"], "y": cached["y"]}
+        self.misses += 1
+        mapping = compute_mapping(input_header, target_header, self.tile, self.workers)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, **mapping)
+        os.replace(tmp, path)
+        logger.info("Computed pixel map %s", os.path.basename(path))
+        return mapping
+
+
+def apply_mapping(image, mapping, order=1, fill=np.nan, tile=512, workers=None):
+    """
+    Resample an image through a pixel map.
+
+    Parameters
+    ----------
+    image : array_like
+        2-D input image
+    mapping : dict
+        ``x``, ``y`` from ``compute_mapping`` / ``MappingCache.get``
+    order : {0, 1}
+        Nearest-neighbour or bilinear interpolation
+    fill : float
+        Value of target pixels outside the input image
+
+    Returns
+    -------
+    out : ndarray
+        Image on the target grid
+    """
+    image = np.asarray(image, dtype=float)
+    ny_in, nx_in = image.shape
+    flat = image.ravel()
+    out = np.empty(mapping["x"].shape)
+
+    def work(rows):
+        x = mapping["x"][rows[0]:rows[1]].astype(float)
+        y = mapping["y"][rows[0]:rows[1]].astype(float)
+        inside = (x > -0.5) & (x < nx_in - 0.5) & (y > -0.5) & (y < ny_in - 0.5)
+        x, y = np.where(inside, x, 0.0), np.where(inside, y, 0.0)
+        if order == 0:
+            values = flat.take(np.rint(y).astype(np.intp) * nx_in + np.rint(x).astype(np.intp))
+        else:
+            x0 = np.clip(np.floor(x), 0, max(nx_in - 2, 0))
+            y0 = np.clip(np.floor(y), 0, max(ny_in - 2, 0))
+            fx, fy = np.clip(x - x0, 0, 1), np.clip(y - y0, 0, 1)
+            i00 = y0.astype(np.intp) * nx_in + x0.astype(np.intp)
+            dx, dy = int(nx_in > 1), nx_in if ny_in > 1 else 0
+            top = flat.take(i00) + fx * (flat.take(i00 + dx) - flat.take(i00))
+            bottom = flat.take(i00 + dy) + fx * (flat.take(i00 + dy + dx) - flat.take(i00 + dy))
+            values = top + fy * (bottom - top)
+        out[rows[0]:rows[1]] = np.where(inside, values, fill)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(work, _row_tiles(out.shape[0], tile)))
+    return out
+
+
+def reproject_images(images, target_header, cache, order=1, out=None):
+    """
+    Reproject (image, header) pairs onto a common grid.
+
+    Images sharing a WCS reuse one cached pixel map. ``images`` is
+    consumed one pair at a time, so with a generator and a memory-mapped
+    ``out`` only one exposure is in memory.
+
+    Parameters
+    ----------
+    images : iterable of (array_like, header)
+        Input images and their headers
+    target_header : dict
+        Target grid, e.g. from ``target_grid``
+    cache : MappingCache
+        Pixel-map cache
+    order : {0, 1}
+        Interpolation order
+    out : array_like, optional
+        (N_images, rows, columns) array to fill, e.g. from
+        ``np.lib.format.open_memmap``; default a new array
+
+    Returns
+    -------
+    stack : ndarray
+        (N_images, rows, columns) on the target grid (``out`` if given)
+    """
+    if out is None:
+        return np.stack([apply_mapping(image, cache.get(header, target_header), order,
+                                       workers=cache.workers) for image, header in images])
+    for i, (image, header) in enumerate(images):
+        out[i] = apply_mapping(image, cache.get(header, target_header), order, workers=cache.workers)
+    return out
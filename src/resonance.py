@@ -0,0 +1,295 @@
+"""
+Landau-Zener fast path for resonant photon-dark photon conversion.
+
+When the plasma mass sweeps through the dark-photon mass the diagonal
+entries of the mixing Hamiltonian cross and conversion happens in a narrow
+window around the crossing. Away from it the evolution is adiabatic: each
+instantaneous eigenstate only accumulates its dynamic phase. The hybrid
+mode below propagates adiabatically between crossings and applies the
+analytic Landau-Zener transition matrix at each crossing, so the cost is
+independent of how many oscillations the mode goes through. Modes for
+which the approximation is not justified fall back to full integration
+with ``magnus_evolve``.
+"""
+
+import numpy as np
+from scipy.optimize import brentq
+from scipy.special import loggamma
+
+from evolution import PHOTON_STATE, background_hamiltonian, background_mode_hamiltonian, magnus_evolve
+
+# 8-point Gauss-Legendre rule on [0, 1] for the dynamic phase integrals
+_GL_X, _GL_W = np.polynomial.legendre.leggauss(8)
+_GL_X = 0.5 * (_GL_X + 1)
+_GL_W = 0.5 * _GL_W
+
+
+def stokes_phase(delta):
+    """Stokes phase pi/4 + delta (ln delta - 1) + arg Gamma(1 - i delta)."""
+    delta = np.asarray(delta, dtype=float)
+    return np.pi / 4 + delta * (np.log(delta) - 1) + np.imag(loggamma(1 - 1j * delta))
+
+
+def landau_zener_matrix(coupling, sweep_rate):
+    """
+    Landau-Zener transition matrix in the adiabatic basis (lower, upper).
+
+    For a crossing of H00 - H11 with slope ``sweep_rate`` and off-diagonal
+    element ``coupling`` the non-adiabatic (diabatic) transition probability
+    is P = exp(-2 pi delta), delta = coupling^2 / |sweep_rate|. Dynamic
+    phases are referenced to the crossing time.
+
+    Parameters
+    ----------
+    coupling : float
+        Off-diagonal element H01 at the crossing
+    sweep_rate : float
+        d(H00 - H11)/dt at the crossing
+
+    Returns
+    -------
+    N : ndarray
+        2x2 unitary matrix acting on adiabatic-basis amplitudes
+    P : float
+        Diabatic transition probability
+    """
+    delta = coupling**2 / abs(sweep_rate)
+    P = np.exp(-2 * np.pi * delta)
+    phase = np.exp(1j * stokes_phase(delta)) if delta > 0 else 1.0
+    s = np.sign(sweep_rate) * (np.sign(coupling) or 1.0)
+    N = np.array([[np.sqrt(1 - P) * phase, -s * np.sqrt(P)],
+                  [s * np.sqrt(P), np.sqrt(1 - P) * np.conj(phase)]])
+    return N, P
+
+
+def _adiabatic_frame(H):
+    """Mixing angle, eigenvalues and (lower, upper) eigenvectors of real 2x2 H."""
+    h00, h11, h01 = H[..., 0, 0].real, H[..., 1, 1].real, H[..., 0, 1].real
+    theta = 0.5 * np.arctan2(2 * h01, h11 - h00)
+    mean = 0.5 * (h00 + h11)
+    half_gap = np.sqrt((0.5 * (h00 - h11))**2 + h01**2)
+    c, s = np.cos(theta), np.sin(theta)
+    # Columns are v_- = (cos, -sin) and v_+ = (sin, cos)
+    V = np.stack([np.stack([c, s], axis=-1), np.stack([-s, c], axis=-1)], axis=-2)
+    return theta, mean - half_gap, mean + half_gap, V
+
+
+def hybrid_evolve(hamiltonian, psi0, t_eval, n_scan=2048, width=5.0, lz_tol=0.1,
+                  adiabatic_tol=0.02, mode_hamiltonian=None, **full_kwargs):
+    """
+    Evolve with Landau-Zener jumps and adiabatic propagation, falling back per mode.
+
+    A mode is handled analytically only if all validity criteria hold:
+
+    - every crossing of H00 - H11 is locally linear over the Landau-Zener
+      jump time tau = max(|H01| / |alpha|, 1 / sqrt|alpha|), i.e.
+      |d^2(H00 - H11)/dt^2| tau / |alpha| < ``lz_tol``, with nearly
+      constant coupling, |dH01/dt| tau / |H01| < ``lz_tol``;
+    - transition windows lie inside the time span and do not overlap;
+    - outside the windows the adiabaticity parameter
+      |d(theta)/dt| / (E_+ - E_-) stays below ``adiabatic_tol``;
+    - H is real symmetric.
+
+    tau is the jump time in the adiabatic and diabatic limits; the transition
+    window has half-width ``width`` * tau. Outputs falling inside a window
+    are given by the sudden-jump approximation and are only indicative.
+
+    Parameters
+    ----------
+    hamiltonian : callable
+        ``hamiltonian(t)`` returning real symmetric matrices of shape (N, 2, 2)
+    psi0 : array_like
+        Initial states, shape (N, 2)
+    t_eval : array_like
+        Increasing output times
+    n_scan : int
+        Number of scan points used to locate crossings and check validity
+    width : float
+        Transition window half-width in units of the jump time
+    lz_tol, adiabatic_tol : float
+        Validity thresholds described above
+    mode_hamiltonian : callable, optional
+        ``mode_hamiltonian(t, modes)`` returning H for mode indices ``modes``
+        at times ``t`` (broadcast together). When given, the scan grid and
+        quadrature nodes are evaluated in single vectorised calls and each
+        crossing is refined on its own mode only, so locating crossings
+        costs O(N) instead of O(N^2); otherwise ``hamiltonian`` is called
+        once per time
+    **full_kwargs
+        Passed to ``magnus_evolve`` for fallback modes
+
+    Returns
+    -------
+    psi : ndarray
+        States of shape (N, 2, len(t_eval))
+    stats : dict
+        ``crossings`` and ``transition_probability`` (per-mode arrays),
+        ``fallback`` (bool per mode) and ``nfev`` (Hamiltonian evaluations
+        in units of all-mode calls, including any fallback integration)
+    """
+    t_eval = np.asarray(t_eval, dtype=float)
+    psi0 = np.array(psi0, dtype=complex)
+    t0, t1 = t_eval[0], t_eval[-1]
+    n_modes = psi0.shape[0]
+
+    all_modes = np.arange(n_modes)
+    calls = [0.0]
+
+    def on_grid(times):
+        # H of all modes at each time, shape (len(times), N, 2, 2)
+        calls[0] += len(times)
+        if mode_hamiltonian is None:
+            return np.array([hamiltonian(t) for t in times])
+        return mode_hamiltonian(np.asarray(times)[:, None], all_modes[None, :])
+
+    def one_mode(t, i):
+        if mode_hamiltonian is None:
+            calls[0] += 1
+            return hamiltonian(t)[i]
+        calls[0] += 1 / n_modes
+        return mode_hamiltonian(t, i)
+
+    scan = np.geomspace(t0, t1, n_scan) if t0 > 0 else np.linspace(t0, t1, n_scan)
+    grid = np.union1d(scan, t_eval)
+    H_grid = on_grid(grid)
+
+    theta, E_lo, E_hi, _ = _adiabatic_frame(H_grid)
+    diff = (H_grid[..., 0, 0] - H_grid[..., 1, 1]).real
+    side = np.where(diff >= 0, 1, -1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        adiabaticity = np.abs(np.gradient(theta, grid, axis=0)) / (E_hi - E_lo)
+    is_real = np.all(np.abs(H_grid.imag) <= 1e-12 * np.abs(H_grid).max(), axis=(0, 2, 3))
+
+    crossings = [np.array([]) for _ in range(n_modes)]
+    probabilities = [np.array([]) for _ in range(n_modes)]
+    jumps = [[] for _ in range(n_modes)]
+    fallback = ~is_real
+
+    # Brackets come from sign changes of H00 - H11 on the grid for all modes
+    # at once; each is refined on its own mode only
+    for i in np.flatnonzero(is_real):
+        def f(t):
+            H = one_mode(t, i)
+            return (H[0, 0] - H[1, 1]).real
+
+        outside = np.ones(len(grid), dtype=bool)
+        windows, tcs, Ps = [], [], []
+        for j in np.flatnonzero(side[:-1, i] != side[1:, i]):
+            tc = brentq(f, grid[j], grid[j + 1], xtol=1e-12 * abs(grid[j + 1]))
+            dt = 1e-3 * (grid[j + 1] - grid[j])
+            Hc, Hp, Hm = one_mode(tc, i), one_mode(tc + dt, i), one_mode(tc - dt, i)
+            d_c, d_plus, d_minus = [(M[0, 0] - M[1, 1]).real for M in (Hc, Hp, Hm)]
+            alpha = (d_plus - d_minus) / (2 * dt)
+            curvature = (d_plus - 2 * d_c + d_minus) / dt**2
+            coupling = Hc[0, 1].real
+            coupling_slope = (Hp[0, 1] - Hm[0, 1]).real / (2 * dt)
+
+            tau = max(abs(coupling) / abs(alpha), 1 / np.sqrt(abs(alpha)))
+            w = width * tau
+            valid = (abs(curvature) * tau / abs(alpha) < lz_tol
+                     and abs(coupling_slope) * tau < lz_tol * abs(coupling)
+                     and tc - w > t0 and tc + w < t1
+                     and (not windows or tc - w > windows[-1][1]))
+            if not valid:
+                fallback[i] = True
+                break
+            N, P = landau_zener_matrix(coupling, alpha)
+            windows.append((tc - w, tc + w))
+            tcs.append(tc)
+            Ps.append(P)
+            jumps[i].append(N)
+            outside &= (grid < tc - w) | (grid > tc + w)
+
+        crossings[i], probabilities[i] = np.array(tcs), np.array(Ps)
+        if not fallback[i] and np.max(adiabaticity[outside, i], initial=0.0) >= adiabatic_tol:
+            fallback[i] = True
+
+    psi = np.empty((n_modes, 2, len(t_eval)), dtype=complex)
+    analytic = np.flatnonzero(~fallback)
+    if len(analytic):
+        psi[analytic] = _adiabatic_impulse(
+            on_grid, psi0, t_eval, grid, H_grid, analytic,
+            [crossings[i] for i in analytic], [jumps[i] for i in analytic])
+    nfev = int(np.ceil(calls[0]))
+
+    if np.any(fallback):
+        idx = np.flatnonzero(fallback)
+        psi[idx], full_stats = magnus_evolve(lambda t: hamiltonian(t)[idx], psi0[idx],
+                                             t_eval, **full_kwargs)
+        nfev += full_stats["nfev"]
+
+    stats = {"crossings": crossings, "transition_probability": probabilities,
+             "fallback": fallback, "nfev": nfev}
+    return psi, stats
+
+
+def _adiabatic_impulse(on_grid, psi0, t_eval, grid, H_grid, modes, crossings, jumps):
+    """Adiabatic propagation with sudden Landau-Zener jumps for the selected modes."""
+    # Dynamic phases Phi_+-(t) = int E_+- dt by Gauss-Legendre on every grid
+    # interval, refined so crossing times are interval endpoints
+    all_tc = np.concatenate(crossings) if crossings else np.array([])
+    nodes_t = np.union1d(grid, all_tc)
+    h = np.diff(nodes_t)
+    quad_t = nodes_t[:-1, None] + h[:, None] * _GL_X
+    H_quad = on_grid(quad_t.ravel())[:, modes]
+    _, E_lo, E_hi, _ = _adiabatic_frame(H_quad)
+    E = np.stack([E_lo, E_hi], axis=-1).reshape(len(h), len(_GL_X), len(modes), 2)
+    increments = np.einsum("q,iqmn->imn", _GL_W, E) * h[:, None, None]
+    Phi = np.concatenate([np.zeros((1, len(modes), 2)), np.cumsum(increments, axis=0)])
+
+    def phase_at(t):
+        return Phi[np.searchsorted(nodes_t, t)]
+
+    _, _, _, V = _adiabatic_frame(H_grid[:, modes])
+    V_out = V[np.searchsorted(grid, t_eval)]
+    Phi_out = phase_at(t_eval)
+
+    psi = np.empty((len(modes), 2, len(t_eval)), dtype=complex)
+    for m, i in enumerate(modes):
+        # Interaction-picture amplitudes b, psi = sum_n b_n exp(-i Phi_n) v_n
+        b = V_out[0, m].T @ psi0[i]
+        segments = [b]
+        for tc, N in zip(crossings[m], jumps[m]):
+            phase = np.exp(-1j * phase_at(tc)[m])
+            b = np.conj(phase) * (N @ (phase * b))
+            segments.append(b)
+        b_out = np.array(segments)[np.searchsorted(crossings[m], t_eval)]
+        c = b_out * np.exp(-1j * Phi_out[:, m])
+        psi[m] = np.einsum("tij,tj->it", V_out[:, m], c)
+
+    return psi
+
+
+def evolve_resonant(k_vals, t_eval, params, history, psi0=None, **kwargs):
+    """
+    Hybrid Landau-Zener evolution of many k modes through an expansion history.
+
+    Parameters
+    ----------
+    k_vals : array_like
+        Comoving momenta [eV]
+    t_eval : array_like
+        Output times [eV^-1]
+    params : dict
+        Physical parameters (``epsilon``, ``m_dark``)
+    history : ExpansionHistory
+        Background providing a(t) and m_p(t)
+    psi0 : array_like, optional
+        Initial state, broadcast over k; defaults to a pure photon
+    **kwargs
+        Passed to ``hybrid_evolve``
+
+    Returns
+    -------
+    psi : ndarray
+        States of shape (N_k, 2, N_t)
+    stats : dict
+        Resonance and fallback statistics from ``hybrid_evolve``
+    """
+    k_vals = np.atleast_1d(np.asarray(k_vals, dtype=float))
+    if psi0 is None:
+        psi0 = PHOTON_STATE
+    psi0 = np.broadcast_to(np.asarray(psi0, dtype=complex), k_vals.shape + (2,))
+    hamiltonian = background_hamiltonian(k_vals, params, history)
+    mode_hamiltonian = background_mode_hamiltonian(k_vals, params, history)
+    return hybrid_evolve(hamiltonian, psi0, t_eval, mode_hamiltonian=mode_hamiltonian, **kwargs)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Script: sharding.py
+Purpose: split parameter sweeps into independent shards and merge them
+
+A sweep is a dict with the work ``items`` (first axis is the sweep axis),
+a ``func`` mapping a slice of items to a dict of arrays whose first axis
+matches the slice, a ``name`` and JSON-serialisable ``meta``. Shard i of
+N covers a fixed index range, so any process or batch job on any node can
+compute it from the same command line. Each shard is written to its own
+``.npz`` file carrying the sweep hash; the merge checks that every shard
+is present, belongs to the same sweep and that the ranges tile the
+sweep exactly before concatenating.
+
+    python src/sharding.py run --sweep compute_rho --shard 0 --n-shards 8 --out shards/
+    ...
+    python src/sharding.py merge --sweep compute_rho --n-shards 8 --out shards/
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def shard_range(n_items, index, n_shards):
+    """
+    Index range [start, stop) of shard ``index`` out of ``n_shards``.
+
+    The first ``n_items % n_shards`` shards get one extra item, so shard
+    sizes differ by at most one.
+    """
+    if not 0 <= index < n_shards:
+        raise ValueError(f"shard index {index} outside 0..{n_shards - 1}")
+    base, extra = divmod(n_items, n_shards)
+    start = index * base + min(index, extra)
+    return start, start + base + (index < extra)
+
+
+def sweep_hash(items, meta):
+    """SHA-256 of the sweep items and metadata, identifying a sweep."""
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(items).tobytes())
+    h.update(json.dumps(meta, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def shard_path(out_dir, name, index, n_shards):
+    return os.path.join(out_dir, f"{name}.shard-{index:05d}-of-{n_shards:05d}.npz")
+
+
+def run_shard(sweep, index, n_shards, out_dir, resume=True):
+    """
+    Compute one shard of a sweep and write it to ``out_dir``.
+
+    With ``resume``, a shard file already written for the same sweep is
+    kept and not recomputed, so rerunning every shard after a crash or
+    preemption only does the missing work.
+
+    Parameters
+    ----------
+    sweep : dict
+        ``name``, ``items``, ``func`` and ``meta``
+    index : int
+        Shard index
+    n_shards : int
+        Total number of shards
+    out_dir : str
+        Directory for shard files
+    resume : bool
+        Skip shards that are already complete
+
+    Returns
+    -------
+    path : str
+        The written shard file
+    """
+    items = np.asarray(sweep["items"])
+    start, stop = shard_range(len(items), index, n_shards)
+    path = shard_path(out_dir, sweep["name"], index, n_shards)
+    if resume and os.path.exists(path):
+        with np.load(path) as shard:
+            if str(shard["sweep_hash"]) == sweep_hash(items, sweep["meta"]):
+                logger.info("Shard %d/%d already complete, skipping", index, n_shards)
+                return path
+
+    arrays = sweep["func"](items[start:stop])
+    for key, value in arrays.items():
+        if np.shape(value)[0] != stop - start:
+            raise ValueError(f"{sweep['name']}: output '{key}' has {np.shape(value)[0]} rows, "
+                             f"expected {stop - start}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, **{f"data_{key}": value for key, value in arrays.items()},
+             start=start, stop=stop, n_items=len(items), n_shards=n_shards,
+             sweep_hash=sweep_hash(items, sweep["meta"]))
+    os.replace(tmp, path)  # a crashed job never leaves a half-written shard
+    logger.info("Wrote shard %d/%d (items %d:%d) to %s", index, n_shards, start, stop, path)
+    return path
+
+
+def merge_shards(sweep, n_shards, out_dir):
+    """
+    Validate and concatenate all shards of a sweep.
+
+    Raises
+    ------
+    FileNotFoundError
+        If any shard file is missing
+    ValueError
+        If a shard belongs to a different sweep or shard layout, or the
+        ranges do not tile the sweep
+
+    Returns
+    -------
+    result : dict
+        Output arrays of the full sweep
+    """
+    items = np.asarray(sweep["items"])
+    expected_hash = sweep_hash(items, sweep["meta"])
+    missing = [i for i in range(n_shards)
+               if not os.path.exists(shard_path(out_dir, sweep["name"], i, n_shards))]
+    if missing:
+        raise FileNotFoundError(f"{sweep['name']}: missing shards {missing}")
+
+    parts = {}
+    for i in range(n_shards):
+        with np.load(shard_path(out_dir, sweep["name"], i, n_shards)) as shard:
+            if str(shard["sweep_hash"]) != expected_hash:
+                raise ValueError(f"shard {i} was computed for a different sweep")
+            if (int(shard["n_items"]), int(shard["n_shards"])) != (len(items), n_shards):
+                raise ValueError(f"shard {i} has a different shard layout")
+            if (int(shard["start"]), int(shard["stop"])) != shard_range(len(items), i, n_shards):
+                raise ValueError(f"shard {i} covers the wrong index range")
+            for key in shard.files:
+                if key.startswith("data_"):
+                    parts.setdefault(key[5:], []).append(shard[key])
+    return {key: np.concatenate(chunks) for key, chunks in parts.items()}
+
+
+def compute_rho_sweep(k_vals, t_eval, params):
+    """Sweep over k modes of ``physics.compute_rho``; output ``rho``."""
+    from physics import SOLVER_SETTINGS, compute_rho
+
+    return {
+        "name": "compute_rho",
+        "items": np.asarray(k_vals, dtype=float),
+        "func": lambda k: {"rho": compute_rho(k, t_eval, params, progress=False)},
+        # Solver settings change the results too, so shards computed with
+        # other tolerances or another method are not resumed or merged
+        "meta": {"t_eval": np.asarray(t_eval, dtype=float).tolist(), "params": params,
+                 "settings": dict(SOLVER_SETTINGS)},
+    }
+
+
+def parameter_space_sweep(couplings, masses, omega=1e-5):
+    """Sweep over couplings of the conversion map; outputs ``conversion`` and ``viable``."""
+    from parameter_space import conversion_map, viable_mask
+
+    return {
+        "name": "parameter_space",
+        "items": np.asarray(couplings, dtype=float),
+        "func": lambda eps: {"conversion": conversion_map(eps, masses, omega),
+                             "viable": viable_mask(eps, masses)},
+        "meta": {"masses": np.asarray(masses, dtype=float).tolist(), "omega": omega},
+    }
+
+
+def build_sweep(args):
+    if args.sweep == "compute_rho":
+        return compute_rho_sweep(np.linspace(args.k_min, args.k_max, args.n_items),
+                                 np.linspace(0, args.t_max, args.n_t),
+                                 {"epsilon": args.epsilon, "m_dark": args.m_dark})
+    return parameter_space_sweep(np.logspace(-11, -4, args.n_items), np.logspace(-26, -18, args.n_items))
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Run or merge sharded parameter sweeps")
+    p.add_argument("action", choices=["run", "merge"])
+    p.add_argument("--sweep", choices=["compute_rho", "parameter_space"], default="compute_rho")
+    p.add_argument("--shard", type=int, help="shard index to run (default: SLURM_ARRAY_TASK_ID)")
+    p.add_argument("--n-shards", type=int, required=True)
+    p.add_argument("--out", type=str, default="shards", help="shard directory")
+    p.add_argument("--n-items", type=int, default=1000, help="k modes or couplings")
+    p.add_argument("--k-min", type=float, default=0.5)
+    p.add_argument("--k-max", type=float, default=2.0)
+    p.add_argument("--t-max", type=float, default=50.0)
+    p.add_argument("--n-t", type=int, default=200)
+    p.add_argument("--epsilon", type=float, default=0.1)
+    p.add_argument("--m-dark", type=float, default=1.0)
+    p.add_argument("--merged", type=str, default=None, help="output file for merge (.npz)")
+    return p.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
+    args = parse_args()
+    sweep = build_sweep(args)
+    if args.action == "run":
+        shard = args.shard if args.shard is not None else int(os.environ["SLURM_ARRAY_TASK_ID"])
+        run_shard(sweep, shard, args.n_shards, args.out)
+    else:
+        result = merge_shards(sweep, args.n_shards, args.out)
+        merged = args.merged or os.path.join(args.out, f"{sweep['name']}.npz")
+        np.savez(merged, items=sweep["items"], **result)
+        logger.info("Merged %d shards into %s", args.n_shards, merged)
@@ -0,0 +1,157 @@
+"""
+Per-mode integrator selection from a probe of the Hamiltonian spectrum.
+
+The Hamiltonian of a mode is sampled at a few times across the run. Its
+level splitting gives the oscillation frequency and the number of cycles
+in the run, and the collapse rates give the damping scale. From these:
+
+* ``analytic``    - constant H: exact eigen-propagation, or one matrix
+                    exponential of the Liouvillian when there is damping
+* ``explicit``    - few oscillations per run: DOP853
+* ``exponential`` - many oscillations of a slowly varying H: adaptive
+                    Magnus, whose step is set by the variation of H only
+* ``implicit``    - damping much faster than both the run and the
+                    oscillation (stiff): BDF
+
+Radau and LSODA do not integrate complex states in ``solve_ivp``, so BDF
+is the implicit method. Purely unitary evolution is oscillatory, never
+stiff in the dissipative sense, and so never selects ``implicit``.
+"""
+
+import numpy as np
+
+from evolution import magnus_evolve
+from lindblad import evolve_lindblad, evolve_lindblad_td
+from mixing import propagate
+
+SOLVERS = ("analytic", "explicit", "exponential", "implicit")
+
+# np.trapz was renamed in NumPy 2.0
+_trapezoid = np.trapezoid if hasattr(np, "trapezoid") else np.trapz
+
+
+def probe_mode(hamiltonian, t_span, rates=(), n_probe=9):
+    """
+    Sample the spectrum of H(t) over a run.
+
+    Parameters
+    ----------
+    hamiltonian : callable
+        ``hamiltonian(t)`` returning one Hermitian (n, n) matrix
+    t_span : tuple
+        (t_start, t_end)
+    rates : sequence
+        Collapse rates (constants) of the mode, if any
+    n_probe : int
+        Number of sample times
+
+    Returns
+    -------
+    probe : dict
+        ``omega_max`` and ``omega_min`` (level splitting), ``n_oscillations``
+        over the run, ``variation`` (max |H(t) - H(t0)| / max |H|),
+        ``decay_rate`` (sum of rates) and ``duration``
+    """
+    t = np.linspace(t_span[0], t_span[1], n_probe)
+    H = np.array([hamiltonian(ti) for ti in t])
+    w = np.linalg.eigvalsh(H)
+    splitting = w[:, -1] - w[:, 0]
+    scale = np.max(np.abs(H))
+    variation = np.max(np.abs(H - H[0])) / scale if scale > 0 else 0.0
+    return {
+        "omega_max": float(splitting.max()),
+        "omega_min": float(splitting.min()),
+        "n_oscillations": float(_trapezoid(splitting, t) / (2 * np.pi)),
+        "variation": float(variation),
+        "decay_rate": float(np.sum(rates)) if len(rates) else 0.0,
+        "duration": float(t_span[1] - t_span[0]),
+    }
+
+
+def choose_solver(probe, max_explicit_cycles=1e3, stiffness_threshold=1e3, constant_tol=1e-12):
+    """
+    Pick an integrator family for a probed mode.
+
+    Parameters
+    ----------
+    probe : dict
+        Output of ``probe_mode``
+    max_explicit_cycles : float
+        Oscillation count above which the exponential integrator is used
+    stiffness_threshold : float
+        Damping rate times the shorter of the run length and the
+        oscillation period above which the problem counts as stiff
+    constant_tol : float
+        Relative variation below which H counts as constant
+
+    Returns
+    -------
+    solver : str
+        One of ``SOLVERS``
+    """
+    if probe["variation"] <= constant_tol:
+        return "analytic"
+    period = 2 * np.pi / probe["omega_max"] if probe["omega_max"] > 0 else np.inf
+    if probe["decay_rate"] * min(probe["duration"], period) > stiffness_threshold:
+        return "implicit"
+    if probe["decay_rate"] == 0 and probe["n_oscillations"] > max_explicit_cycles:
+        return "exponential"
+    return "explicit"
+
+
+def _propagate_analytic(H, rho0, t_eval, collapse_ops, rates):
+    if len(rates):
+        return evolve_lindblad(H, rho0, t_eval, collapse_ops, rates)
+    n = H.shape[-1]
+    # Columns of U(t): psi[j] = U(t) e_j
+    psi = propagate(np.broadcast_to(H, (n, n, n)), np.eye(n), t_eval - t_eval[0])
+    return np.einsum("jit,jk,klt->ilt", psi, rho0, np.conj(psi))
+
+
+def solve_auto(hamiltonian, rho0, t_eval, collapse_ops=(), rates=(), rtol=1e-10, atol=1e-12,
+               **thresholds):
+    """
+    Evolve one mode with the integrator chosen by ``choose_solver``.
+
+    Parameters
+    ----------
+    hamiltonian : callable
+        ``hamiltonian(t)`` returning one Hermitian (n, n) matrix
+    rho0 : array_like
+        Initial density matrix (n, n)
+    t_eval : array_like
+        Increasing output times; ``rho0`` is the state at ``t_eval[0]``
+    collapse_ops, rates : sequence
+        Lindblad collapse operators and constant rates
+    rtol, atol : float
+        Tolerances of the ODE paths
+    **thresholds
+        Passed to ``choose_solver``
+
+    Returns
+    -------
+    rho : ndarray
+        Density matrices of shape (n, n, len(t_eval))
+    info : dict
+        ``solver``, ``nfev`` and the ``probe`` values
+    """
+    t_eval = np.asarray(t_eval, dtype=float)
+    rho0 = np.asarray(rho0, dtype=complex)
+    probe = probe_mode(hamiltonian, (t_eval[0], t_eval[-1]), rates)
+    solver = choose_solver(probe, **thresholds)
+    nfev = 0
+
+    if solver == "analytic":
+        rho = _propagate_analytic(np.asarray(hamiltonian(t_eval[0]), dtype=complex), rho0,
+                                  t_eval, collapse_ops, rates)
+    elif solver == "exponential":
+        n = rho0.shape[-1]
+        psi, stats = magnus_evolve(hamiltonian, np.eye(n, dtype=complex), t_eval, rtol=rtol)
+        rho = np.einsum("jit,jk,klt->ilt", psi, rho0, np.conj(psi))
+        nfev = stats["nfev"]
+    else:
+        method = "BDF" if solver == "implicit" else "DOP853"
+        rho, sol = evolve_lindblad_td(hamiltonian, rho0, t_eval, collapse_ops, rates,
+                                      method=method, rtol=rtol, atol=atol)
+        nfev = sol.nfev
+    return rho, {"solver": solver, "nfev": int(nfev), **probe}
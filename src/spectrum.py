@@ -0,0 +1,156 @@
+"""
+Entanglement spectrum over k and time from stored density matrices.
+
+Turns rho(k, t), shape (N_k, 2, 2, N_t) as returned by ``compute_rho``,
+into the per-mode observables S(k, t) (mode entanglement entropy), the
+conversion probability P(k, t) = rho_11 and the coherence |rho_01|, and
+averages them over k bands weighted by a primordial power spectrum,
+
+    <O>_band(t) = sum_k w_k O(k, t) / sum_k w_k,    w_k = P(k) dln k.
+
+The tensor is read in chunks of modes from a ``.npy`` file (memory
+mapped), a list of ``sharding`` shard files or an in-memory array; only
+one chunk and the (N_bands, N_t) accumulators are held at a time, and
+the per-mode observables can be streamed to ``.npy`` files on disk.
+"""
+
+import os
+
+import numpy as np
+
+from physics import entanglement_entropy
+
+OBSERVABLES = ("entropy", "conversion", "coherence")
+
+
+def primordial_power(k, amplitude=2.1e-9, tilt=0.965, k_pivot=0.05):
+    """
+    Power-law primordial spectrum A_s (k / k_pivot)^(n_s - 1).
+
+    ``k_pivot`` must be in the units of ``k``.
+    """
+    return amplitude * (np.asarray(k, dtype=float) / k_pivot)**(tilt - 1)
+
+
+def mode_observables(rho):
+    """
+    Entropy, conversion probability and coherence of a stack of modes.
+
+    Parameters
+    ----------
+    rho : ndarray
+        Density matrices of shape (..., 2, 2, N_t)
+
+    Returns
+    -------
+    observables : dict
+        ``entropy``, ``conversion`` and ``coherence``, each (..., N_t)
+    """
+    rho = np.asarray(rho)
+    return {
+        "entropy": entanglement_entropy(rho),
+        "conversion": np.real(rho[..., 1, 1, :]),
+        "coherence": np.abs(rho[..., 0, 1, :]),
+    }
+
+
+def iter_chunks(source, chunk_size=256):
+    """
+    Yield (start, rho_chunk) over the k axis of stored results.
+
+    Parameters
+    ----------
+    source : str, sequence of str or array_like
+        A ``.npy`` file (memory mapped), shard ``.npz`` files in order (the
+        ``rho`` output of ``sharding.compute_rho_sweep``) or an array
+    chunk_size : int
+        Modes per chunk
+    """
+    if isinstance(source, (str, os.PathLike)):
+        source = np.load(source, mmap_mode="r")
+    elif isinstance(source, (list, tuple)) and source and isinstance(source[0], (str, os.PathLike)):
+        start = 0
+        for path in source:
+            with np.load(path) as shard:
+                rho = shard["data_rho"]
+            for i in range(0, len(rho), chunk_size):
+                yield start + i, rho[i:i + chunk_size]
+            start += len(rho)
+        return
+
+    for i in range(0, len(source), chunk_size):
+        yield i, np.asarray(source[i:i + chunk_size])
+
+
+def entanglement_spectrum(source, k_vals, band_edges, power=primordial_power, chunk_size=256,
+                          out_dir=None):
+    """
+    Band-averaged observables of stored rho(k, t), computed chunk by chunk.
+
+    Parameters
+    ----------
+    source : str, sequence of str or array_like
+        See ``iter_chunks``
+    k_vals : array_like
+        Increasing, positive momenta of the stored modes
+    band_edges : array_like
+        Increasing band edges in k; mode k belongs to [edge_i, edge_i+1)
+    power : callable
+        Primordial spectrum P(k) used as the weight
+    chunk_size : int
+        Modes per chunk
+    out_dir : str, optional
+        If given, write the per-mode observables to ``<out_dir>/<name>.npy``
+        (shape (N_k, N_t)) as the chunks are processed
+
+    Returns
+    -------
+    spectrum : dict
+        ``band_edges``, ``weight`` (N_bands,) and for each of
+        ``OBSERVABLES`` the band averages, shape (N_bands, N_t); bands
+        without modes are NaN. ``total`` holds the power-weighted average
+        over all modes of each observable, shape (N_t,).
+
+    Raises
+    ------
+    ValueError
+        If the source holds no modes
+    """
+    k_vals = np.asarray(k_vals, dtype=float)
+    edges = np.asarray(band_edges, dtype=float)
+    n_bands = len(edges) - 1
+    dlnk = np.gradient(np.log(k_vals)) if len(k_vals) > 1 else np.ones(1)
+    weights = power(k_vals) * dlnk
+    band = np.digitize(k_vals, edges) - 1
+    band = np.where((band >= 0) & (band < n_bands), band, n_bands)  # n_bands = outside
+
+    sums = None
+    outputs = {}
+    for start, rho in iter_chunks(source, chunk_size):
+        stop = start + len(rho)
+        obs = mode_observables(rho)
+        if sums is None:
+            n_t = rho.shape[-1]
+            sums = {name: np.zeros((n_bands + 1, n_t)) for name in OBSERVABLES}
+            if out_dir is not None:
+                os.makedirs(out_dir, exist_ok=True)
+                outputs = {name: np.lib.format.open_memmap(os.path.join(out_dir, f"{name}.npy"),
+                                                           mode="w+", shape=(len(k_vals), n_t))
+                           for name in OBSERVABLES}
+        for name in OBSERVABLES:
+            np.add.at(sums[name], band[start:stop], weights[start:stop, None] * obs[name])
+            if outputs:
+                outputs[name][start:stop] = obs[name]
+
+    if sums is None:
+        raise ValueError("No modes in the source; nothing to average")
+    for memmap in outputs.values():
+        memmap.flush()
+
+    band_weight = np.bincount(band, weights=weights, minlength=n_bands + 1)
+    result = {"band_edges": edges, "weight": band_weight[:n_bands], "total": {}}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for name in OBSERVABLES:
+            result[name] = sums[name][:n_bands] / band_weight[:n_bands, None]
+            result["total"][name] = sums[name].sum(axis=0) / weights.sum()
+    return result
@@ -0,0 +1,157 @@
+"""
+Time alignment of asynchronous instrument streams.
+
+A stream is an iterable of ``(times, values)`` chunks with times sorted
+across the whole stream, e.g. slices of memory-mapped ``.npy`` files
+(``chunks``) or blocks of a ``dynspec.DynamicSpectrum``. ``align_chunks``
+walks k streams together in time order: each sample of the reference
+stream (the first) is paired with the nearest sample of every other
+stream within ``tolerance``, and samples without a match in all streams
+are dropped (an as-of inner join). Only the current reference chunk and
+the part of each other stream inside its tolerance window are held in
+memory, so streams of any length align without resampling onto a common
+grid.
+
+The aligned channels are ready for ``detection.detection_statistic``, or
+``align_correlate`` feeds them straight into a ``StreamingCorrelation``.
+"""
+
+import numpy as np
+
+from detection import StreamingCorrelation
+
+
+def chunks(times, values, chunk_size=65536):
+    """
+    Split a (possibly memory-mapped) time series into ``(times, values)`` chunks.
+
+    Only the chunk being yielded is read into memory.
+    """
+    for start in range(0, len(times), chunk_size):
+        yield (np.asarray(times[start:start + chunk_size], dtype=float),
+               np.asarray(values[start:start + chunk_size]))
+
+
+class _Buffer:
+    # Look-ahead window over one non-reference stream
+    def __init__(self, name, stream):
+        self.name = name
+        self.iterator = iter(stream)
+        self.times = np.empty(0)
+        self.values = None
+        self.exhausted = False
+        self.last = -np.inf
+
+    def extend_to(self, t_max):
+        # Read chunks until the buffer reaches t_max or the stream ends
+        while not self.exhausted and (self.times.size == 0 or self.times[-1] < t_max):
+            try:
+                times, values = next(self.iterator)
+            except StopIteration:
+                self.exhausted = True
+                return
+            times = np.asarray(times, dtype=float)
+            values = np.asarray(values)
+            _check_sorted(self.name, times, self.last)
+            if times.size:
+                self.last = times[-1]
+            self.times = np.concatenate([self.times, times])
+            self.values = values if self.values is None else np.concatenate([self.values, values])
+
+    def drop_before(self, t_min):
+        keep = np.searchsorted(self.times, t_min, side="left")
+        self.times = self.times[keep:]
+        if self.values is not None:
+            self.values = self.values[keep:]
+
+
+def _check_sorted(name, times, previous):
+    if times.size and (times[0] < previous or np.any(np.diff(times) < 0)):
+        raise ValueError(f"Stream {name!r} is not sorted in time")
+
+
+def _nearest(buffer_times, times, tolerance):
+    # Index of the nearest buffered sample to each time (earlier on ties), -1 if beyond tolerance
+    if buffer_times.size == 0:
+        return np.full(times.shape, -1)
+    right = np.clip(np.searchsorted(buffer_times, times, side="left"), 0, buffer_times.size - 1)
+    left = np.clip(right - 1, 0, None)
+    use_left = np.abs(times - buffer_times[left]) <= np.abs(buffer_times[right] - times)
+    index = np.where(use_left, left, right)
+    return np.where(np.abs(buffer_times[index] - times) <= tolerance, index, -1)
+
+
+def align_chunks(streams, tolerance):
+    """
+    Align streams on the reference stream's timestamps, chunk by chunk.
+
+    Parameters
+    ----------
+    streams : dict
+        Name -> iterable of ``(times, values)`` chunks; the first entry is
+        the reference stream
+    tolerance : float or dict
+        Largest |time difference| of a match, per stream name if a dict
+
+    Yields
+    ------
+    aligned : dict
+        ``time`` (reference timestamps) and one value array per stream,
+        for the reference samples matched in every stream
+    """
+    names = list(streams)
+    reference, others = names[0], [_Buffer(name, streams[name]) for name in names[1:]]
+    tol = {name: tolerance[name] if isinstance(tolerance, dict) else tolerance for name in names[1:]}
+    last = -np.inf
+    for times, values in streams[reference]:
+        times = np.asarray(times, dtype=float)
+        values = np.asarray(values)
+        _check_sorted(reference, times, last)
+        if times.size == 0:
+            continue
+        last = times[-1]
+        matched = np.ones(times.size, dtype=bool)
+        indices = {}
+        for buffer in others:
+            buffer.extend_to(times[-1] + tol[buffer.name])
+            buffer.drop_before(times[0] - tol[buffer.name])
+            indices[buffer.name] = _nearest(buffer.times, times, tol[buffer.name])
+            matched &= indices[buffer.name] >= 0
+        if not matched.any():
+            continue
+        aligned = {"time": times[matched], reference: values[matched]}
+        for buffer in others:
+            aligned[buffer.name] = buffer.values[indices[buffer.name][matched]]
+        yield aligned
+
+
+def align(streams, tolerance):
+    """
+    Aligned channels of ``align_chunks`` concatenated into arrays.
+
+    Returns
+    -------
+    aligned : dict
+        ``time`` and one array per stream, all of equal length
+    """
+    parts = list(align_chunks(streams, tolerance))
+    if not parts:
+        return {"time": np.empty(0), **{name: np.empty(0) for name in streams}}
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def align_correlate(stream_a, stream_b, tolerance):
+    """
+    Detection statistic of two streams aligned within ``tolerance``.
+
+    Returns
+    -------
+    r, p, z : float
+        As ``detection.detection_statistic`` on the aligned pairs
+    n : int
+        Number of aligned pairs
+    """
+    acc = StreamingCorrelation()
+    for aligned in align_chunks({"a": stream_a, "b": stream_b}, tolerance):
+        acc.update(aligned["a"], aligned["b"])
+    return (*acc.result(), acc.n)
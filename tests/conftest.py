@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Core modules live as flat scripts in src/, mirroring how the pipeline
+# scripts import each other with sys.path.append(REPO_ROOT).
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,23 @@
+import numpy as np
+
+from benchmark import append_history, compare, load_baseline, load_history, run_case, save_baseline
+
+
+def test_run_case_records_time_memory_and_throughput():
+    result = run_case("alloc", lambda: np.ones(100_000), items=100_000, unit="floats", repeats=2)
+    assert result["wall_time"] > 0
+    assert result["peak_memory_bytes"] >= 800_000
+    assert result["unit"] == "floats/s"
+    assert np.isclose(result["throughput"], 100_000 / result["wall_time"])
+
+
+def test_history_and_baseline_comparison(tmp_path):
+    results = [{"name": "a", "wall_time": 1.0}, {"name": "b", "wall_time": 1.0}]
+    save_baseline(results, str(tmp_path / "baseline.json"))
+    append_history(results, str(tmp_path / "history.jsonl"))
+    append_history(results, str(tmp_path / "history.jsonl"))
+    assert len(load_history(str(tmp_path / "history.jsonl"))) == 2
+
+    new = [{"name": "a", "wall_time": 1.5}, {"name": "b", "wall_time": 0.5}, {"name": "c", "wall_time": 1.0}]
+    status = {row["name"]: row["status"] for row in compare(new, load_baseline(str(tmp_path / "baseline.json")))}
+    assert status == {"a": "regression", "b": "improved", "c": "new"}
@@ -0,0 +1,71 @@
+import time
+
+import numpy as np
+import pytest
+
+from bundle import diff_bundles, load_bundle, save_bundle
+from physics import compute_rho
+
+PARAMS = {"epsilon": 0.1, "m_dark": 1.0}
+
+
+def _save(path, params, extra_input=None):
+    k_vals, t_eval = np.linspace(0.5, 2.0, 40), np.linspace(0, 50, 200)
+    start = time.perf_counter()
+    rho = compute_rho(k_vals, t_eval, params, progress=False)
+    elapsed = time.perf_counter() - start
+    save_bundle(str(path), params=params, arrays={"k_vals": k_vals, "rho": rho},
+                summaries={"max_conversion": float(np.real(rho[:, 1, 1]).max())},
+                inputs=[extra_input] if extra_input else ())
+    return rho, elapsed
+
+
+def test_roundtrip_and_fast_reload(tmp_path):
+    data = tmp_path / "input.dat"
+    data.write_bytes(b"cluster map")
+    rho, compute_time = _save(tmp_path / "run", PARAMS, str(data))
+
+    start = time.perf_counter()
+    bundle = load_bundle(str(tmp_path / "run"))
+    reload_time = time.perf_counter() - start
+
+    np.testing.assert_array_equal(bundle["arrays"]["rho"], rho)
+    assert bundle["params"] == PARAMS
+    assert len(bundle["inputs"]["input.dat"]["sha256"]) == 64
+    assert bundle["commit"] is None or len(bundle["commit"]) == 40
+    assert reload_time < compute_time / 100
+
+    load_bundle(str(tmp_path / "run"), verify=True)
+    np.save(tmp_path / "run" / "arrays" / "rho.npy", rho + 1e-15)
+    with pytest.raises(ValueError, match="rho"):
+        load_bundle(str(tmp_path / "run"), verify=True)
+
+
+def test_diff(tmp_path):
+    _save(tmp_path / "a", PARAMS)
+    _save(tmp_path / "b", PARAMS)
+    assert diff_bundles(str(tmp_path / "a"), str(tmp_path / "b"))["identical"]
+
+    _save(tmp_path / "c", {**PARAMS, "epsilon": 0.12})
+    diff = diff_bundles(str(tmp_path / "a"), str(tmp_path / "c"))
+    assert not diff["identical"]
+    assert diff["params"] == {"epsilon": (0.1, 0.12)}
+    assert set(diff["arrays"]) == {"rho"} and diff["arrays"]["rho"]["max_abs_diff"] > 0
+    assert "max_conversion" in diff["summaries"]
+
+
+def test_crash_during_swap_keeps_old_bundle(tmp_path, monkeypatch):
+    path = str(tmp_path / "bundle")
+    save_bundle(path, {"run": 1}, {"x": np.arange(3)})
+    save_bundle(path, {"run": 2}, {"x": np.arange(4)})
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["bundle"]
+
+    def crash(src, dst):
+        raise OSError("simulated crash")
+
+    monkeypatch.setattr("bundle.os.replace", crash)
+    with pytest.raises(OSError):
+        save_bundle(path, {"run": 3}, {"x": np.arange(5)})
+    monkeypatch.undo()
+    reloaded = load_bundle(path, verify=True)
+    assert reloaded["params"] == {"run": 2} and reloaded["arrays"]["x"].shape == (4,)
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+import physics
+from physics import RETRY_SETTINGS, compute_rho
+
+PARAMS = {"epsilon": 0.1, "m_dark": 1.0}
+
+
+def test_restart_skips_finished_modes(tmp_path, monkeypatch):
+    k_vals, t_eval = np.linspace(0.5, 2.0, 6), np.linspace(0, 5, 20)
+    path = str(tmp_path / "run.npz")
+    reference = compute_rho(k_vals, t_eval, PARAMS, progress=False)
+
+    solve_mode = physics.solve_mode
+    calls = []
+
+    def crash_at_fourth(k, *args, **kwargs):
+        calls.append(k)
+        if len(calls) == 4:
+            raise RuntimeError("node preempted")
+        return solve_mode(k, *args, **kwargs)
+
+    monkeypatch.setattr(physics, "solve_mode", crash_at_fourth)
+    with pytest.raises(RuntimeError):
+        compute_rho(k_vals, t_eval, PARAMS, progress=False, checkpoint=path, checkpoint_every=2)
+
+    calls.clear()
+    monkeypatch.setattr(physics, "solve_mode", lambda k, *a, **kw: calls.append(k) or solve_mode(k, *a, **kw))
+    resumed = compute_rho(k_vals, t_eval, PARAMS, progress=False, checkpoint=path)
+    assert calls == list(k_vals[3:])
+    np.testing.assert_array_equal(resumed, reference)
+
+    with pytest.raises(ValueError):
+        compute_rho(k_vals, t_eval, dict(PARAMS, epsilon=0.2), progress=False, checkpoint=path)
+
+
+def test_failed_mode_is_retried_with_stiff_settings(tmp_path, monkeypatch):
+    solve_mode = physics.solve_mode
+
+    def explicit_fails(k, t_eval, params, **settings):
+        sol = solve_mode(k, t_eval, params, **settings)
+        if settings.get("method") != "BDF":
+            sol.success, sol.status = False, -1
+        return sol
+
+    monkeypatch.setattr(physics, "solve_mode", explicit_fails)
+    path = str(tmp_path / "run.npz")
+    rho = compute_rho([1.0], np.linspace(0, 5, 20), PARAMS, progress=False,
+                      checkpoint=path, retry=RETRY_SETTINGS)
+    assert np.allclose(np.trace(rho[0]), 1.0)
+    assert np.load(path)["data_attempt"].tolist() == [2]
+
+    # Partial results from other retry settings must not be resumed
+    with pytest.raises(ValueError):
+        compute_rho([1.0], np.linspace(0, 5, 20), PARAMS, progress=False,
+                    checkpoint=path, retry=RETRY_SETTINGS[:1])
+
+
+def test_mode_failing_every_attempt_raises(tmp_path, monkeypatch):
+    solve_mode = physics.solve_mode
+
+    def always_fails(k, t_eval, params, **settings):
+        sol = solve_mode(k, t_eval, params, **settings)
+        sol.success, sol.status, sol.message = False, -1, "Required step size is less than spacing"
+        return sol
+
+    monkeypatch.setattr(physics, "solve_mode", always_fails)
+    path = str(tmp_path / "run.npz")
+    with pytest.raises(RuntimeError, match=r"k = 1\.000e\+00 after 3 attempt\(s\): Required step size"):
+        compute_rho([1.0], np.linspace(0, 5, 20), PARAMS, progress=False,
+                    checkpoint=path, retry=RETRY_SETTINGS)
+    assert not np.load(path)["done"].any()
+
+
+def test_checkpoint_stores_solver_index(tmp_path, monkeypatch, caplog):
+    solve_auto = physics.solve_auto
+
+    def fail_after_first(hamiltonian, *args, **kwargs):
+        if fail_after_first.calls:
+            raise RuntimeError("integration failed")
+        fail_after_first.calls += 1
+        return solve_auto(hamiltonian, *args, **kwargs)
+
+    fail_after_first.calls = 0
+    monkeypatch.setattr(physics, "solve_auto", fail_after_first)
+    path = str(tmp_path / "run.npz")
+    metadata = {}
+    compute_rho([0.5, 1.0], np.linspace(0, 5, 20), PARAMS, progress=False, checkpoint=path,
+                solver="auto", metadata=metadata)
+    solvers = [mode["solver"] for mode in metadata["modes"]]
+    assert solvers == ["analytic", "reference"]
+    stored = np.load(path)["data_solver"]
+    assert [physics.MODE_SOLVERS[j] for j in stored] == solvers
+    assert metadata["modes"][1]["fallback_error"] == "integration failed"
+    assert "k = 1.000e+00" in caplog.text
+
+    # Bugs in the automatic path are not hidden by the fallback
+    def broken(*args, **kwargs):
+        raise AttributeError("module 'numpy' has no attribute 'trapezoid'")
+
+    monkeypatch.setattr(physics, "solve_auto", broken)
+    with pytest.raises(AttributeError):
+        compute_rho([0.5], np.linspace(0, 5, 20), PARAMS, progress=False, solver="auto")
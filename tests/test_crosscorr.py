@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from scipy.signal import correlate
+
+from crosscorr import CorrelationPlan, cross_correlate, cross_power_spectrum, tiled_cross_correlate
+
+
+def _maps(shape=(61, 90), shift=(3, -5), seed=0):
+    rng = np.random.default_rng(seed)
+    a = rng.standard_normal(shape)
+    return a, 0.5 * np.roll(a, shift, (0, 1)) + rng.standard_normal(shape)
+
+
+def test_matches_direct_correlation_and_pearson():
+    a, b = _maps()
+    direct = correlate(a - a.mean(), b - b.mean(), mode="full", method="direct") / (a.size * a.std() * b.std())
+    np.testing.assert_allclose(cross_correlate(a, b), direct, atol=1e-12)
+
+    corr = cross_correlate(a, b, max_lag=6, plan=CorrelationPlan((121, 179)))
+    assert corr.shape == (13, 13)
+    np.testing.assert_allclose(corr[6, 6], np.corrcoef(a.ravel(), b.ravel())[0, 1])
+    # b(x) ~ a(x - shift), so the peak is at lag -shift
+    assert np.unravel_index(corr.argmax(), corr.shape) == (6 - 3, 6 + 5)
+
+    # A plan of at least shape + max_lag gives the same lags; a smaller one would wrap
+    np.testing.assert_allclose(cross_correlate(a, b, max_lag=6, plan=CorrelationPlan((67, 96), exact=True)),
+                               corr, atol=1e-12)
+    with pytest.raises(ValueError, match="too small"):
+        cross_correlate(a, b, plan=CorrelationPlan((64, 96)))
+
+
+def test_tiled_overlap_save_on_memmap(tmp_path):
+    a, b = _maps((130, 75))
+    path_a, path_b = tmp_path / "a.npy", tmp_path / "b.npy"
+    np.save(path_a, a)
+    np.save(path_b, b)
+    mm_a, mm_b = np.load(path_a, mmap_mode="r"), np.load(path_b, mmap_mode="r")
+
+    expected = cross_correlate(a, b, max_lag=(4, 9))
+    np.testing.assert_allclose(tiled_cross_correlate(mm_a, mm_b, (4, 9), tile=(32, 20)), expected, atol=1e-12)
+    raw = tiled_cross_correlate(mm_a, mm_b, 2, tile=50, normalize=False)
+    np.testing.assert_allclose(raw, cross_correlate(a, b, max_lag=2, normalize=False), atol=1e-9)
+
+
+def test_cross_power_spectrum():
+    a, b = _maps((64, 50))
+    spec = cross_power_spectrum(a, b, pixel_scale=0.5, n_bins=10)
+    assert spec["k"].shape == spec["power"].shape == (10,)
+    assert spec["k"][-1] < 1.0 and spec["counts"].sum() > 0
+
+    # Parseval over the full plane: the half-plane counts twice except the
+    # kx = 0 and Nyquist columns
+    p2 = spec["power_2d"]
+    total = 2 * p2.sum() - p2[:, 0].sum() - p2[:, -1].sum()
+    np.testing.assert_allclose(total, np.mean((a - a.mean()) * (b - b.mean())))
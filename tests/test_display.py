@@ -0,0 +1,47 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from display import block_reduce, imshow_reduced, minmax_decimate, plot_decimated
+
+
+def test_minmax_decimate_keeps_extremes():
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 1, 100_001)
+    y = np.sin(40 * x) + rng.standard_normal(len(x))
+    xd, yd = minmax_decimate(x, y, 200)
+
+    assert len(xd) <= 800 and np.all(np.diff(xd) > 0)
+    assert (xd[0], xd[-1]) == (x[0], x[-1])
+    bins = np.minimum((x * 200).astype(int), 199)
+    kept = np.minimum((xd * 200).astype(int), 199)
+    for b in (0, 57, 199):
+        assert yd[kept == b].max() == y[bins == b].max()
+        assert yd[kept == b].min() == y[bins == b].min()
+
+    short = np.arange(10.0)
+    assert len(minmax_decimate(short, short, 200)[0]) == 10
+
+    fig, ax = plt.subplots(figsize=(2, 1))
+    (line,) = plot_decimated(ax, x, y, "b-", dpi=100)
+    assert len(line.get_xdata()) <= 4 * 200
+    plt.close(fig)
+
+
+def test_block_reduce_and_imshow_reduced():
+    image = np.arange(35.0).reshape(5, 7)
+    reduced = block_reduce(image, 2)
+    assert reduced.shape == (3, 4)
+    assert reduced[0, 0] == image[:2, :2].mean()
+    assert reduced[2, 3] == image[4, 6]
+    assert np.all(block_reduce(image, (1, 7), np.nanmax)[:, 0] == image[:, -1])
+
+    big = np.random.default_rng(1).random((3000, 2000))
+    fig, ax = plt.subplots(figsize=(2, 2))
+    im = imshow_reduced(ax, big, dpi=100, origin="lower")
+    assert im.get_array().shape[0] < 3000 / 10
+    assert ax.get_xlim() == (-0.5, 1999.5) and ax.get_ylim() == (-0.5, 2999.5)
+    plt.close(fig)
@@ -0,0 +1,40 @@
+import numpy as np
+
+from detection import StreamingCorrelation, detection_statistic
+from dynspec import DynamicSpectrum, from_stokes, to_stokes, write_synthetic
+
+
+def test_stokes_round_trip():
+    iquv = np.random.default_rng(0).standard_normal((5, 3, 4))
+    np.testing.assert_allclose(to_stokes(from_stokes(iquv)), iquv)
+    np.testing.assert_allclose(to_stokes(from_stokes(iquv), "VI"), iquv[..., [3, 0]])
+
+
+def test_streaming_correlation_matches_detection_statistic():
+    rng = np.random.default_rng(1)
+    A = rng.standard_normal(1000) + 3
+    B = 0.3 * A + rng.standard_normal(1000)
+    acc = StreamingCorrelation()
+    for start in range(0, 1000, 137):
+        acc.update(A[start:start + 137], B[start:start + 137])
+    np.testing.assert_allclose(acc.result(), detection_statistic(A, B), rtol=1e-10)
+
+
+def test_blocks_light_curves_and_bursts(tmp_path):
+    events = [{"time": 300.0, "width": 5.0, "amplitude": 2.0, "pol": [0.0, 0.0, 0.8]}]
+    header = write_synthetic(str(tmp_path), n_time=5000, n_chan=16, dt=0.2, events=events, seed=3)
+    ds = DynamicSpectrum(str(tmp_path))
+    assert ds.data.shape == (5000, 16, 4) and ds.freqs[0] == header["f0"]
+
+    full = to_stokes(np.asarray(ds.data))
+    parts = [block for _, block in ds.blocks(block_size=777, channels=slice(2, 10), stokes="IV")]
+    np.testing.assert_allclose(np.concatenate(parts), full[:, 2:10][..., [0, 3]])
+
+    curves = ds.light_curves(block_size=999)
+    peak = curves["times"][np.argmax(curves["V"])]
+    assert abs(peak - 300.0) < 1.0 and abs(curves["Q"]).max() < 0.1
+
+    r, p, z = ds.correlate("I", "V", block_size=640)
+    expected = detection_statistic(full[..., 0].ravel(), full[..., 3].ravel())
+    np.testing.assert_allclose((r, p, z), expected, rtol=1e-8, atol=1e-300)
+    assert z > 3
@@ -0,0 +1,58 @@
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from expansion import PowerLawHistory, StaticBackground, TabulatedHistory
+from evolution import background_hamiltonian, evolve_in_background, expm_hermitian
+
+
+PARAMS = {"epsilon": 0.1, "m_dark": 1.0}
+
+
+def test_expm_hermitian_2x2_matches_eigh():
+    rng = np.random.default_rng(0)
+    A = rng.normal(size=(5, 2, 2)) + 1j * rng.normal(size=(5, 2, 2))
+    M = A + np.conj(np.swapaxes(A, -1, -2))
+    w, V = np.linalg.eigh(M)
+    expected = (V * np.exp(-1j * w)[..., None, :]) @ np.conj(np.swapaxes(V, -1, -2))
+    assert np.allclose(expm_hermitian(M), expected)
+
+
+def test_static_background_is_exact_in_few_steps():
+    k_vals = np.array([0.5, 1.0, 2.0])
+    t_eval = np.linspace(0, 200, 50)
+    history = StaticBackground(m_plasma=0.3)
+    psi, stats = evolve_in_background(k_vals, t_eval, PARAMS, history)
+
+    H = background_hamiltonian(k_vals, PARAMS, history)(0.0)
+    expected = np.einsum("ktij,j->kit", expm_hermitian(H[:, None] * t_eval[None, :, None, None]), [1, 0])
+    assert np.allclose(psi, expected, atol=1e-10)
+    assert stats["nsteps"] <= len(t_eval)
+    assert stats["nrejected"] == 0
+
+
+def test_power_law_history_matches_reference_with_fewer_evaluations():
+    history = PowerLawHistory(t0=1.0, n=0.5, m_plasma0=2.0)
+    k = 1.5
+    t_eval = np.linspace(1.0, 60.0, 30)
+    psi, stats = evolve_in_background([k], t_eval, PARAMS, history, rtol=1e-9)
+
+    hamiltonian = background_hamiltonian([k], PARAMS, history)
+    ref = solve_ivp(lambda t, y: -1j * hamiltonian(t)[0] @ y, [t_eval[0], t_eval[-1]],
+                    [1 + 0j, 0j], t_eval=t_eval, method="DOP853", rtol=1e-11, atol=1e-12)
+    assert np.allclose(psi[0], ref.y, atol=1e-6)
+    assert np.allclose(np.sum(np.abs(psi)**2, axis=1), 1.0)
+
+    rk45 = solve_ivp(lambda t, y: -1j * hamiltonian(t)[0] @ y, [t_eval[0], t_eval[-1]],
+                     [1 + 0j, 0j], t_eval=t_eval, method="RK45", rtol=1e-9, atol=1e-12)
+    assert stats["nfev"] < rk45.nfev
+
+
+def test_tabulated_history_reproduces_power_law():
+    analytic = PowerLawHistory(t0=1.0, n=2 / 3, m_plasma0=1.0)
+    t_tab = np.logspace(0, 3, 200)
+    tabulated = TabulatedHistory(t_tab, analytic.scale_factor(t_tab),
+                                 m_plasma=analytic.plasma_mass(t_tab))
+    t = np.array([2.0, 30.0, 700.0])
+    assert np.allclose(tabulated.scale_factor(t), analytic.scale_factor(t))
+    assert np.allclose(tabulated.hubble_rate(t), analytic.hubble_rate(t), rtol=1e-2)
+    assert np.allclose(tabulated.plasma_mass(t), analytic.plasma_mass(t), rtol=1e-3)
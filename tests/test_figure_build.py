@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+
+from figure_build import DataCache, build_figures, fingerprint, load_script
+
+SCRIPT = '''
+import os
+import numpy as np
+from figure_build import DataCache
+
+STYLE = {"lines.linewidth": 2}
+
+
+def compute_curve(n):
+    with open(os.environ["FIGURE_BUILD_LOG"], "a") as fh:
+        fh.write("compute\\n")
+    return {"y": np.arange(n, dtype=float)}
+
+
+class Figures:
+    def __init__(self, fig_dir, cache_dir, formats=("txt",), dpi=100):
+        self.fig_dir, self.formats, self.saved = fig_dir, formats, []
+        self.data_cache = DataCache(cache_dir)
+
+    def _save(self, name, text):
+        for fmt in self.formats:
+            path = os.path.join(self.fig_dir, f"{name}.{fmt}")
+            with open(path, "w") as fh:
+                fh.write(text)
+            self.saved.append(path)
+
+    def curve(self):
+        data = self.data_cache.get("curve", compute_curve, n=5)
+        self._save("curve", "CAPTION %s" % data["y"].sum())
+
+    def table(self):
+        self._save("table", "table")
+'''
+
+
+def _build(tmp_path, **kw):
+    return build_figures(str(tmp_path / "figs.py"), "Figures", ("curve", "table"), str(tmp_path / "out"),
+                         formats=("txt",), dpi=100, **kw)
+
+
+def test_incremental_rebuild(tmp_path, monkeypatch):
+    log = tmp_path / "log"
+    monkeypatch.setenv("FIGURE_BUILD_LOG", str(log))
+    (tmp_path / "figs.py").write_text(SCRIPT)
+    os.makedirs(tmp_path / "out")
+
+    assert _build(tmp_path, workers=2) == {"curve": "built", "table": "built"}
+    assert _build(tmp_path) == {"curve": "up to date", "table": "up to date"}
+
+    # A caption edit re-renders only that figure, from cached data
+    (tmp_path / "figs.py").write_text(SCRIPT.replace("CAPTION", "Caption"))
+    assert _build(tmp_path) == {"curve": "built", "table": "up to date"}
+    assert (tmp_path / "out" / "curve.txt").read_text() == "Caption 10.0"
+    assert log.read_text().count("compute") == 1
+
+    # Style changes and missing outputs re-render; changed physics recomputes
+    (tmp_path / "figs.py").write_text(SCRIPT.replace('"lines.linewidth": 2', '"lines.linewidth": 3'))
+    assert set(_build(tmp_path).values()) == {"built"}
+    os.remove(tmp_path / "out" / "table.txt")
+    assert _build(tmp_path) == {"curve": "up to date", "table": "built"}
+    (tmp_path / "figs.py").write_text(SCRIPT.replace("n=5", "n=6"))
+    _build(tmp_path)
+    assert log.read_text().count("compute") == 2
+
+
+def test_data_cache_keys_on_inputs(tmp_path):
+    calls = []
+
+    def product(scale):
+        calls.append(scale)
+        return {"x": scale * np.ones(3)}
+
+    cache = DataCache(str(tmp_path))
+    np.testing.assert_array_equal(cache.get("p", product, scale=2.0)["x"], 2.0)
+    np.testing.assert_array_equal(cache.get("p", product, scale=2.0)["x"], 2.0)
+    cache.get("p", product, scale=3.0)
+    assert calls == [2.0, 3.0]
+
+
+def test_fingerprint_follows_dependencies(tmp_path, monkeypatch):
+    (tmp_path / "fb_helper.py").write_text("def inner():\n    return 1\n\n\ndef outer():\n    return inner()\n")
+    (tmp_path / "fb_figs.py").write_text(
+        "from fb_helper import outer\n\nSCALE = 2\n\n\n"
+        "class Figures:\n"
+        "    def save(self):\n        return outer() * SCALE\n\n"
+        "    def draw(self):\n        return self.save()\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = load_script(str(tmp_path / "fb_figs.py"))
+
+    def key():
+        return fingerprint(module.Figures.draw, vars(module), module.Figures)
+
+    base = key()
+    # Two levels down in another module, a class helper reached through
+    # self, and a module-level constant all change the key
+    for name, old, new in [("fb_helper.py", "return 1", "return 3"),
+                           ("fb_figs.py", "outer() * SCALE", "outer() + SCALE"),
+                           ("fb_figs.py", "SCALE = 2", "SCALE = 5")]:
+        path = tmp_path / name
+        text = path.read_text()
+        path.write_text(text.replace(old, new))
+        if name == "fb_figs.py":
+            module = load_script(str(path))
+        assert key() != base
+        path.write_text(text)
+        module = load_script(str(tmp_path / "fb_figs.py"))
+        assert key() == base
@@ -0,0 +1,48 @@
+import os
+
+import numpy as np
+import pytest
+
+from bundle import load_manifest
+from golden import check_golden, run_cases, save_golden, update_golden
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "golden")
+
+
+def test_fast_backends_match_committed_golden_results():
+    reports = run_cases(GOLDEN_DIR)
+    failed = [(r["case"], r["backend"], r["arrays"]) for r in reports if not r["passed"]]
+    assert not failed
+    assert {r["backend"] for r in reports} >= {"reference", "auto", "analytic", "analytic_float32", "float32"}
+
+
+def test_tolerances_and_modes(tmp_path):
+    ref = np.sin(np.linspace(0, 10, 1000))
+    save_golden(str(tmp_path), "trace", {"s": ref}, rtol=1e-6, atol=1e-9)
+
+    assert check_golden(str(tmp_path), "trace", {"s": ref.copy()}, mode="summary")["arrays"]["s"]["via"] == "hash"
+    near = check_golden(str(tmp_path), "trace", {"s": ref + 1e-10})
+    assert near["passed"] and near["arrays"]["s"]["max_abs_error"] > 0
+
+    bumped = ref.copy()
+    bumped[500] += 1e-3
+    full = check_golden(str(tmp_path), "trace", {"s": bumped})
+    assert not full["passed"] and full["arrays"]["s"]["n_failed"] == 1
+    assert check_golden(str(tmp_path), "trace", {"s": bumped}, rtol=1e-2, atol=1e-2)["passed"]
+    assert not check_golden(str(tmp_path), "trace", {"s": 1.1 * ref}, mode="summary")["passed"]
+    assert not check_golden(str(tmp_path), "trace", {"s": ref[:-1]})["passed"]
+    assert not check_golden(str(tmp_path), "trace", {})["passed"]
+
+
+def test_update_golden_subset(tmp_path, monkeypatch):
+    monkeypatch.setattr("golden.code_version", lambda: ("0" * 40, True))
+    with pytest.raises(RuntimeError, match="uncommitted"):
+        update_golden(str(tmp_path), ["conversion_map"])
+    assert os.listdir(tmp_path) == []
+
+    update_golden(str(tmp_path), ["conversion_map"], allow_dirty=True)
+    assert os.listdir(tmp_path) == ["conversion_map"]
+    # The state checked up front is what the manifest records
+    assert load_manifest(str(tmp_path / "conversion_map"))["commit"] == "0" * 40
+    (report,) = run_cases(str(tmp_path), ["conversion_map"], mode="summary", reference=False)
+    assert report["backend"] == "float32" and report["passed"]
@@ -0,0 +1,34 @@
+import numpy as np
+
+from hamiltonian import H_ms
+from mixing import propagate
+from physics import compute_rho, rho0
+
+
+def test_scalar_k_returns_single_matrix():
+    H = H_ms(2.0, {"epsilon": 0.1, "m_dark": 1.0, "m_plasma": 0.5})
+    assert H.shape == (2, 2)
+    assert np.allclose(H, [[0.0625, 0.025], [0.025, 0.25]])
+
+
+def test_broadcasts_over_k_and_parameter_grids():
+    k = np.logspace(-1, 1, 5)
+    params = {"epsilon": np.logspace(-9, -5, 4)[:, None],
+              "m_dark": np.logspace(-24, -20, 3)[:, None, None], "a": 2.0}
+    H = H_ms(k, params)
+    assert H.shape == (3, 4, 5, 2, 2)
+    assert np.allclose(H[2, 1, 3], H_ms(k[3], {"epsilon": params["epsilon"][1, 0],
+                                               "m_dark": params["m_dark"][2, 0, 0], "a": 2.0}))
+    assert np.allclose(H, np.conj(np.swapaxes(H, -1, -2)))
+
+
+def test_compute_rho_agrees_with_batched_propagator():
+    params = {"epsilon": 0.2, "m_dark": 1.0}
+    k_vals = np.array([0.5, 2.0])
+    t_eval = np.linspace(0, 20, 21)
+    rho = compute_rho(k_vals, t_eval, params)
+
+    psi = propagate(H_ms(k_vals, params), rho0[:, 0], t_eval)
+    expected = psi[:, :, None, :] * np.conj(psi[:, None, :, :])
+    assert rho.shape == (2, 2, 2, 21)
+    assert np.allclose(rho, expected, atol=1e-8)
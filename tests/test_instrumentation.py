@@ -0,0 +1,61 @@
+import json
+
+import numpy as np
+
+from instrumentation import Instrumentation, json_default
+from physics import compute_rho
+
+
+def test_nested_stages_and_solver_counters():
+    instr = Instrumentation(trace_memory=True)
+    with instr.stage("run"):
+        big = np.ones(1_000_000)
+        del big
+        with instr.stage("solve"):
+            compute_rho([1.0, 2.0], np.linspace(0, 5, 20), {"epsilon": 0.1, "m_dark": 1.0},
+                        instrumentation=instr)
+        with instr.stage("alloc"):
+            np.ones(200_000)
+
+    summary = instr.summary()
+    assert set(summary) == {"run", "run/solve", "run/alloc"}
+    assert summary["run/solve"]["nfev"] > 0
+    assert summary["run"]["nfev"] == 0
+    assert summary["run"]["wall_time"] >= summary["run/solve"]["wall_time"]
+    assert summary["run/alloc"]["traced_peak_bytes"] >= 1_600_000
+    # The outer peak is not wiped by the nested stages' resets
+    assert summary["run"]["traced_peak_bytes"] >= 8_000_000
+    assert "run/solve" in instr.report()
+    json.dumps(summary, default=json_default)
+
+
+def test_timed_decorator_and_profile(tmp_path):
+    instr = Instrumentation(profile=True, profile_dir=str(tmp_path))
+
+    @instr.timed()
+    def work():
+        return np.sum(np.arange(1000))
+
+    work()
+    work()
+    entry = instr.summary()["work"]
+    assert entry["calls"] == 2
+    assert "function calls" in entry["profile"]
+    assert (tmp_path / "work.prof").exists()
+
+    # Nested stages run under the outer stage's profiler
+    with instr.stage("outer"):
+        with instr.stage("inner"):
+            work()
+    summary = instr.summary()
+    assert "work" in summary["outer"]["profile"] and "profile" not in summary["outer/inner"]
+
+
+def test_auto_solver_records_counters():
+    instr = Instrumentation()
+    meta = {}
+    with instr.stage("auto"):
+        compute_rho([1.0, 2.0], np.linspace(0, 5, 20), {"epsilon": 0.1, "m_dark": 1.0},
+                    instrumentation=instr, solver="auto", metadata=meta, progress=False)
+    entry = instr.summary()["auto"]
+    assert entry["solves"] == 2 and entry["nfev"] == sum(m["nfev"] for m in meta["modes"])
@@ -0,0 +1,60 @@
+import numpy as np
+
+from evolution import expm_hermitian
+from hamiltonian import H_ms
+from lindblad import HBAR, PHOTON_PROJECTOR, evolve_lindblad, evolve_lindblad_td, liouvillian, scattering_rate
+
+RHO_PHOTON = np.array([[1, 0], [0, 0]], dtype=complex)
+
+
+def test_zero_rates_reproduce_unitary_evolution():
+    H = H_ms(np.array([0.5, 1.0, 2.0]), {"epsilon": 0.3, "m_dark": 1.0})
+    t_eval = np.linspace(0, 10, 11)
+    rho = evolve_lindblad(H, RHO_PHOTON, t_eval, [PHOTON_PROJECTOR], [0.0])
+
+    U = expm_hermitian(H[:, None] * t_eval[None, :, None, None])
+    expected = U @ RHO_PHOTON @ np.conj(np.swapaxes(U, -1, -2))
+    assert np.allclose(rho, np.moveaxis(expected, 1, -1))
+
+
+def test_dephasing_decays_coherence_over_parameter_grid():
+    rates = np.array([[0.1], [0.5]])
+    H = np.zeros((2, 3, 2, 2), dtype=complex)
+    H[..., 1, 1] = np.array([0.0, 1.0, 2.0])
+    plus = 0.5 * np.ones((2, 2), dtype=complex)
+    t_eval = np.array([0.0, 0.7, 1.5, 4.0])
+
+    rho = evolve_lindblad(H, plus, t_eval, [PHOTON_PROJECTOR], [rates])
+
+    assert rho.shape == (2, 3, 2, 2, 4)
+    assert np.allclose(np.abs(rho[..., 0, 1, :]), 0.5 * np.exp(-rates[..., None] * t_eval / 2))
+    assert np.allclose(np.trace(rho, axis1=-3, axis2=-2), 1.0)
+
+
+def test_time_dependent_path_matches_constant_path():
+    H = H_ms(np.array([0.7, 1.3]), {"epsilon": 0.2, "m_dark": 1.0})
+    t_eval = np.linspace(0, 5, 6)
+    rho_const = evolve_lindblad(H, RHO_PHOTON, t_eval, [PHOTON_PROJECTOR], [0.3])
+    rho_td, sol = evolve_lindblad_td(lambda t: H, RHO_PHOTON, t_eval,
+                                     [PHOTON_PROJECTOR], [lambda t: 0.3])
+    assert np.allclose(rho_td, rho_const, atol=1e-7)
+
+
+def test_liouvillian_preserves_trace():
+    H = H_ms(1.0, {"epsilon": 0.1, "m_dark": 1.0})
+    L = liouvillian(H, [PHOTON_PROJECTOR], [0.4])
+    trace_row = np.eye(2).ravel()
+    assert np.allclose(trace_row @ L, 0)
+
+
+def test_scattering_rate_is_in_natural_units():
+    # Thomson scattering at n = 1e6 m^-3: n sigma c = 1.99e-14 s^-1
+    rate = scattering_rate(1e6, 6.6524587e-29)
+    np.testing.assert_allclose(rate, 1e6 * 6.6524587e-29 * 2.99792458e8 * 6.582119569e-16)
+
+    # A coherence lasting 1 / (n sigma c) seconds decays by exp(-1/2) over
+    # that time expressed in eV^-1
+    t_coh = 1 / (rate / HBAR)
+    plus = 0.5 * np.ones((2, 2), dtype=complex)
+    rho = evolve_lindblad(np.zeros((2, 2)), plus, [0.0, t_coh / HBAR], [PHOTON_PROJECTOR], [rate])
+    np.testing.assert_allclose(abs(rho[0, 1, -1]), 0.5 * np.exp(-0.5), rtol=1e-6)
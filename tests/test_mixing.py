@@ -0,0 +1,37 @@
+import numpy as np
+from scipy.linalg import expm
+
+from mixing import evolve_mixing, propagate, three_state_hamiltonian, two_state_hamiltonian
+
+
+def test_two_state_fast_path_matches_eigh():
+    params = {"omega": np.array([0.5, 1.0, 3.0])[:, None], "epsilon": np.array([0.01, 0.2]),
+              "m_dark": 1.0, "m_plasma": 0.4}
+    H = two_state_hamiltonian(params)
+    t_eval = np.linspace(0, 50, 101)
+    fast = propagate(H, [1, 0], t_eval)
+    slow = propagate(H, [1, 0], t_eval, fast_two_state=False)
+    assert fast.shape == (3, 2, 2, 101)
+    assert np.allclose(fast, slow)
+
+
+def test_three_state_grid_matches_matrix_exponential():
+    params = {"omega": 1.0, "epsilon": np.array([0.05, 0.3]), "m_dark": 1.0,
+              "m_axion": np.array([0.5, 2.0, 4.0])[:, None], "g_mix": 0.1}
+    t_eval = np.array([0.0, 1.0, 7.5])
+    probabilities, psi = evolve_mixing(three_state_hamiltonian, params, t_eval)
+
+    assert psi.shape == (3, 2, 3, 3)
+    assert np.allclose(probabilities.sum(axis=-2), 1.0)
+    H = three_state_hamiltonian(params)
+    expected = expm(-1j * H[2, 1] * 7.5) @ np.array([1, 0, 0])
+    assert np.allclose(psi[2, 1, :, -1], expected)
+
+
+def test_decoupled_axion_reduces_to_two_states():
+    base = {"omega": 2.0, "epsilon": 0.1, "m_dark": 1.0}
+    t_eval = np.linspace(0, 30, 16)
+    p2, _ = evolve_mixing(two_state_hamiltonian, base, t_eval)
+    p3, _ = evolve_mixing(three_state_hamiltonian, dict(base, m_axion=0.3, g_mix=0.0), t_eval)
+    assert np.allclose(p3[:2], p2)
+    assert np.allclose(p3[2], 0)
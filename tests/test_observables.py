@@ -0,0 +1,36 @@
+import numpy as np
+
+from cmb import dark_photon_effect
+from detection import detection_statistic, simulate_data
+from parameter_space import conversion_map, conversion_probability, viable_mask
+from physics import entanglement_entropy, von_neumann_entropy
+
+
+def test_conversion_map_matches_double_loop():
+    couplings = np.logspace(-9, -5, 7)
+    masses = np.logspace(-25, -20, 5)
+    expected = np.array([[conversion_probability(e, m) for m in masses] for e in couplings])
+    assert np.allclose(conversion_map(couplings, masses), expected)
+    assert viable_mask(np.logspace(-8, -4, 50), np.logspace(-24, -20, 50)).any()
+
+
+def test_dark_photon_effect_peaks_at_resonances():
+    ell = np.arange(2, 2500)
+    effect = dark_photon_effect(ell)
+    assert ell[np.argmax(effect)] == 150
+
+
+def test_entropies_of_pure_and_mixed_states():
+    p = np.array([0.0, 0.5, 0.1])
+    psi = np.stack([np.sqrt(1 - p), np.sqrt(p)])
+    rho = (psi[:, None, :] * psi[None, :, :]).astype(complex)
+    assert np.allclose(entanglement_entropy(rho), [0, np.log(2), -0.1 * np.log(0.1) - 0.9 * np.log(0.9)])
+    assert np.allclose(von_neumann_entropy(rho), 0)
+    mixed = np.repeat((0.5 * np.eye(2, dtype=complex))[..., None], 2, axis=-1)
+    assert np.allclose(von_neumann_entropy(mixed), np.log(2))
+
+
+def test_detection_statistic_recovers_injected_anticorrelation():
+    A, B = simulate_data(2000, 0.5, np.random.default_rng(1234))
+    r, p, z = detection_statistic(A, B)
+    assert r < -0.4 and z < -3
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from hamiltonian import H_ms
+from kernels import fused_conversion
+from mixing import propagate
+from parameter_space import checked_conversion_map, conversion_map
+from precision import subsample_check
+
+
+def test_float32_conversion_map_with_subsample_check():
+    couplings, masses = np.logspace(-11, -4, 120), np.logspace(-9, -3, 150)
+    fast, report = checked_conversion_map(couplings, masses, rng=np.random.default_rng(0))
+    assert fast.dtype == np.float32
+    assert report["n_samples"] == 256 and 0 < report["max_abs_error"] < 1e-6
+    np.testing.assert_allclose(fast, conversion_map(couplings, masses), atol=1e-6)
+    # Ultralight masses must not underflow to spurious results in float32
+    np.testing.assert_array_equal(conversion_map([1e-11], [1e-26], precision="float32"), [[1.0]])
+
+
+def test_float32_propagators():
+    k, t_eval = np.linspace(0.5, 2.0, 8), np.linspace(0, 50, 64)
+    H = H_ms(k, {"epsilon": 0.1, "m_dark": 1.0})
+    psi32 = propagate(H, [1, 0], t_eval, precision="float32")
+    assert psi32.dtype == np.complex64
+    np.testing.assert_allclose(psi32, propagate(H, [1, 0], t_eval), atol=1e-5)
+
+    p_gamma, p_dark, S = fused_conversion(k, t_eval, 0.1, 1.0, precision="float32")
+    assert S.dtype == np.float32
+    report = subsample_check(p_dark, lambda idx: fused_conversion(k[idx[0]], t_eval, 0.1, 1.0)[1][
+        np.arange(len(idx[0])), idx[1]], n_samples=100, rng=np.random.default_rng(1))
+    assert report["max_abs_error"] < 1e-5
+
+    with pytest.raises(ValueError):
+        propagate(H, [1, 0], t_eval, precision="float16")
@@ -0,0 +1,44 @@
+import json
+
+import numpy as np
+
+from physics import compute_rho
+from progress import ProgressReporter, jsonl_sink, make_reporter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_throttling_rate_eta_and_totals():
+    clock, records = FakeClock(), []
+    reporter = ProgressReporter(10, sink=records.append, min_interval=5.0, clock=clock)
+    for _ in range(10):
+        clock.now += 1.0
+        reporter.update(nfev=100, nrejected=1)
+
+    assert [r["done"] for r in records] == [5, 10]
+    assert records[0]["rate"] == 1.0 and records[0]["eta"] == 5.0
+    assert records[-1]["totals"] == {"nfev": 1000, "nrejected": 10}
+    assert records[-1]["eta"] == 0.0
+
+
+def test_compute_rho_progress_sinks(tmp_path, capsys):
+    k_vals, t_eval = np.linspace(0.5, 2.0, 4), np.linspace(0, 5, 10)
+    params = {"epsilon": 0.1, "m_dark": 1.0}
+
+    compute_rho(k_vals, t_eval, params, progress=False)
+    assert capsys.readouterr().out == ""
+
+    path = str(tmp_path / "progress.jsonl")
+    compute_rho(k_vals, t_eval, params, progress=ProgressReporter(4, sink=jsonl_sink(path), every=2))
+    with open(path) as fh:
+        records = [json.loads(line) for line in fh]
+    assert [r["done"] for r in records] == [2, 4]
+    assert records[-1]["totals"]["nfev"] > 0 and records[-1]["last"]["k"] == 2.0
+
+    assert make_reporter(None, 100).every == 10
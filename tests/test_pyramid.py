@@ -0,0 +1,53 @@
+import os
+import tracemalloc
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from pyramid import build_pyramid, load_index, read_region, select_level
+
+
+def test_pyramid_levels_tiles_and_index(tmp_path):
+    image = np.random.default_rng(0).random((300, 520))
+    image[0, 0] = np.nan
+    index = build_pyramid(image, str(tmp_path), tile_size=128, metadata={"target": "Abell 1689"})
+
+    assert load_index(str(tmp_path)) == index
+    assert index["target"] == "Abell 1689"
+    assert [lvl["shape"] for lvl in index["levels"]] == [[300, 520], [150, 260], [75, 130], [38, 65]]
+    assert (index["levels"][0]["rows"], index["levels"][0]["cols"]) == (3, 5)
+    for lvl in index["levels"]:
+        tiles = os.listdir(tmp_path / str(lvl["level"]))
+        assert len(tiles) == lvl["rows"] * lvl["cols"]
+    assert plt.imread(tmp_path / "0" / "2_4.png").shape == (128, 128, 4)
+
+    # origin='lower': the NaN at array row 0 is in the bottom tile row and transparent
+    bottom_left = plt.imread(tmp_path / "0" / "2_0.png")
+    assert bottom_left[300 - 2 * 128 - 1, 0, 3] == 0
+    assert plt.imread(tmp_path / "0" / "0_0.png")[0, 0, 3] == 1
+
+
+def test_read_region_and_select_level(tmp_path):
+    image = np.arange(64.0 * 64).reshape(64, 64)
+    index = build_pyramid(image, str(tmp_path), tile_size=16)
+    assert select_level(index, 40) == 1
+    assert select_level(index, 1) == index["levels"][-1]["level"]
+    np.testing.assert_array_equal(read_region(str(tmp_path), 0, slice(8, 10), slice(0, 3)), image[8:10, :3])
+    np.testing.assert_allclose(read_region(str(tmp_path), 1)[0, 0], image[:2, :2].mean())
+
+
+def test_tiles_are_colourised_one_at_a_time(tmp_path):
+    image = np.random.default_rng(1).random((1024, 1024))
+    build_pyramid(image[:64, :64], str(tmp_path / "warm"))
+    tracemalloc.start()
+    try:
+        build_pyramid(image, str(tmp_path / "full"))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # A float64 RGBA copy of a level alone would be 4x the image
+    assert peak < 5 * image.nbytes
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from reproject import (MappingCache, TanWCS, apply_mapping, compute_mapping, footprint_centre, footprint_cutout,
+                       reproject_images, target_grid, wcs_key)
+
+
+def test_tan_round_trip_and_identity_reprojection():
+    header = target_grid(197.87, -1.34, (40, 50), pixel_scale=0.1)
+    wcs = TanWCS(header)
+    yy, xx = np.mgrid[0:40, 0:50].astype(float)
+    ra, dec = wcs.pixel_to_world(xx, yy)
+    np.testing.assert_allclose(wcs.pixel_to_world(24.5, 19.5), (197.87, -1.34))
+    np.testing.assert_allclose(wcs.world_to_pixel(ra, dec), (xx, yy), atol=1e-8)
+
+    image = np.random.default_rng(0).standard_normal((40, 50))
+    np.testing.assert_allclose(apply_mapping(image, compute_mapping(header, header, tile=7)), image, atol=1e-4)
+
+
+def test_shifted_exposures_share_one_cached_map(tmp_path):
+    target = target_grid(197.87, -1.34, (30, 30), pixel_scale=0.1)
+    # Exposure grid offset by (+3, +2) pixels: target pixel (x, y) is input pixel (x + 3, y + 2)
+    exposure = dict(target, CRPIX1=target["CRPIX1"] + 3, CRPIX2=target["CRPIX2"] + 2, NAXIS1=40, NAXIS2=40)
+    yy, xx = np.mgrid[0:40, 0:40].astype(float)
+    bands = [(k * xx + yy, exposure) for k in (1.0, 2.0, 3.0)]
+
+    cache = MappingCache(str(tmp_path), tile=8, workers=2)
+    stack = reproject_images(bands, target, cache)
+    assert (cache.misses, cache.hits) == (1, 2)
+    ty, tx = np.mgrid[0:30, 0:30].astype(float)
+    for k, out in zip((1.0, 2.0, 3.0), stack):
+        np.testing.assert_allclose(out, k * (tx + 3) + (ty + 2), atol=1e-3)
+
+    again = MappingCache(str(tmp_path))
+    out = np.lib.format.open_memmap(tmp_path / "stack.npy", mode="w+", dtype=np.float32, shape=(3, 30, 30))
+    reproject_images(iter(bands), target, again, out=out)
+    np.testing.assert_allclose(out, stack, atol=1e-4)
+    assert (again.misses, again.hits) == (0, 3)
+    assert wcs_key(exposure) != wcs_key(target)
+
+    # Pixels beyond the input image are filled
+    far = dict(exposure, CRPIX1=exposure["CRPIX1"] + 25)
+    out = apply_mapping(bands[0][0], cache.get(far, target), order=0)
+    assert np.isnan(out[:, -5:]).all() and np.isfinite(out[:, :5]).all()
+
+
+def test_footprint_cutout_and_centre():
+    target = target_grid(197.87, -1.34, (30, 30), pixel_scale=0.1)
+    image = np.full((30, 30), np.nan)
+    image[5:12, 8:20] = 1.0
+    image[6, 8] = np.nan
+    cutout, header = footprint_cutout(image, target)
+    assert cutout.shape == (7, 12) and (header["NAXIS1"], header["NAXIS2"]) == (12, 7)
+    # Cutout pixel (0, 0) is grid pixel (8, 5)
+    np.testing.assert_allclose(TanWCS(header).pixel_to_world(0.0, 0.0), TanWCS(target).pixel_to_world(8.0, 5.0))
+    assert footprint_cutout(np.full((3, 3), np.nan), target) == (None, None)
+
+    # Centred between two exposures straddling RA = 0
+    east, west = target_grid(359.99, 10.0, (11, 11), 0.1), target_grid(0.03, 10.0, (11, 11), 0.1)
+    ra, dec = footprint_centre([east, west])
+    assert abs((ra + 180) % 360 - 180 - 0.01) < 1e-9 and abs(dec - 10.0) < 1e-6
+
+
+def test_astropy_wcs_matches_tan():
+    pytest.importorskip("astropy")
+    from reproject import _AstropyWCS
+
+    header = dict(target_grid(197.87, -1.34, (40, 50), pixel_scale=0.1), CD1_2=1e-6)
+    yy, xx = np.mgrid[0:40:7, 0:50:7].astype(float)
+    tan, ref = TanWCS(header), _AstropyWCS(header)
+    np.testing.assert_allclose(ref.pixel_to_world(xx, yy), tan.pixel_to_world(xx, yy), atol=1e-9)
+    ra, dec = tan.pixel_to_world(xx, yy)
+    np.testing.assert_allclose(ref.world_to_pixel(ra, dec), (xx, yy), atol=1e-6)
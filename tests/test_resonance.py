@@ -0,0 +1,70 @@
+import numpy as np
+
+from expansion import PowerLawHistory
+from evolution import background_hamiltonian, evolve_in_background, magnus_evolve
+from resonance import evolve_resonant, hybrid_evolve, landau_zener_matrix
+
+
+def linear_sweep(alpha, couplings):
+    couplings = np.asarray(couplings, dtype=float)
+
+    def hamiltonian(t):
+        H = np.zeros(couplings.shape + (2, 2), dtype=complex)
+        H[:, 0, 0] = alpha * t / 2
+        H[:, 1, 1] = -alpha * t / 2
+        H[:, 0, 1] = H[:, 1, 0] = couplings
+        return H
+
+    return hamiltonian
+
+
+def test_landau_zener_matrix_is_unitary():
+    N, P = landau_zener_matrix(0.3, -2.0)
+    assert np.allclose(N @ np.conj(N.T), np.eye(2))
+    assert np.isclose(P, np.exp(-2 * np.pi * 0.09 / 2.0))
+
+
+def test_linear_sweep_matches_full_integration():
+    hamiltonian = linear_sweep(-1.0, [0.2, 0.4, -0.6])
+    psi0 = np.array([[1, 0], [0.6, 0.8j], [0, 1]], dtype=complex)
+    t_eval = np.linspace(-40, 40, 5)
+
+    psi, stats = hybrid_evolve(hamiltonian, psi0, t_eval)
+    ref, _ = magnus_evolve(hamiltonian, psi0, t_eval, rtol=1e-11)
+
+    assert not np.any(stats["fallback"])
+    assert np.allclose(psi[..., -1], ref[..., -1], atol=1e-4)
+
+
+def test_expanding_background_resonance_and_fallback():
+    history = PowerLawHistory(t0=1.0, n=0.5, m_plasma0=3.0)
+    params = {"epsilon": 0.05, "m_dark": 1.0}
+    k_vals = np.array([0.01, 0.02, 0.05])
+    t_eval = np.linspace(1.0, 30.0, 20)
+
+    psi, stats = evolve_resonant(k_vals, t_eval, params, history)
+    ref, full_stats = evolve_in_background(k_vals, t_eval, params, history, rtol=1e-9)
+
+    # m_p = m_A' at a = 3^(2/3), i.e. t = 3^(4/3)
+    assert np.allclose(stats["crossings"][0], 3 ** (4 / 3))
+    assert list(stats["fallback"]) == [False, False, True]
+    assert np.allclose(np.abs(psi[:, 0, -1])**2, np.abs(ref[:, 0, -1])**2, atol=5e-3)
+    assert np.allclose(psi[2], ref[2], atol=1e-6)
+    assert stats["nfev"] < full_stats["nfev"]
+
+
+def test_mode_hamiltonian_path_matches_per_time_path():
+    history = PowerLawHistory(t0=1.0, n=0.5, m_plasma0=3.0)
+    params = {"epsilon": 0.05, "m_dark": 1.0}
+    k_vals = np.linspace(0.005, 0.05, 12)
+    t_eval = np.linspace(1.0, 30.0, 20)
+
+    psi, stats = evolve_resonant(k_vals, t_eval, params, history)
+    ref, ref_stats = hybrid_evolve(background_hamiltonian(k_vals, params, history),
+                                   np.tile([1, 0], (12, 1)), t_eval)
+
+    assert np.array_equal(stats["fallback"], ref_stats["fallback"])
+    for tc, ref_tc in zip(stats["crossings"], ref_stats["crossings"]):
+        assert np.allclose(tc, ref_tc, rtol=1e-10)
+    assert np.allclose(psi, ref, atol=1e-8)
+    assert stats["nfev"] < ref_stats["nfev"]
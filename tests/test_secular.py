@@ -0,0 +1,29 @@
+import numpy as np
+
+from hamiltonian import H_ms
+from mixing import propagate
+from secular import secular_evolve
+
+PARAMS = {"epsilon": 0.3, "m_dark": 1.0}
+
+
+def test_mean_and_envelope_match_resolved_oscillation():
+    k_vals = np.array([0.5, 1.0])
+    rho, envelope, report = secular_evolve(lambda t: H_ms(k_vals, PARAMS), [1, 0], np.linspace(0, 1e4, 50))
+    assert report["valid"] and report["max_residual"] < 0.02
+
+    P = np.abs(propagate(H_ms(k_vals, PARAMS), [1, 0], np.linspace(0, 1e4, 400_001)))**2
+    np.testing.assert_allclose(rho[:, 1, 1, -1].real, P[:, 1].mean(axis=-1), rtol=1e-3)
+    np.testing.assert_allclose(envelope[:, 1, -1], P[:, 1].max(axis=-1) - P[:, 1].mean(axis=-1), rtol=1e-3)
+    np.testing.assert_allclose(np.trace(rho, axis1=1, axis2=2).real, 1.0)
+
+
+def test_cosmological_baseline_is_valid_and_short_baseline_is_not():
+    g, m = 5e-6, 2e-23
+    H = np.array([[0, g], [g, m]])
+    rho, _, report = secular_evolve(lambda t: H, [1, 0], np.linspace(0, 1e33, 2000))
+    assert report["valid"]
+    np.testing.assert_allclose(rho[1, 1].real, 0.5, atol=1e-6)
+
+    _, _, report = secular_evolve(lambda t: H_ms(1.0, PARAMS), [1, 0], np.linspace(0, 10, 50))
+    assert not report["valid"] and report["invalid_fraction"] == 1.0
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import physics
+from physics import compute_rho
+from sharding import compute_rho_sweep, merge_shards, parameter_space_sweep, run_shard, shard_range, sweep_hash
+from parameter_space import conversion_map
+
+SCRIPT = os.path.join(os.path.dirname(__file__), "..", "src", "sharding.py")
+
+
+def test_shard_ranges_tile_the_sweep():
+    ranges = [shard_range(10, i, 4) for i in range(4)]
+    assert ranges == [(0, 3), (3, 6), (6, 8), (8, 10)]
+
+
+def test_processes_as_nodes_merge_to_serial_result(tmp_path):
+    common = ["--sweep", "compute_rho", "--n-shards", "3", "--out", str(tmp_path),
+              "--n-items", "5", "--n-t", "20", "--t-max", "5"]
+    procs = [subprocess.Popen([sys.executable, SCRIPT, "run", "--shard", str(i)] + common)
+             for i in range(3)]
+    assert all(p.wait() == 0 for p in procs)
+    subprocess.run([sys.executable, SCRIPT, "merge"] + common, check=True)
+
+    merged = np.load(tmp_path / "compute_rho.npz")
+    expected = compute_rho(np.linspace(0.5, 2.0, 5), np.linspace(0, 5, 20),
+                           {"epsilon": 0.1, "m_dark": 1.0}, progress=False)
+    np.testing.assert_array_equal(merged["rho"], expected)
+
+
+def test_merge_rejects_missing_and_foreign_shards(tmp_path):
+    masses = np.logspace(-26, -18, 4)
+    sweep = parameter_space_sweep(np.logspace(-11, -4, 6), masses)
+    run_shard(sweep, 0, 2, str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        merge_shards(sweep, 2, str(tmp_path))
+
+    other = parameter_space_sweep(np.logspace(-10, -4, 6), masses)
+    run_shard(other, 1, 2, str(tmp_path))
+    with pytest.raises(ValueError):
+        merge_shards(sweep, 2, str(tmp_path))
+
+    run_shard(sweep, 1, 2, str(tmp_path))
+    result = merge_shards(sweep, 2, str(tmp_path))
+    np.testing.assert_array_equal(result["conversion"], conversion_map(sweep["items"], masses))
+
+
+def test_rerun_skips_completed_shards(tmp_path):
+    calls = []
+    sweep = {"name": "squares", "items": np.arange(6.0), "meta": {},
+             "func": lambda x: calls.append(len(x)) or {"y": x**2}}
+    run_shard(sweep, 0, 2, str(tmp_path))
+    run_shard(sweep, 0, 2, str(tmp_path))
+    run_shard(sweep, 1, 2, str(tmp_path))
+    assert calls == [3, 3]
+    np.testing.assert_array_equal(merge_shards(sweep, 2, str(tmp_path))["y"], np.arange(6.0)**2)
+
+
+def test_compute_rho_sweep_hash_covers_solver_settings(tmp_path, monkeypatch):
+    sweep = compute_rho_sweep([1.0, 2.0], np.linspace(0, 5, 20), {"epsilon": 0.1, "m_dark": 1.0})
+    run_shard(sweep, 0, 1, str(tmp_path))
+    monkeypatch.setattr(physics, "SOLVER_SETTINGS", dict(physics.SOLVER_SETTINGS, rtol=1e-6))
+    loose = compute_rho_sweep([1.0, 2.0], np.linspace(0, 5, 20), {"epsilon": 0.1, "m_dark": 1.0})
+    assert sweep_hash(loose["items"], loose["meta"]) != sweep_hash(sweep["items"], sweep["meta"])
+    with pytest.raises(ValueError):
+        merge_shards(loose, 1, str(tmp_path))
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from scipy.stats import hypergeom
+
+from detection import detection_statistic, simulate_data
+from significance import pack_bits, popcount, significance
+
+
+def test_packed_statistic_and_exact_permutation_null():
+    rng = np.random.default_rng(0)
+    A, B = simulate_data(301, 0.12, rng)
+    words, n = pack_bits(A)
+    assert n == 301 and words.size == 5 and popcount(words).sum() == np.sum(A > 0)
+
+    res = significance(A, B, n_replicates=20_000, workers=1, seed=1)
+    np.testing.assert_allclose((res["r"], res["z"]), detection_statistic(A, B)[::2])
+
+    # For binary channels the permutation null of n11 is hypergeometric
+    na, nb = int(np.sum(A > 0)), int(np.sum(B > 0))
+    n11 = np.arange(max(0, na + nb - n), min(na, nb) + 1)
+    extreme = np.abs(n * n11 - na * nb) >= abs(n * np.sum((A > 0) & (B > 0)) - na * nb)
+    exact = hypergeom.pmf(n11, n, na, nb)[extreme].sum()
+    lo, hi = res["p_interval"]
+    assert lo <= exact <= hi and 0 < res["p_value"] < 0.05
+
+
+def test_block_bootstrap_and_worker_independence():
+    rng = np.random.default_rng(2)
+    # Serially correlated +-1 channels sharing a slow common component
+    common = np.repeat(rng.standard_normal(64), 64)
+    A = np.sign(common + rng.standard_normal(common.size))
+    B = np.sign(common + rng.standard_normal(common.size))
+    res = significance(A, B, n_replicates=3000, method="block_bootstrap", block=128, workers=1, seed=3)
+    assert res["r_interval"][0] < res["r"] < res["r_interval"][1]
+    assert res["p_value"] < 0.01
+
+    noise = np.sign(rng.standard_normal(common.size))
+    null = significance(A, noise, n_replicates=3000, method="block_bootstrap", block=128, workers=1, seed=3)
+    assert null["p_value"] > 0.05 and null["r_interval"][0] < 0 < null["r_interval"][1]
+
+    serial = significance(A[:1000], B[:1000], n_replicates=25_000, workers=1, seed=4)
+    parallel = significance(A[:1000], B[:1000], n_replicates=25_000, workers=2, seed=4)
+    np.testing.assert_array_equal(serial["null"], parallel["null"])
+
+
+@pytest.mark.parametrize("n, block", [(200, 10), (1000, 16), (5000, 64)])
+def test_independent_channels_are_not_significant(n, block):
+    rng = np.random.default_rng(n)
+    A, B = rng.choice([-1, 1], size=(2, n))
+    boot = significance(A, B, n_replicates=2000, method="block_bootstrap", block=block, workers=1, seed=5)
+    perm = significance(A, B, n_replicates=2000, workers=1, seed=5)
+    assert boot["null"].std() > 0.5 / np.sqrt(n) and boot["p_value"] > 0.01
+    # Both nulls have the sampling spread of r, so the p-values agree
+    assert abs(boot["p_value"] - perm["p_value"]) < 0.15
+    if n == 5000:
+        # Word shuffles (78 full words) give the 1 / sqrt(N) null spread
+        np.testing.assert_allclose(perm["null"].std(), 1 / np.sqrt(n), rtol=0.1)
+
+
+def test_block_bootstrap_requires_enough_blocks():
+    with pytest.raises(ValueError, match="at least 10 blocks"):
+        significance(np.arange(100) % 2, np.arange(100) % 3, method="block_bootstrap", block=64, workers=1)
+
+
+def test_constant_channel_is_rejected_and_undefined_replicates_dropped():
+    rng = np.random.default_rng(6)
+    B = rng.choice([-1, 1], size=1000)
+    for method in ("permutation", "block_bootstrap"):
+        with pytest.raises(ValueError, match="Channel A is constant"):
+            significance(np.ones(1000), B, method=method, block=100, workers=1)
+
+    # A is positive only in its first 20 samples, so most bootstrap
+    # replicates resample no positive A and have no defined r
+    A = np.where(np.arange(1000) < 20, 1, -1)
+    res = significance(A, B, n_replicates=2000, method="block_bootstrap", block=100, workers=1, seed=7)
+    n_nan = int(np.isnan(res["null"]).sum())
+    assert 0 < n_nan < 2000 and res["n_replicates"] == 2000 - n_nan
+    assert res["p_value"] > 0.01
@@ -0,0 +1,38 @@
+import numpy as np
+
+from hamiltonian import H_ms
+from physics import compute_rho
+from solver_select import choose_solver, solve_auto
+
+PARAMS = {"epsilon": 0.1, "m_dark": 1.0}
+PHOTON = np.diag([1.0, 0.0]).astype(complex)
+
+
+def test_auto_compute_rho_matches_reference_and_records_choice():
+    k_vals, t_eval = np.linspace(0.5, 2.0, 3), np.linspace(0, 20, 50)
+    metadata = {}
+    auto = compute_rho(k_vals, t_eval, PARAMS, progress=False, solver="auto", metadata=metadata)
+    reference = compute_rho(k_vals, t_eval, PARAMS, progress=False)
+    np.testing.assert_allclose(auto, reference, atol=1e-8)
+    assert [m["solver"] for m in metadata["modes"]] == ["analytic"] * 3
+
+
+def test_choice_follows_probe():
+    probe = {"omega_max": 1.0, "omega_min": 1.0, "n_oscillations": 10.0,
+             "variation": 0.5, "decay_rate": 0.0, "duration": 60.0}
+    assert choose_solver(dict(probe, variation=0.0)) == "analytic"
+    assert choose_solver(probe) == "explicit"
+    assert choose_solver(dict(probe, n_oscillations=1e6)) == "exponential"
+    assert choose_solver(dict(probe, decay_rate=1e5)) == "implicit"
+
+
+def test_exponential_path_agrees_with_explicit():
+    def hamiltonian(t):
+        return H_ms(1.0, dict(PARAMS, a=1 + 0.02 * t))
+
+    t_eval = np.linspace(0, 100, 30)
+    rho_exp, info_exp = solve_auto(hamiltonian, PHOTON, t_eval, max_explicit_cycles=1.0, rtol=1e-10)
+    rho_rk, info_rk = solve_auto(hamiltonian, PHOTON, t_eval)
+    assert (info_exp["solver"], info_rk["solver"]) == ("exponential", "explicit")
+    assert info_exp["nfev"] < info_rk["nfev"]
+    np.testing.assert_allclose(rho_exp, rho_rk, atol=1e-6)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from physics import compute_rho
+from sharding import compute_rho_sweep, run_shard, shard_path
+from spectrum import entanglement_spectrum, mode_observables, primordial_power
+
+PARAMS = {"epsilon": 0.1, "m_dark": 1.0}
+
+
+def _reference(rho, k_vals, edges):
+    obs = mode_observables(rho)
+    w = primordial_power(k_vals) * np.gradient(np.log(k_vals))
+    return [np.average(obs["entropy"][(k_vals >= lo) & (k_vals < hi)], axis=0,
+                       weights=w[(k_vals >= lo) & (k_vals < hi)]) for lo, hi in zip(edges[:-1], edges[1:])]
+
+
+def test_chunked_npy_matches_in_memory(tmp_path):
+    k_vals, t_eval = np.geomspace(0.5, 4.0, 23), np.linspace(0, 10, 15)
+    rho = compute_rho(k_vals, t_eval, PARAMS, progress=False, solver="auto")
+    np.save(tmp_path / "rho.npy", rho)
+    edges = [0.5, 1.0, 2.0, 5.0]
+
+    spec = entanglement_spectrum(str(tmp_path / "rho.npy"), k_vals, edges, chunk_size=4,
+                                 out_dir=str(tmp_path / "obs"))
+    np.testing.assert_allclose(spec["entropy"], _reference(rho, k_vals, edges))
+    assert spec["conversion"].shape == (3, 15)
+    np.testing.assert_allclose(np.load(tmp_path / "obs" / "coherence.npy"), np.abs(rho[:, 0, 1]))
+
+
+def test_shards_as_source(tmp_path):
+    k_vals, t_eval = np.geomspace(0.5, 4.0, 10), np.linspace(0, 10, 12)
+    sweep = compute_rho_sweep(k_vals, t_eval, PARAMS)
+    paths = [run_shard(sweep, i, 3, str(tmp_path)) for i in range(3)]
+    assert paths[1] == shard_path(str(tmp_path), "compute_rho", 1, 3)
+    spec = entanglement_spectrum(paths, k_vals, [0.1, 1.0, 10.0], chunk_size=2)
+    full = entanglement_spectrum(compute_rho(k_vals, t_eval, PARAMS, progress=False), k_vals, [0.1, 1.0, 10.0])
+    np.testing.assert_allclose(spec["conversion"], full["conversion"])
+    np.testing.assert_allclose(spec["total"]["entropy"], full["total"]["entropy"])
+
+
+def test_empty_source_is_an_error():
+    with pytest.raises(ValueError, match="No modes"):
+        entanglement_spectrum(np.empty((0, 2, 2, 5), dtype=complex), [], [0.5, 1.0])
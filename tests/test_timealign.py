@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from detection import detection_statistic
+from timealign import align, align_correlate, chunks
+
+
+def _stream(rng, n, cadence):
+    times = np.sort(rng.uniform(0, n * cadence, n))
+    return times, np.sin(times / 7.0) + 0.1 * rng.standard_normal(n)
+
+
+def _brute_force(ref_t, others, tol):
+    rows = []
+    for i, t in enumerate(ref_t):
+        picks = []
+        for times, _ in others:
+            j = int(np.argmin(np.abs(times - t)))  # first minimum = earlier sample on ties
+            picks.append(j if abs(times[j] - t) <= tol else None)
+        if None not in picks:
+            rows.append((i, picks))
+    return rows
+
+
+def test_matches_brute_force_across_chunkings(tmp_path):
+    rng = np.random.default_rng(0)
+    ref, fast, slow = _stream(rng, 400, 1.0), _stream(rng, 1500, 0.27), _stream(rng, 150, 2.6)
+    np.save(tmp_path / "t.npy", fast[0])
+    np.save(tmp_path / "v.npy", fast[1])
+    fast_t, fast_v = np.load(tmp_path / "t.npy", mmap_mode="r"), np.load(tmp_path / "v.npy", mmap_mode="r")
+
+    rows = _brute_force(ref[0], [fast, slow], tol=0.5)
+    for sizes in [(400, 1500, 150), (17, 64, 5), (1, 3, 2)]:
+        aligned = align({"ref": chunks(*ref, sizes[0]), "fast": chunks(fast_t, fast_v, sizes[1]),
+                         "slow": chunks(*slow, sizes[2])}, tolerance=0.5)
+        assert len(aligned["time"]) == len(rows) > 0
+        np.testing.assert_array_equal(aligned["time"], ref[0][[i for i, _ in rows]])
+        np.testing.assert_array_equal(aligned["fast"], fast[1][[p[0] for _, p in rows]])
+        np.testing.assert_array_equal(aligned["slow"], slow[1][[p[1] for _, p in rows]])
+
+    r, p, z, n = align_correlate(chunks(*ref, 50), chunks(*slow, 20), tolerance={"b": 0.5})
+    pairs = align({"a": [ref], "b": [slow]}, 0.5)
+    assert n == len(pairs["a"])
+    np.testing.assert_allclose((r, p, z), detection_statistic(pairs["a"], pairs["b"]), rtol=1e-10)
+
+
+def test_unsorted_stream_rejected():
+    with pytest.raises(ValueError, match="not sorted"):
+        align({"a": [(np.arange(5.0), np.zeros(5))], "b": [(np.arange(3.0), np.zeros(3)),
+                                                          (np.arange(3.0), np.zeros(3))]}, 10.0)
@@ -1,3 +1,5 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib import colors
@@ -7,6 +9,11 @@ from scipy.signal import find_peaks
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from secular import secular_evolve
+from figure_build import DataCache, build_figures
+from display import plot_decimated
+
 # Set professional style
 plt.style.use('default')
 sns.set_palette("husl")
@@ -20,11 +27,171 @@ plt.rcParams.update({
     'figure.titlesize': 18
 })
 
+FIGURE_METHODS = (
+    "create_figure_1_quantum_dynamics",
+    "create_figure_2_parameter_space",
+    "create_figure_3_cmb_signatures",
+    "create_figure_4_oscillation_parameter_dependence",
+    "create_figure_5_detection_prospects",
+)
+
+
+def compute_quantum_dynamics(coupling, mass_dark, t_max, n_t):
+    """Data product of Figure 1: rho(t) and its entanglement entropy"""
+    t_span = [0, t_max]
+    t_eval = np.linspace(0, t_max, n_t)
+    
+    # Quantum evolution: the oscillation period is many orders of magnitude
+    # below the sampling interval, so plot the sample-averaged state
+    # unless the secular approximation reports itself invalid
+    H = np.array([[0, coupling], [coupling, mass_dark]])
+    rho_t, _, secular_report = secular_evolve(lambda t: H, [1+0j, 0+0j], t_eval)
+    print(f"  Secular averaging valid: {secular_report['valid']} "
+          f"({secular_report['min_cycles_per_sample']:.2e} cycles/sample)")
+    
+    if not secular_report['valid']:
+        def quantum_eq(t, psi):
+            gamma_vis, gamma_dark = psi
+            dgdt = -1j * coupling * gamma_dark
+            dddt = -1j * (mass_dark * gamma_dark + coupling * gamma_vis)
+            return [dgdt, dddt]
+        
+        solution = solve_ivp(quantum_eq, t_span, [1+0j, 0+0j], t_eval=t_eval, method='RK45')
+        rho_t = solution.y[:, None, :] * np.conj(solution.y[None, :, :])
+    
+    entanglement = []
+    for i in range(len(t_eval)):
+        rho = rho_t[:, :, i]
+        rho_norm = rho / np.trace(rho)
+        eigvals = np.linalg.eigvalsh(rho_norm)
+        eigvals = eigvals[eigvals > 1e-12]
+        if len(eigvals) > 0:
+            entropy = -np.sum(eigvals * np.log(eigvals))
+        else:
+            entropy = 0
+        entanglement.append(entropy)
+    
+    return {'t_eval': t_eval, 'rho_t': rho_t, 'entanglement': np.array(entanglement)}
+
+
+def compute_parameter_space(log_mass_min, log_mass_max, n_mass):
+    """Data product of Figure 2: constraint curves over the dark photon mass"""
+    masses = np.logspace(log_mass_min, log_mass_max, n_mass)  # eV
+    ones = np.ones_like(masses)
+    return {
+        'masses': masses,
+        # CMB constraints (Planck + future)
+        'cmb_current': 1e-6 * ones,
+        'cmb_future': 1e-9 * ones,
+        # Laboratory constraints
+        'lab_current': 1e-7 * ones,
+        'lab_future': 1e-10 * ones,
+        # Astrophysical constraints
+        'astro': 1e-8 * ones,
+        # Dark matter relic density
+        'dm_relic': 1e-12 * (masses / 1e-22)**0.5,
+    }
+
+
+def compute_cmb_signatures(ell_max, noise_step, resonance_scales, enhancements):
+    """Data product of Figure 3: EE/BB spectra with and without dark photons and their SNR"""
+    # Multipole range
+    ell = np.arange(2, ell_max)
+    
+    # Standard ΛCDM spectra (approximate forms)
+    def standard_ee(ell):
+        return 0.05 * ell * (ell + 1) * np.exp(-ell / 2000) / (2 * np.pi)
+    
+    def standard_bb(ell, r=0.001):
+        return r * 0.02 * ell * (ell + 1) * np.exp(-ell / 1500) / (2 * np.pi)
+    
+    # Dark photon modifications
+    def dark_photon_enhancement(ell):
+        total = 0
+        for scale, amp in zip(resonance_scales, enhancements):
+            total += amp * np.exp(-(ell - scale)**2 / (2 * (scale * 0.2)**2))
+        return total
+    
+    ee_standard = standard_ee(ell)
+    ee_modified = ee_standard * (1 + dark_photon_enhancement(ell))
+    
+    bb_standard = standard_bb(ell)
+    # Additional B-modes from dark photon tensor modes
+    bb_dark_photon = 5e-4 * np.exp(-(ell - 100)**2 / (2 * 50**2)) + \
+                    2e-4 * np.exp(-(ell - 300)**2 / (2 * 100**2))
+    bb_modified = bb_standard + bb_dark_photon
+    
+    # Approximate noise curves for different experiments
+    ell_noise = np.arange(2, ell_max, noise_step)
+    noise_planck = 10 * np.ones_like(ell_noise) * (ell_noise / 100)**2
+    noise_s4 = 0.5 * np.ones_like(ell_noise) * (ell_noise / 100)**2
+    noise_litebird = 2 * np.ones_like(ell_noise) * (ell_noise / 100)**0.5
+    
+    # Signal (difference) and SNR
+    signal = ee_modified - ee_standard
+    return {
+        'ell': ell,
+        'ee_standard': ee_standard,
+        'ee_modified': ee_modified,
+        'bb_standard': bb_standard,
+        'bb_modified': bb_modified,
+        'snr_planck': signal / np.interp(ell, ell_noise, noise_planck),
+        'snr_s4': signal / np.interp(ell, ell_noise, noise_s4),
+        'snr_litebird': signal / np.interp(ell, ell_noise, noise_litebird),
+    }
+
+
+def compute_parameter_dependence(mass_fixed, coupling_fixed, n_points):
+    """Data product of Figure 4: conversion, period and plasma curves"""
+    couplings = np.logspace(-7, -4, n_points)
+    # Simple analytic approximation for max conversion
+    max_conversion = (4 * couplings**2) / (mass_fixed**2 + 4 * couplings**2)
+    
+    masses = np.logspace(-25, -20, n_points)
+    # Period ~ 1/sqrt(mass^4 + coupling^2)
+    oscillation_periods = 1 / np.sqrt(masses**4 + coupling_fixed**2)
+    
+    temperatures = np.logspace(15, 2, 100)  # GeV to eV
+    # Effective mixing in plasma (simplified); decreases with cooling
+    plasma_effect = np.exp(-temperatures / 1e4)
+    return {
+        'couplings': couplings,
+        'max_conversion': max_conversion,
+        'masses': masses,
+        'oscillation_periods': oscillation_periods,
+        'temperatures': temperatures,
+        'plasma_effect': plasma_effect,
+    }
+
+
+def compute_discovery_probability(n_coupling, n_mass, mass_benchmark):
+    """Data product of Figure 5: discovery probability over (epsilon, mass)"""
+    coupling_range = np.logspace(-10, -6, n_coupling)
+    mass_range = np.logspace(-25, -20, n_mass)
+    
+    # Probability of discovery (simplified model)
+    C, M = np.meshgrid(coupling_range, mass_range)
+    discovery_prob = np.exp(-1e-9 / C) * np.exp(-(np.log10(M) - np.log10(mass_benchmark))**2 / 2)
+    return {'log_coupling': np.log10(C), 'log_mass': np.log10(M), 'discovery_prob': discovery_prob}
+
+
 class ManuscriptFigures:
-    def __init__(self):
-        self.fig_dir = "manuscript_figures"
-        import os
+    def __init__(self, fig_dir="manuscript_figures", cache_dir=None, formats=('png', 'pdf'), dpi=300):
+        self.fig_dir = fig_dir
+        self.cache_dir = cache_dir or os.path.join(fig_dir, ".cache")
+        self.formats = formats
+        self.dpi = dpi
+        self.saved = []
         os.makedirs(self.fig_dir, exist_ok=True)
+        self.data_cache = DataCache(self.cache_dir)
+    
+    def save_figure(self, name):
+        """Save the current figure in every configured format and close it"""
+        for fmt in self.formats:
+            path = os.path.join(self.fig_dir, f'{name}.{fmt}')
+            plt.savefig(path, dpi=self.dpi, bbox_inches='tight')
+            self.saved.append(path)
+        plt.close()
     
     def create_figure_1_quantum_dynamics(self):
         """Figure 1: Quantum Dynamics and Entanglement Evolution"""
@@ -33,31 +200,23 @@ class ManuscriptFigures:
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
         fig.suptitle('Quantum Dynamics of Photon-Dark Photon System', fontsize=18, fontweight='bold')
         
-        # Parameters for simulation
-        coupling = 5e-6
-        mass_dark = 2e-23
-        t_span = [0, 1e33]
-        t_eval = np.linspace(0, 1e33, 2000)
-        
-        # Quantum evolution
-        def quantum_eq(t, psi):
-            gamma_vis, gamma_dark = psi
-            dgdt = -1j * coupling * gamma_dark
-            dddt = -1j * (mass_dark * gamma_dark + coupling * gamma_vis)
-            return [dgdt, dddt]
-        
-        solution = solve_ivp(quantum_eq, t_span, [1+0j, 0+0j], t_eval=t_eval, method='RK45')
+        # Parameters for simulation; the dynamics are cached by these inputs
+        data = self.data_cache.get('quantum_dynamics', compute_quantum_dynamics,
+                                   coupling=5e-6, mass_dark=2e-23, t_max=1e33, n_t=2000)
+        t_eval = data['t_eval']
+        rho_t = data['rho_t']
+        entanglement = data['entanglement']
         
         # Calculate physical quantities
-        time_norm = solution.t / 1e33
-        prob_vis = np.abs(solution.y[0])**2
-        prob_dark = np.abs(solution.y[1])**2
-        coherence = np.abs(solution.y[0] * np.conj(solution.y[1]))
+        time_norm = t_eval / 1e33
+        prob_vis = np.real(rho_t[0, 0])
+        prob_dark = np.real(rho_t[1, 1])
+        coherence = np.abs(rho_t[0, 1])
         
         # Panel A: Probability oscillations
-        ax1.plot(time_norm, prob_vis, 'b-', linewidth=2.5, label='Visible Photon $P_γ$', alpha=0.8)
-        ax1.plot(time_norm, prob_dark, 'r-', linewidth=2.5, label='Dark Photon $P_{A\'}$', alpha=0.8)
-        ax1.plot(time_norm, coherence, 'g--', linewidth=2, label='Quantum Coherence', alpha=0.7)
+        plot_decimated(ax1, time_norm, prob_vis, 'b-', dpi=self.dpi, linewidth=2.5, label='Visible Photon $P_γ$', alpha=0.8)
+        plot_decimated(ax1, time_norm, prob_dark, 'r-', dpi=self.dpi, linewidth=2.5, label='Dark Photon $P_{A\'}$', alpha=0.8)
+        plot_decimated(ax1, time_norm, coherence, 'g--', dpi=self.dpi, linewidth=2, label='Quantum Coherence', alpha=0.7)
         ax1.set_xlabel('Time (Hubble Units)')
         ax1.set_ylabel('Probability / Coherence')
         ax1.set_title('(a) Photon-Dark Photon Oscillations')
@@ -66,19 +225,7 @@ class ManuscriptFigures:
         ax1.set_ylim(-0.05, 1.05)
         
         # Panel B: Entanglement entropy
-        entanglement = []
-        for i in range(len(solution.t)):
-            rho = np.outer(solution.y[:, i], np.conj(solution.y[:, i]))
-            rho_norm = rho / np.trace(rho)
-            eigvals = np.linalg.eigvalsh(rho_norm)
-            eigvals = eigvals[eigvals > 1e-12]
-            if len(eigvals) > 0:
-                entropy = -np.sum(eigvals * np.log(eigvals))
-            else:
-                entropy = 0
-            entanglement.append(entropy)
-        
-        ax2.plot(time_norm, entanglement, 'purple', linewidth=3, label='Entanglement Entropy')
+        plot_decimated(ax2, time_norm, entanglement, 'purple', dpi=self.dpi, linewidth=3, label='Entanglement Entropy')
         ax2.axhline(y=np.log(2), color='red', linestyle='--', linewidth=2, 
                    label='Theoretical Maximum $S_{max} = \ln(2)$')
         ax2.set_xlabel('Time (Hubble Units)')
@@ -93,8 +240,7 @@ class ManuscriptFigures:
         density_matrices = []
         
         for idx in times_snapshots:
-            psi = solution.y[:, idx]
-            rho = np.outer(psi, np.conj(psi))
+            rho = rho_t[:, :, idx]
             rho_normalized = rho / np.trace(rho)
             density_matrices.append(np.real(rho_normalized))
         
@@ -120,9 +266,7 @@ class ManuscriptFigures:
         ax4.set_title('(d) Density Matrix Evolution (Late Times)')
         
         plt.tight_layout()
-        plt.savefig(f'{self.fig_dir}/figure1_quantum_dynamics.png', dpi=300, bbox_inches='tight')
-        plt.savefig(f'{self.fig_dir}/figure1_quantum_dynamics.pdf', bbox_inches='tight')
-        plt.close()
+        self.save_figure('figure1_quantum_dynamics')
         
         print("✓ Figure 1 created: Quantum Dynamics")
     
@@ -132,27 +276,13 @@ class ManuscriptFigures:
         
         fig, ax = plt.subplots(1, 1, figsize=(12, 9))
         
-        # Parameter ranges
-        masses = np.logspace(-26, -18, 200)  # eV
-        couplings = np.logspace(-11, -4, 200)  # ε
-        
-        # Create meshgrid
-        M, C = np.meshgrid(masses, couplings)
-        
-        # Define constraint regions
-        # CMB constraints (Planck + future)
-        cmb_current = 1e-6 * np.ones_like(M)
-        cmb_future = 1e-9 * np.ones_like(M)
-        
-        # Laboratory constraints
-        lab_current = 1e-7 * np.ones_like(M)
-        lab_future = 1e-10 * np.ones_like(M)
-        
-        # Astrophysical constraints
-        astro = 1e-8 * np.ones_like(M)
-        
-        # Dark matter relic density
-        dm_relic = 1e-12 * (M / 1e-22)**0.5
+        # Constraint curves, cached by their grid
+        data = self.data_cache.get('parameter_space', compute_parameter_space,
+                                   log_mass_min=-26, log_mass_max=-18, n_mass=200)
+        masses = data['masses']
+        cmb_current, cmb_future = data['cmb_current'], data['cmb_future']
+        lab_current, lab_future = data['lab_current'], data['lab_future']
+        astro, dm_relic = data['astro'], data['dm_relic']
         
         # Plot constraints
         ax.fill_between(masses, 1e-4, cmb_current, alpha=0.4, color='red', label='Excluded: Current CMB')
@@ -196,9 +326,7 @@ class ManuscriptFigures:
                fontweight='bold', color='darkgreen', fontsize=12)
         
         plt.tight_layout()
-        plt.savefig(f'{self.fig_dir}/figure2_parameter_space.png', dpi=300, bbox_inches='tight')
-        plt.savefig(f'{self.fig_dir}/figure2_parameter_space.pdf', bbox_inches='tight')
-        plt.close()
+        self.save_figure('figure2_parameter_space')
         
         print("✓ Figure 2 created: Parameter Space")
     
@@ -210,30 +338,15 @@ class ManuscriptFigures:
         fig.suptitle('CMB Polarization Signatures from Photon-Dark Photon Entanglement', 
                     fontsize=18, fontweight='bold')
         
-        # Multipole range
-        ell = np.arange(2, 2500)
-        
-        # Standard ΛCDM spectra (approximate forms)
-        def standard_ee(ell):
-            return 0.05 * ell * (ell + 1) * np.exp(-ell / 2000) / (2 * np.pi)
-        
-        def standard_bb(ell, r=0.001):
-            return r * 0.02 * ell * (ell + 1) * np.exp(-ell / 1500) / (2 * np.pi)
-        
-        # Dark photon modifications
+        # Spectra and SNR, cached by the multipole range and resonances
         resonance_scales = [150, 450, 800]
-        enhancements = [0.002, 0.0015, 0.0008]
-        
-        def dark_photon_enhancement(ell):
-            total = 0
-            for scale, amp in zip(resonance_scales, enhancements):
-                total += amp * np.exp(-(ell - scale)**2 / (2 * (scale * 0.2)**2))
-            return total
+        data = self.data_cache.get('cmb_signatures', compute_cmb_signatures, ell_max=2500, noise_step=50,
+                                   resonance_scales=resonance_scales, enhancements=[0.002, 0.0015, 0.0008])
+        ell = data['ell']
+        ee_standard, ee_modified = data['ee_standard'], data['ee_modified']
+        bb_standard, bb_modified = data['bb_standard'], data['bb_modified']
         
         # Panel A: E-mode power spectrum
-        ee_standard = standard_ee(ell)
-        ee_modified = ee_standard * (1 + dark_photon_enhancement(ell))
-        
         ax1.semilogy(ell, ee_standard, 'b-', linewidth=3, label='Standard $Λ$CDM', alpha=0.8)
         ax1.semilogy(ell, ee_modified, 'r--', linewidth=3, label='With Dark Photons', alpha=0.9)
         ax1.set_xlabel('Multipole $\\ell$')
@@ -250,12 +363,6 @@ class ManuscriptFigures:
                     ha='center', va='bottom', fontsize=10, color='purple')
         
         # Panel B: B-mode power spectrum
-        bb_standard = standard_bb(ell)
-        # Additional B-modes from dark photon tensor modes
-        bb_dark_photon = 5e-4 * np.exp(-(ell - 100)**2 / (2 * 50**2)) + \
-                        2e-4 * np.exp(-(ell - 300)**2 / (2 * 100**2))
-        bb_modified = bb_standard + bb_dark_photon
-        
         ax2.semilogy(ell, bb_standard, 'b-', linewidth=3, label='Standard $Λ$CDM', alpha=0.8)
         ax2.semilogy(ell, bb_modified, 'r--', linewidth=3, label='With Dark Photons', alpha=0.9)
         ax2.set_xlabel('Multipole $\\ell$')
@@ -280,21 +387,7 @@ class ManuscriptFigures:
         ax3.set_ylim(-1, 3)
         
         # Panel D: Signal-to-noise ratio
-        # Approximate noise curves for different experiments
-        ell_noise = np.arange(2, 2500, 50)
-        
-        # Noise levels (approximate)
-        noise_planck = 10 * np.ones_like(ell_noise) * (ell_noise / 100)**2
-        noise_s4 = 0.5 * np.ones_like(ell_noise) * (ell_noise / 100)**2
-        noise_litebird = 2 * np.ones_like(ell_noise) * (ell_noise / 100)**0.5
-        
-        # Signal (difference)
-        signal = ee_modified - ee_standard
-        
-        # SNR calculation
-        snr_planck = signal / np.interp(ell, ell_noise, noise_planck)
-        snr_s4 = signal / np.interp(ell, ell_noise, noise_s4)
-        snr_litebird = signal / np.interp(ell, ell_noise, noise_litebird)
+        snr_planck, snr_s4, snr_litebird = data['snr_planck'], data['snr_s4'], data['snr_litebird']
         
         ax4.plot(ell, snr_planck, 'r-', linewidth=2, label='Planck', alpha=0.7)
         ax4.plot(ell, snr_litebird, 'g-', linewidth=2, label='LiteBIRD', alpha=0.7)
@@ -309,9 +402,7 @@ class ManuscriptFigures:
         ax4.set_ylim(0, 3)
         
         plt.tight_layout()
-        plt.savefig(f'{self.fig_dir}/figure3_cmb_signatures.png', dpi=300, bbox_inches='tight')
-        plt.savefig(f'{self.fig_dir}/figure3_cmb_signatures.pdf', bbox_inches='tight')
-        plt.close()
+        self.save_figure('figure3_cmb_signatures')
         
         print("✓ Figure 3 created: CMB Signatures")
     
@@ -323,16 +414,12 @@ class ManuscriptFigures:
         fig.suptitle('Parameter Dependence of Photon-Dark Photon Oscillations', 
                     fontsize=18, fontweight='bold')
         
-        # Panel A: Coupling dependence
-        couplings = np.logspace(-7, -4, 50)
-        mass_fixed = 1e-23
-        
-        max_conversion = []
-        for coupling in couplings:
-            # Simple analytic approximation for max conversion
-            P_max = (4 * coupling**2) / (mass_fixed**2 + 4 * coupling**2)
-            max_conversion.append(P_max)
+        # Curves of panels A-C, cached by the benchmark values
+        data = self.data_cache.get('parameter_dependence', compute_parameter_dependence,
+                                   mass_fixed=1e-23, coupling_fixed=5e-6, n_points=50)
         
+        # Panel A: Coupling dependence
+        couplings, max_conversion = data['couplings'], data['max_conversion']
         ax1.loglog(couplings, max_conversion, 'bo-', linewidth=2, markersize=4)
         ax1.set_xlabel('Coupling $\\epsilon$')
         ax1.set_ylabel('Maximum Conversion Probability $P_{max}$')
@@ -342,15 +429,7 @@ class ManuscriptFigures:
         ax1.legend()
         
         # Panel B: Mass dependence
-        masses = np.logspace(-25, -20, 50)
-        coupling_fixed = 5e-6
-        
-        oscillation_periods = []
-        for mass in masses:
-            # Period ~ 1/sqrt(mass^4 + coupling^2)
-            period = 1 / np.sqrt(mass**4 + coupling_fixed**2)
-            oscillation_periods.append(period)
-        
+        masses, oscillation_periods = data['masses'], data['oscillation_periods']
         ax2.loglog(masses, oscillation_periods, 'ro-', linewidth=2, markersize=4)
         ax2.set_xlabel('Dark Photon Mass $m_{A\'}$ [eV]')
         ax2.set_ylabel('Oscillation Period [arb. units]')
@@ -360,11 +439,8 @@ class ManuscriptFigures:
         ax2.legend()
         
         # Panel C: Temperature evolution
-        temperatures = np.logspace(15, 2, 100)  # GeV to eV
-        temp_keV = temperatures * 1e6  # Convert to keV for plotting
-        
-        # Effective mixing in plasma (simplified)
-        plasma_effect = np.exp(-temperatures / 1e4)  # Decreases with cooling
+        temp_keV = data['temperatures'] * 1e6  # Convert to keV for plotting
+        plasma_effect = data['plasma_effect']
         
         ax3.semilogx(temp_keV, plasma_effect, 'purple', linewidth=3)
         ax3.set_xlabel('Plasma Temperature [keV]')
@@ -398,9 +474,7 @@ class ManuscriptFigures:
                     va='center', fontsize=9)
         
         plt.tight_layout()
-        plt.savefig(f'{self.fig_dir}/figure4_parameter_dependence.png', dpi=300, bbox_inches='tight')
-        plt.savefig(f'{self.fig_dir}/figure4_parameter_dependence.pdf', bbox_inches='tight')
-        plt.close()
+        self.save_figure('figure4_parameter_dependence')
         
         print("✓ Figure 4 created: Parameter Dependence")
     
@@ -433,46 +507,50 @@ class ManuscriptFigures:
         ax1.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
         ax1.grid(True, alpha=0.3, axis='x')
         
-        # Panel B: Discovery potential
-        coupling_range = np.logspace(-10, -6, 100)
-        mass_range = np.logspace(-25, -20, 100)
-        
-        # Probability of discovery (simplified model)
-        C, M = np.meshgrid(coupling_range, mass_range)
-        discovery_prob = np.exp(-1e-9 / C) * np.exp(-(np.log10(M) - np.log10(5e-23))**2 / 2)
+        # Panel B: Discovery potential, cached by its grid
+        data = self.data_cache.get('discovery_probability', compute_discovery_probability,
+                                   n_coupling=100, n_mass=100, mass_benchmark=5e-23)
+        log_C, log_M, discovery_prob = data['log_coupling'], data['log_mass'], data['discovery_prob']
         
-        im = ax2.contourf(np.log10(C), np.log10(M), discovery_prob, levels=20, cmap='viridis')
+        im = ax2.contourf(log_C, log_M, discovery_prob, levels=20, cmap='viridis')
         ax2.set_xlabel('$\\log_{10}(\\epsilon)$')
         ax2.set_ylabel('$\\log_{10}(m_{A\'}$ [eV])')
         ax2.set_title('(b) Discovery Probability')
         
         # Add contours
-        contour = ax2.contour(np.log10(C), np.log10(M), discovery_prob, levels=[0.1, 0.5, 0.9], 
+        contour = ax2.contour(log_C, log_M, discovery_prob, levels=[0.1, 0.5, 0.9], 
                              colors='white', linewidths=2)
         ax2.clabel(contour, inline=True, fontsize=10, fmt='%0.1f')
         
         plt.colorbar(im, ax=ax2, label='Discovery Probability')
         
         plt.tight_layout()
-        plt.savefig(f'{self.fig_dir}/figure5_detection_prospects.png', dpi=300, bbox_inches='tight')
-        plt.savefig(f'{self.fig_dir}/figure5_detection_prospects.pdf', bbox_inches='tight')
-        plt.close()
+        self.save_figure('figure5_detection_prospects')
         
         print("✓ Figure 5 created: Detection Prospects")
     
-    def create_all_figures(self):
-        """Create all manuscript figures"""
+    def create_all_figures(self, workers=None, force=False):
+        """
+        Create all manuscript figures
+        
+        Only figures whose code, style or output settings changed since the
+        last build are re-rendered, in parallel worker processes; their data
+        products come from the cache unless their inputs changed.
+        """
         print("🚀 Generating all manuscript figures...")
         print("=" * 50)
         
-        self.create_figure_1_quantum_dynamics()
-        self.create_figure_2_parameter_space()
-        self.create_figure_3_cmb_signatures()
-        self.create_figure_4_oscillation_parameter_dependence()
-        self.create_figure_5_detection_prospects()
+        status = build_figures(os.path.abspath(__file__), type(self).__name__, FIGURE_METHODS,
+                               self.fig_dir, cache_dir=self.cache_dir, workers=workers, force=force,
+                               formats=self.formats, dpi=self.dpi)
+        for method, state in status.items():
+            print(f"  {method}: {state}")
         
         print("=" * 50)
-        print("✅ All figures generated successfully!")
+        if any(state.startswith("failed") for state in status.values()):
+            print("⚠️ Some figures failed; they will be retried on the next build")
+        else:
+            print("✅ All figures generated successfully!")
         print(f"📁 Figures saved in: {self.fig_dir}/")
         print("\n📊 Figure Summary:")
         print("  • figure1_quantum_dynamics.png - Quantum dynamics and entanglement")
@@ -483,5 +561,13 @@ class ManuscriptFigures:
 
 # Generate all figures
 if __name__ == "__main__":
-    figure_generator = ManuscriptFigures()
-    figure_generator.create_all_figures()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Build the manuscript figures incrementally")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel render processes")
+    parser.add_argument("--force", action="store_true", help="Re-render every figure")
+    parser.add_argument("--formats", nargs="+", default=["png", "pdf"], help="Output formats")
+    parser.add_argument("--dpi", type=int, default=300, help="Raster resolution")
+    args = parser.parse_args()
+    
+    figure_generator = ManuscriptFigures(formats=tuple(args.formats), dpi=args.dpi)
+    figure_generator.create_all_figures(workers=args.workers, force=args.force)
\ No newline at end of file